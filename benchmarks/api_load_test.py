@@ -0,0 +1,168 @@
+#- Нагрузочный тест HTTP/JSON API (findPort.py --serve) на модели сети коммутаторов
+#- Запуск: python benchmarks/api_load_test.py [--requests 2000] [--clients 16] [--switches 20] [--rtt-ms 5] [--per-switch 4]
+#-         python benchmarks/api_load_test.py --url http://127.0.0.1:8080 --queries queries.txt   (работающий сервер)
+#- Без --url поднимается LookupServer с тем же движком (HopTracer, пул сессий), что и в findPort.py, но коммутаторы -
+#- модели из simulated_fabric: задержка сети и обработки команд задается параметрами. Ответы сверяются с моделью
+import argparse
+import http.client
+import json
+import os
+import random
+import sys
+import threading
+import time
+from urllib.parse import urlsplit, quote
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'func'))
+
+from api_server import LookupServer, ResultCollector
+from batch_runner import classify, run_batch
+from hop_tracer import HopTracer
+from port_inventory import port_inventory
+from simulated_fabric import SimulatedFabric, SimulatedPool
+from topology_graph import TopologyGraph
+
+
+def start_server(args):
+    fabric = SimulatedFabric(args.switches, args.hosts, seed=1)
+    pool = SimulatedPool(fabric, args.rtt_ms / 1000, args.command_ms / 1000, args.jitter_ms / 1000, args.connect_ms / 1000)
+    ips = {mac: ip for ip, (mac, *_) in fabric.arp.items()}
+    tracer = HopTracer(pool, 'sw1', 22, 'user', 'password', topology=TopologyGraph(None), per_switch=args.per_switch)
+
+    def lookup(query):
+        kind, value = classify(query)
+        trace = tracer.trace(mac_loc=value) if kind == 'mac' else tracer.trace(ip_loc=value)
+        return dict(trace.to_dict(), query=query)
+
+    def port_lookup(switch_loc, port_loc):  # IP по ARP модели; DNS, база Computers и AD в модели не представлены
+        entries = tracer.port_entries(switch_loc, port_loc) if port_loc else tracer.switch_entries(switch_loc)
+        rows, errors = port_inventory(switch_loc, entries, None, lambda macs: {mac: ips.get(mac) for mac in macs}, None, None, None)
+        return {'switch': switch_loc, 'port': port_loc, 'entries': rows, 'errors': errors}
+
+    def batch(items):
+        collector = ResultCollector()
+        run_batch(items, lambda kind, value: lookup(value), collector, args.clients)
+        return collector.results
+
+    server = LookupServer(('127.0.0.1', 0), lookup, port_lookup, batch)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, fabric, pool
+
+
+def percentile(values, share):
+    return values[min(int(len(values) * share), len(values) - 1)] if values else 0.0
+
+
+def run_clients(url, queries, total, clients):
+    parts = urlsplit(url)
+    latencies = []
+    results = []
+    errors = []
+    lock = threading.Lock()
+    counter = iter(range(total))
+
+    def client():
+        connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=60)    # Keep-alive: одно соединение на клиента
+        rng = random.Random(threading.get_ident())
+        for _ in counter:
+            query = rng.choice(queries)
+            started = time.perf_counter()
+            try:
+                connection.request('GET', f"/lookup?q={quote(query)}")
+                response = connection.getresponse()
+                body = json.loads(response.read())
+            except Exception as e:
+                connection.close()
+                connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=60)
+                with lock:
+                    errors.append(f"{type(e).__name__}: {e}")
+                continue
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                results.append((query, response.status, body))
+        connection.close()
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started, sorted(latencies), results, errors
+
+
+def smoke(url, fabric, queries):    # /port и /batch: по одному запросу, время и число записей
+    parts = urlsplit(url)
+    connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=60)
+    switch_loc, port_loc = next(iter(fabric.hosts.values()))[:2]
+    started = time.perf_counter()
+    connection.request('GET', f"/port?switch={quote(switch_loc)}&port={quote(port_loc)}")
+    entries = json.loads(connection.getresponse().read()).get('entries', [])
+    port_elapsed = time.perf_counter() - started
+    started = time.perf_counter()
+    connection.request('GET', f"/port?switch={quote(switch_loc)}")
+    switch_entries = json.loads(connection.getresponse().read()).get('entries', [])
+    switch_elapsed = time.perf_counter() - started
+    expected = sum(1 for host in fabric.hosts.values() if host[0] == switch_loc)
+    started = time.perf_counter()
+    connection.request('POST', '/batch', body='\n'.join(queries[:50]).encode('utf-8'))
+    batch = json.loads(connection.getresponse().read())
+    batch_elapsed = time.perf_counter() - started
+    connection.close()
+    print(f"/port        {len(entries)} MAC на {switch_loc} {port_loc} за {port_elapsed * 1000:.1f} ms")
+    print(f"/port        {len(switch_entries)} MAC на граничных портах {switch_loc} (в модели {expected}) за {switch_elapsed * 1000:.1f} ms")
+    print(f"/batch       {len(batch)} результатов за {batch_elapsed * 1000:.1f} ms")
+
+
+def check(fabric, results):    # Сколько ответов указывают на тот же коммутатор и порт, что и в модели
+    correct = 0
+    for query, status, body in results:
+        mac = query if query in fabric.hosts else fabric.arp.get(query, (None,))[0]
+        hops = [hop for hop in body.get('hops', []) if 'error' not in hop]
+        if status == 200 and mac in fabric.hosts and hops and (hops[-1]['switch'], hops[-1]['port']) == fabric.hosts[mac][:2]:
+            correct += 1
+    return correct
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Нагрузочный тест API поиска')
+    parser.add_argument('--url', help='адрес работающего сервера; без него - встроенный сервер на модели сети')
+    parser.add_argument('--queries', help='файл с запросами (MAC, IP, имена) для --url')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--switches', type=int, default=20)
+    parser.add_argument('--hosts', type=int, default=40, help='устройств на коммутаторе доступа')
+    parser.add_argument('--per-switch', type=int, default=4, help='одновременных поисков на коммутаторе')
+    parser.add_argument('--rtt-ms', type=float, default=5.0)
+    parser.add_argument('--command-ms', type=float, default=1.0, help='обработка одной команды коммутатором')
+    parser.add_argument('--jitter-ms', type=float, default=1.0)
+    parser.add_argument('--connect-ms', type=float, default=50.0, help='установление SSH-сессии')
+    args = parser.parse_args()
+
+    fabric = pool = None
+    if args.url:
+        with open(args.queries, encoding='utf-8') as f:
+            queries = [line.strip() for line in f if line.strip()]
+        url = args.url
+    else:
+        server, fabric, pool = start_server(args)
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        rng = random.Random(2)
+        macs = list(fabric.hosts)
+        queries = [mac if rng.random() < 0.5 else fabric.hosts[mac][3] for mac in rng.sample(macs, min(len(macs), 500))]
+
+    elapsed, latencies, results, errors = run_clients(url, queries, args.requests, args.clients)
+    print(f"Запросов     {len(results)} за {elapsed:.2f} s   {len(results) / elapsed:8.1f} запросов/с   ошибок {len(errors)}")
+    print(f"Задержка     p50 {percentile(latencies, 0.5) * 1000:7.1f} ms   p95 {percentile(latencies, 0.95) * 1000:7.1f} ms   "
+          f"p99 {percentile(latencies, 0.99) * 1000:7.1f} ms   max {(latencies[-1] if latencies else 0) * 1000:7.1f} ms")
+    if fabric is not None:
+        print(f"Верных       {check(fabric, results)} из {len(results)}   SSH-подключений {pool.connects} "
+              f"(сессии переиспользуются между запросами)")
+        smoke(url, fabric, queries)
+    for error in errors[:5]:
+        print(f"  {error}")
+
+
+if __name__ == '__main__':
+    main()
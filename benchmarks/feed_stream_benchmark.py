@@ -0,0 +1,89 @@
+#- Benchmark: пиковая память и время разбора базы входов (UTF-16LE JSON)
+#- Запуск: python benchmarks/feed_stream_benchmark.py [размер базы, МБ]   (по умолчанию 500)
+#- Синтетическая база пишется во временный файл; каждый способ разбора запускается
+#- в отдельном процессе, чтобы ru_maxrss относился только к нему
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'func'))
+
+CHUNK_SIZE = 1 << 16
+
+
+def build_feed(path, size_mb):  # Массив {Key: логин, Value: {АРМ: время входа}} нужного размера
+    target = size_mb * 1024 * 1024
+    count = 0
+    with open(path, 'wb') as f:
+        f.write('\ufeff['.encode('utf-16-le'))
+        written = 4
+        while written < target:
+            item = {'Key': f"user{count:07d}", 'Value': {f"PC-{count % 5000:05d}": '25.11.2024 9:15:00', f"PC-{(count + 7) % 5000:05d}": 'Mon 11/25/2024 09:15:00'}}
+            data = (',' if count else '') + json.dumps(item, ensure_ascii=False)
+            encoded = data.encode('utf-16-le')
+            f.write(encoded)
+            written += len(encoded)
+            count += 1
+        f.write(']'.encode('utf-16-le'))
+    return count
+
+
+def file_chunks(path):
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            yield chunk
+
+
+def run_method(method, path, key):
+    from json_stream import iter_json_array
+    from logon_time_function import latest_logon, latest_logon_text, parse_logon_time
+    if method == 'json.loads':  # Прежний способ: байты + строка + все дерево объектов одновременно
+        with open(path, 'rb') as f:
+            data = json.loads(f.read().decode('utf-16LE').lstrip('\ufeff'))
+        found = next((item for item in data if item.get('Key') == key), None)
+        return latest_logon(found['Value']) if found else None
+    if method == 'stream-index':    # Индекс за один проход, как FeedCache: (АРМ, строка времени) на ключ, datetime - при запросе
+        index = {}
+        for item in iter_json_array(file_chunks(path)):
+            if item['Key'] not in index:
+                index[item['Key']] = latest_logon_text(item['Value'])
+        found = index.get(key)
+        return (found[0], parse_logon_time(found[1])) if found else None
+    if method == 'stream-scan':     # Без индекса: чтение до первого совпадения
+        for item in iter_json_array(file_chunks(path)):
+            if item['Key'] == key:
+                return latest_logon(item['Value'])
+        return None
+
+
+def child(method, path, key):
+    start = time.perf_counter()
+    result = run_method(method, path, key)
+    elapsed = time.perf_counter() - start
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{method:<14} time {elapsed:8.2f} s   peak RSS {rss_mb:9.1f} MB   result {result}")
+
+
+def main():
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    fd, path = tempfile.mkstemp(suffix='.json')
+    os.close(fd)
+    try:
+        count = build_feed(path, size_mb)
+        print(f"База {os.path.getsize(path) / 1024 / 1024:.0f} МБ, {count} записей")
+        key = f"user{count // 2:07d}"   # Ключ в середине базы
+        for method in ('json.loads', 'stream-index', 'stream-scan'):
+            subprocess.run([sys.executable, os.path.abspath(__file__), '--child', method, path, key], check=False)
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        child(*sys.argv[2:5])
+    else:
+        main()
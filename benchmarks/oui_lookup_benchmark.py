@@ -0,0 +1,56 @@
+#- Benchmark: загрузка локальной базы OUI и поиск производителя по MAC
+#- Запуск: python benchmarks/oui_lookup_benchmark.py [число запросов]   (по умолчанию 100000)
+#- Реестры MA-L / MA-M / MA-S генерируются синтетически в объеме, близком к реальному (~50 тыс. префиксов)
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'func'))
+
+from oui_database import parse_registry, build_database, OuiDatabase
+
+HEADER = 'Registry,Assignment,Organization Name,Organization Address\n'
+
+
+def synthetic_registry(registry, length, count, rng):
+    lines = [HEADER]
+    for number in range(count):
+        assignment = f"{rng.getrandbits(length * 4):0{length}X}"
+        lines.append(f'{registry},{assignment},"Vendor {registry} {number} Ltd.","Street {number} City RU"\n')
+    return io.StringIO(''.join(lines))
+
+
+def main():
+    queries = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rng = random.Random(1)
+    records = []
+    for registry, length, count in (('MA-L', 6, 38000), ('MA-M', 7, 6000), ('MA-S', 9, 6500)):
+        records.extend(parse_registry(synthetic_registry(registry, length, count, rng)))
+    fd, path = tempfile.mkstemp(suffix='.bin')
+    os.close(fd)
+    try:
+        start = time.perf_counter()
+        build_database(records, path)
+        print(f"Сборка      {time.perf_counter() - start:8.3f} s   {os.path.getsize(path) / 1024:.0f} КБ, {len(records)} префиксов")
+        start = time.perf_counter()
+        database = OuiDatabase(path)
+        print(f"Загрузка    {(time.perf_counter() - start) * 1000:8.3f} ms")
+        known = [assignment + '0' * (12 - len(assignment)) for assignment, _, _ in records]
+        macs = [':'.join(mac[i:i + 2] for i in range(0, 12, 2)) for mac in
+                (rng.choice(known) if rng.random() < 0.8 else f"{rng.getrandbits(48):012x}" for _ in range(queries))]
+        start = time.perf_counter()
+        found = sum(database.lookup(mac) is not None for mac in macs)
+        elapsed = time.perf_counter() - start
+        print(f"Поиск       {elapsed / queries * 1e6:8.3f} us на запрос   найдено {found} из {queries}")
+        start = time.perf_counter()
+        database.lookup_many(macs)
+        print(f"Пакетно     {(time.perf_counter() - start) * 1000:8.3f} ms на {queries} MAC")
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+#- Benchmark: разбор таблиц MAC / ARP / LLDP прежним построчным способом и табличными парсерами parse_tables_function
+#- Запуск: python benchmarks/parser_benchmark.py [вендор:таблица:файл ...]
+#- Без аргументов - синтетический вывод Eltex, Vector и QTECH на 1k-200k строк;
+#- с аргументами - снятый с коммутатора вывод, например Eltex:mac:show_mac_add.txt (таблицы mac, arp, lldp).
+#- Прежний способ не проверяет поля, поэтому принимает за запись и посторонние строки (приглашение sw101# в LLDP) -
+#- такие случаи отмечаются как расхождение
+import os
+import re
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'func'))
+
+from parse_tables_function import parse_mac_table, parse_arp_table, parse_lldp_table, normalize_mac
+
+SIZES = (1000, 10000, 50000, 200000)
+
+
+def synthetic(vendor, table, lines):    # QTECH выдает таблицы в формате Vector
+    rows = []
+    for number in range(lines):
+        mac = ':'.join(f"{(number >> shift) & 0xff:02x}" for shift in (40, 32, 24, 16, 8, 0))
+        ip = f"10.{number >> 16 & 0xff}.{number >> 8 & 0xff}.{number & 0xff}"
+        if vendor == 'Eltex':
+            port = f"gi1/0/{number % 48 + 1}"
+            if table == 'mac':
+                rows.append(f"  {number % 4094 + 1:<6}   {mac}   {port:<10} dynamic")
+            elif table == 'arp':
+                rows.append(f" vlan {number % 4094 + 1:<4} {port:<10} {ip:<15}   {mac}   dynamic")
+            else:
+                rows.append(f"{port:<9} {mac}  gi1/0/{number % 52 + 1:<6} sw{number:<8} B, R   105")
+        else:
+            mac = mac.replace(':', '-')
+            port = f"Ethernet1/0/{number % 48 + 1}" if vendor == 'Vector' else f"Ethernet1/{number % 48 + 1}"
+            if table == 'mac':
+                rows.append(f"{number % 4094 + 1:<4} {mac:<27} DYNAMIC Hardware {port}")
+            elif table == 'arp':
+                rows.append(f"{ip:<16} {mac} Vlan{number % 4094 + 1:<12} {port:<16} Dynamic 1180")
+            else:
+                rows.append(f"{port:<14} {mac}  gi1/0/{number % 52 + 1:<8} sw{number}")
+    header = {'mac': 'Vlan  Mac Address  Port  Type', 'arp': 'VLAN  Interface  IP address  HW address  status',
+              'lldp': 'Port  Device ID  Port ID  System Name  Capabilities  TTL'}[table]
+    return header + '\n' + '\n'.join(rows) + '\nsw101#'
+
+
+def legacy(output_loc, vendor, table):  # Прежний разбор: split('\n'), проверки подстрок, поля parts[N]
+    entries = []
+    for line in output_loc.split('\n'):
+        if table == 'mac':
+            marker = 'DYN' if vendor == 'Vector' else 'dyn'
+            port_index = 4 if vendor == 'Vector' else 2
+            if marker not in line:
+                continue
+            mac_loc = re.search(r'(?:[0-9A-Fa-f]{2}[:-]){5}[0-9A-Fa-f]{2}', line)
+            parts = line.split()
+            if mac_loc is not None and len(parts) > port_index:
+                entries.append((parts[0], normalize_mac(mac_loc.group()), parts[port_index]))
+        elif table == 'arp':
+            if 'vlan' in line:
+                parts = line.split()
+                entries.append((parts[3], parts[4]))
+            elif 'Vlan' in line:
+                parts = line.split()
+                entries.append((parts[0], parts[1].replace('-', ':')))
+        else:
+            parts = line.split()
+            neighbor = re.search(r'[sS][wW]\d+', line)
+            if parts and neighbor is not None:
+                entries.append((parts[0], neighbor.group()))
+    return entries
+
+
+def structured(output_loc, vendor, table):
+    if table == 'mac':
+        return parse_mac_table(output_loc, vendor)
+    if table == 'arp':
+        return parse_arp_table(output_loc, vendor)
+    return parse_lldp_table(output_loc, vendor)
+
+
+def measure(function, *args):
+    best = None
+    for _ in range(3):
+        start = time.perf_counter()
+        result = function(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def report(label, output_loc, vendor, table):
+    legacy_time, legacy_result = measure(legacy, output_loc, vendor, table)
+    new_time, new_result = measure(structured, output_loc, vendor, table)
+    status = 'совпадает' if legacy_result == new_result else f"РАСХОЖДЕНИЕ ({len(legacy_result)} / {len(new_result)} записей)"
+    print(f"{label:<28} прежний {legacy_time * 1000:9.1f} ms   табличный {new_time * 1000:9.1f} ms "
+          f"({new_time / max(output_loc.count(chr(10)), 1) * 1e6:4.1f} us/строка)   {len(new_result)} записей, {status}")
+
+
+def main():
+    if len(sys.argv) > 1:
+        for argument in sys.argv[1:]:
+            vendor, table, path = argument.split(':', 2)
+            with open(path, encoding='utf-8', errors='replace') as f:
+                report(f"{vendor} {table} {os.path.basename(path)}", f.read(), vendor, table)
+        return
+    for lines in SIZES:
+        for name, vendor in (('Eltex', 'Eltex'), ('Vector', 'Vector'), ('QTECH', 'Vector')):
+            for table in ('mac', 'arp', 'lldp'):
+                report(f"{name} {table} {lines}", synthetic(name, table, lines), vendor, table)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,343 @@
+#- Модель сети коммутаторов для нагрузочных тестов и benchmark'ов: ядро и коммутаторы доступа Eltex, Vector и QTECH
+#- Ответы на команды профилей vendor_profiles в форматах этих производителей, таблицы MAC, ARP, LLDP и состав LAG.
+#- SwitchTerminal - сеанс CLI одного подключения: постраничный вывод до отключения, задержка и разброс ответа.
+#- SimulatedPool - пул SSH-сессий без сети: канал на socketpair; ssh_fabric_server - тот же терминал за настоящим SSH.
+#- Топология задается параметрами SimulatedFabric или файлом JSON (SimulatedFabric.load):
+#-   {"switches": 20, "hosts_per_switch": 40, "unmanaged": 2, "unmanaged_hosts": 4, "table_size": 0, "seed": 1,
+#-    "latency_ms": {"sw7": [40, 10]}}     - RTT и разброс отдельных коммутаторов, мс
+import json
+import queue
+import random
+import re
+import socket
+import threading
+import time
+
+PORT_NUMBER_RE = re.compile(r'\d+(?:/\d+)*')
+MODELS = {'Eltex': ('MES2324', 'gi1/0/{}', 24), 'Vector': ('Vector-2028', 'Ethernet1/0/{}', 28), 'QTECH': ('QSW-4610-28T', 'Ethernet1/{}', 28)}
+CORE_MODEL = ('MES2348B', 'gi1/0/{}', 48)   # Ядро: 48 портов к коммутаторам доступа
+DISABLE_PAGING = ('terminal datadump', 'terminal length 0')
+PAGE_LINES = 24     # Строк на страницу, пока постраничный вывод не отключен
+MORE_PROMPT = '--More-- '
+
+
+def dashed(mac_loc):
+    return mac_loc.replace(':', '-')
+
+
+class SimulatedSwitch:
+    def __init__(self, name, vendor, chassis):
+        self.name = name
+        self.vendor = vendor    # Eltex, Vector или QTECH (синтаксис и форматы QTECH - как у Vector)
+        self.model, self.port_format, self.uplink = MODELS[vendor]   # Аплинк - последний порт, к хостам - остальные
+        self.chassis = chassis
+        self.macs = {}          # mac -> (порт, vlan)
+        self.neighbors = {}     # локальный порт -> (коммутатор, его порт)
+        self.lags = {}          # LAG -> [порты]
+        self.rtt = None         # Задержка и разброс ответа этого коммутатора, сек; None - общие значения
+        self.jitter = None
+
+    @property
+    def syntax(self):
+        return 'Eltex' if self.vendor == 'Eltex' else 'Vector'
+
+    def port(self, number):
+        return self.port_format.format(number)
+
+
+class SimulatedFabric:  # Ядро sw1 и коммутаторы доступа sw2..swN; часть аплинков ядра - LAG из двух портов
+    # Порты ядра выдаются подряд, каждому коммутатору доступа свои: нечетным - LAG из двух портов, четным - один порт
+    # На первых unmanaged портах каждого коммутатора доступа - неуправляемый коммутатор с unmanaged_hosts устройствами,
+    # остальные устройства - по одному на порт (по кругу, если устройств больше портов).
+    # table_size - дополнительные записи в таблице MAC каждого коммутатора (адреса за аплинком), для объема вывода
+    def __init__(self, switches=20, hosts_per_switch=40, seed=1, unmanaged=2, unmanaged_hosts=4, table_size=0):
+        rng = random.Random(seed)
+        self.switches = {}
+        self.hosts = {}     # mac -> (коммутатор, порт, vlan, ip)
+        self.traffic = {}   # коммутатор -> [байт принято, байт отправлено, команд]
+        self._traffic_lock = threading.Lock()
+        core = self._add('sw1', 'Eltex', rng)
+        core.model, core.port_format, core_size = CORE_MODEL
+        vendors = ('Eltex', 'Vector', 'QTECH')
+        next_port = 1
+        for number in range(2, switches + 1):
+            switch = self._add(f"sw{number}", vendors[number % 3], rng)
+            uplink = switch.port(switch.uplink)
+            count = 2 if number % 2 else 1
+            if next_port + count - 1 > core_size:
+                raise ValueError(f"На ядре {core.model} {core_size} портов - коммутаторов доступа не больше {number - 2}")
+            core_ports = [core.port(next_port + offset) for offset in range(count)]
+            next_port += count
+            for core_port in core_ports:
+                core.neighbors[core_port] = (switch.name, uplink)
+            switch.neighbors[uplink] = ('sw1', core_ports[0])
+            core_uplink = f"Po{number}" if len(core_ports) > 1 else core_ports[0]
+            if len(core_ports) > 1:
+                core.lags[core_uplink] = core_ports
+            shared = min(unmanaged, switch.uplink - 2) * unmanaged_hosts
+            for host in range(hosts_per_switch):
+                mac = ':'.join(f"{byte:02x}" for byte in [0xa8, 0xf9, 0x4b, number, host >> 8, host & 0xff])
+                vlan = str(10 + host % 4)
+                ip = f"10.{number}.{host >> 8}.{host & 0xff}"
+                if host < shared:
+                    port = switch.port(host // unmanaged_hosts + 1)
+                else:
+                    first = shared // unmanaged_hosts
+                    port = switch.port(first + (host - shared) % (switch.uplink - 1 - first) + 1)
+                switch.macs[mac] = (port, vlan)
+                core.macs[mac] = (core_uplink, vlan)
+                self.hosts[mac] = (switch.name, port, vlan, ip)
+            self._fill(switch, table_size, [uplink], rng)
+        members = {port for ports in core.lags.values() for port in ports}
+        self._fill(core, table_size, list(core.lags) + [port for port in core.neighbors if port not in members], rng)
+        self.arp = {ip: (mac, vlan, core.macs[mac][0]) for mac, (_, _, vlan, ip) in self.hosts.items()}
+
+    @classmethod
+    def load(cls, path):    # Топология из файла JSON (формат - в заголовке модуля)
+        with open(path, encoding='utf-8') as f:
+            config = json.load(f)
+        latency = config.pop('latency_ms', {})
+        fabric = cls(**config)
+        for name, (rtt, jitter) in latency.items():
+            fabric.set_latency(name, rtt / 1000, jitter / 1000)
+        return fabric
+
+    def _fill(self, switch, size, ports, rng):     # Посторонние адреса в таблице MAC: только объем вывода полных таблиц
+        for _ in range(size if ports else 0):
+            mac = ':'.join(f"{byte:02x}" for byte in [0x02] + [rng.getrandbits(8) for _ in range(5)])
+            switch.macs.setdefault(mac, (rng.choice(ports), str(rng.randint(100, 199))))
+
+    def set_latency(self, name, rtt, jitter=0.0):
+        self.switches[name].rtt = rtt
+        self.switches[name].jitter = jitter
+
+    def count(self, name, received, sent, commands):
+        with self._traffic_lock:
+            totals = self.traffic.setdefault(name, [0, 0, 0])
+            totals[0] += received
+            totals[1] += sent
+            totals[2] += commands
+
+    def reset_traffic(self):
+        with self._traffic_lock:
+            self.traffic = {}
+
+    def _add(self, name, vendor, rng):
+        switch = SimulatedSwitch(name, vendor, ':'.join(f"{rng.getrandbits(8):02x}" for _ in range(6)))
+        self.switches[name] = switch
+        return switch
+
+    def banner(self, name):
+        return f"\r\n\r\nUser Access Verification\r\n\r\n{name}#"
+
+    def respond(self, name, command):   # Вывод команды без эха и приглашения
+        switch = self.switches[name]
+        words = command.split()
+        if command in DISABLE_PAGING:
+            return ''
+        if command == 'show ver':
+            if switch.syntax == 'Eltex':
+                return f"Active-image: flash://system/images/image1.bin\r\n  Version: 4.0.15.4\r\n  MES Model: {switch.model}"
+            return f"{switch.model} Device, Compiled on Jan 01 2023\r\n  SoftWare Version 7.0.3.5(R0241.0188)\r\n  {switch.vendor} Networks"
+        if switch.syntax == 'Eltex':
+            return self._eltex(switch, command, words)
+        return self._vector(switch, command, words)
+
+    def _mac_rows(self, switch, entries):
+        if switch.syntax == 'Eltex':
+            rows = [f"  {vlan:<6}  {mac}   {port:<10} dynamic" for mac, (port, vlan) in entries]
+            return "\r\n  Vlan        Mac Address         Port       Type\r\n-------- --------------------- ---------- ----------\r\n" + '\r\n'.join(rows)
+        rows = [f"{vlan:<4} {dashed(mac):<27} DYNAMIC Hardware {port}" for mac, (port, vlan) in entries]
+        return "Read mac address table....\r\nVlan Mac Address                 Type    Creator   Ports\r\n" + '\r\n'.join(rows)
+
+    def _arp_rows(self, switch, entries):
+        if switch.syntax == 'Eltex':
+            return '\r\n'.join(f" vlan {vlan:<4} {port:<10} {ip:<15}   {mac}   dynamic" for ip, (mac, vlan, port) in entries)
+        return '\r\n'.join(f"{ip:<16} {dashed(mac)} Vlan{vlan:<12} {port:<16} Dynamic 1180" for ip, (mac, vlan, port) in entries)
+
+    def _lldp_rows(self, switch, ports):
+        if switch.syntax == 'Eltex':
+            rows = [f"{port:<9} {self.switches[remote].chassis}  {remote_port:<10} {remote:<8} B, R   105"
+                    for port, (remote, remote_port) in ports]
+        else:
+            rows = [f"{port:<14} {dashed(self.switches[remote].chassis)}  {remote_port:<12} {remote}" for port, (remote, remote_port) in ports]
+        return '\r\n'.join(rows)
+
+    def _eltex(self, switch, command, words):
+        arp = self.arp if switch.name == 'sw1' else {}
+        if command.startswith('show mac address-table address '):
+            return self._mac_rows(switch, [(mac, entry) for mac, entry in switch.macs.items() if mac == words[-1].lower()])
+        if command.startswith('show mac add int '):
+            return self._mac_rows(switch, [(mac, entry) for mac, entry in switch.macs.items() if entry[0] == words[-1]])
+        if command == 'show mac add':
+            return self._mac_rows(switch, switch.macs.items())
+        if command.startswith('show arp ip-address '):
+            return self._arp_rows(switch, [(ip, entry) for ip, entry in arp.items() if ip == words[-1]])
+        if command.startswith('show arp mac-address '):
+            return self._arp_rows(switch, [(ip, entry) for ip, entry in arp.items() if entry[0] == words[-1].lower()])
+        if command == 'show arp':
+            return self._arp_rows(switch, arp.items())
+        if command == 'show lldp neighbors':
+            return self._lldp_rows(switch, switch.neighbors.items())
+        if command.startswith('show lldp neighbors '):
+            return self._lldp_rows(switch, [(port, entry) for port, entry in switch.neighbors.items() if port == words[-1]])
+        if command.startswith('show interface channel-group '):
+            lag = f"Po{words[-1]}"
+            return f"Load balancing: src-dst-mac-ip.\r\n\r\nGr      Ports\r\n------- ---------\r\n{lag}     Active: {','.join(switch.lags.get(lag, []))}"
+        return "% Unrecognized command"
+
+    def _vector(self, switch, command, words):
+        if command.startswith('show mac-address-table address '):
+            return self._mac_rows(switch, [(mac, entry) for mac, entry in switch.macs.items() if dashed(mac) == words[-1].lower()])
+        if command.startswith('show mac-address-table int '):
+            return self._mac_rows(switch, [(mac, entry) for mac, entry in switch.macs.items() if entry[0] == words[-1]])
+        if command == 'show mac-address-table':
+            return self._mac_rows(switch, switch.macs.items())
+        if command.startswith('show arp'):
+            return self._arp_rows(switch, [])
+        if command == 'show lldp neighbors brief':
+            return self._lldp_rows(switch, switch.neighbors.items())
+        if command.startswith('show lldp neighbors interface ethernet '):
+            if len(words) != 6 or not PORT_NUMBER_RE.fullmatch(words[-1]):   # Только номер порта (1/0/25), как на коммутаторе
+                return "% Invalid input detected"
+            port = f"Ethernet{words[-1]}"
+            return '\r\n'.join(f"Port ID: {remote_port}\r\nSystem Name: {remote}" for local, (remote, remote_port) in switch.neighbors.items() if local == port)
+        if command.startswith('show interface port-channel '):
+            lag = f"Port-channel{words[-1]}"
+            return f"{lag} is up, line protocol is up\r\n  {' '.join(switch.lags.get(lag, []))}"
+        return "% Unrecognized command"
+
+
+class SwitchTerminal:   # Сеанс CLI одного подключения: ввод по строкам, эхо команды, приглашение, постраничный вывод
+    # Ответ на одну запись клиента уходит одним блоком через задержку: RTT + обработка каждой команды + разброс.
+    # Пока постраничный вывод не отключен, длинный вывод делится на страницы с --More--; следующая строка ввода -
+    # нажатие клавиши, а не команда (как на коммутаторе, если в конвейере забыли отключить постраничный вывод)
+    def __init__(self, fabric, name, send, rtt=0.005, per_command=0.001, jitter=0.0):
+        switch = fabric.switches[name]
+        self.fabric = fabric
+        self.name = name
+        self.send = send    # send(bytes) - запись в сторону клиента
+        self.rtt = switch.rtt if switch.rtt is not None else rtt
+        self.per_command = per_command
+        self.jitter = switch.jitter if switch.jitter is not None else jitter
+        self.paging = True
+        self._pages = []
+        self._buffer = ''
+        self._lock = threading.Lock()
+        self._replies = queue.Queue()   # (срок, ответ): ответы уходят строго по порядку записей
+        threading.Thread(target=self._deliver, daemon=True).start()
+        self._replies.put((0, self.fabric.banner(name)))
+
+    def _deliver(self):
+        while True:
+            due, reply = self._replies.get()
+            if reply is None:
+                return
+            time.sleep(max(due - time.monotonic(), 0))
+            try:
+                self.send(reply.encode())
+            except OSError:
+                return
+
+    def _execute(self, line):
+        if self._pages:     # Любая клавиша на --More-- - следующая страница
+            return '\r' + ' ' * len(MORE_PROMPT) + '\r' + self._pages.pop(0)
+        command = line.strip()
+        if command in DISABLE_PAGING:
+            self.paging = False
+        output = self.fabric.respond(self.name, command) if command else ''
+        lines = output.split('\r\n')
+        if not self.paging or len(lines) <= PAGE_LINES:
+            return f"{line}\r\n{output}\r\n{self.name}#"
+        pages = ['\r\n'.join(lines[start:start + PAGE_LINES]) for start in range(0, len(lines), PAGE_LINES)]
+        self._pages = [page + '\r\n' + MORE_PROMPT for page in pages[1:-1]] + [f"{pages[-1]}\r\n{self.name}#"]
+        return f"{line}\r\n{pages[0]}\r\n{MORE_PROMPT}"
+
+    def feed(self, data):   # Запись клиента: выполнение полных строк и постановка ответа в очередь
+        with self._lock:
+            self._buffer += data
+            lines = self._buffer.split('\n')
+            self._buffer = lines.pop()
+            if not lines:
+                return
+            reply = ''.join(self._execute(line.rstrip('\r')) for line in lines)
+            delay = self.rtt + self.per_command * len(lines) + random.uniform(0, self.jitter)
+            self._replies.put((time.monotonic() + delay, reply))
+        self.fabric.count(self.name, len(data.encode()), len(reply.encode()), len(lines))
+
+    def close(self):
+        self._replies.put((0, None))
+
+
+class SimulatedChannel:     # Канал SSH поверх socketpair: select работает, ответ на запись приходит через задержку
+    def __init__(self, fabric, name, rtt=0.005, per_command=0.001, jitter=0.0):
+        self.closed = False
+        self.writes = 0
+        self._local, self._remote = socket.socketpair()
+        self.terminal = SwitchTerminal(fabric, name, self._remote.sendall, rtt, per_command, jitter)
+
+    def fileno(self):
+        return self._local.fileno()
+
+    def recv_ready(self):
+        self._local.setblocking(False)
+        try:
+            return bool(self._local.recv(1, socket.MSG_PEEK))
+        except BlockingIOError:
+            return False
+        finally:
+            self._local.setblocking(True)
+
+    def recv(self, size):
+        return self._local.recv(size)
+
+    def send(self, data):
+        self.writes += 1
+        self.terminal.feed(data)
+        return len(data)
+
+    def close(self):
+        self.closed = True
+        self.terminal.close()
+        self._local.close()
+        self._remote.close()
+
+
+class SimulatedClient:
+    def __init__(self, channel):
+        self.channel = channel
+
+    def get_transport(self):
+        return self
+
+    def is_active(self):
+        return not self.channel.closed
+
+    def close(self):
+        self.channel.close()
+
+
+class SimulatedPool:    # Заменяет SshSessionPool: connect открывает канал к модели коммутатора с задержкой установления сессии
+    def __init__(self, fabric, rtt=0.005, per_command=0.001, jitter=0.0, connect_time=0.05):
+        from ssh_session_pool import SshSessionPool
+        self.fabric = fabric
+        self.options = (rtt, per_command, jitter)
+        self.connect_time = connect_time
+        self.connects = 0
+        self._pool = SshSessionPool(idle_timeout=3600, keepalive=0)
+        self._pool.connect = self._connect
+
+    def _connect(self, hostname, port, username, password, timeout=30, encoding='utf-8'):
+        from ssh_reader import read_until_prompt, learn_prompt
+        if hostname not in self.fabric.switches:
+            raise ConnectionError(f"{hostname}: имя не разрешается в IP")
+        time.sleep(self.connect_time)
+        self.connects += 1
+        channel = SimulatedChannel(self.fabric, hostname, *self.options)
+        session = self._pool.add(hostname, SimulatedClient(channel), channel)
+        session.banner = read_until_prompt(channel, None, timeout, encoding)
+        session.prompt = learn_prompt(session.banner)
+        return session
+
+    def __getattr__(self, name):    # acquire, checkout, release, discard, close_all - от настоящего пула
+        return getattr(self._pool, name)
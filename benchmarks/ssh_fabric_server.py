@@ -0,0 +1,151 @@
+#- SSH-сервер модели сети коммутаторов (серверная сторона paramiko): каждый коммутатор simulated_fabric слушает свой
+#- адрес 127.0.0.N на общем порту, поэтому настоящий SshSessionPool подключается без изменений - адрес по имени
+#- отдает FabricResolver вместо DNS. Приглашения, постраничный вывод (--More--), форматы таблиц Eltex/Vector/QTECH,
+#- задержка и разброс ответа - SwitchTerminal из simulated_fabric. Адреса 127.0.0.0/8 доступны на lo без настройки в Linux
+#- Запуск отдельно: python benchmarks/ssh_fabric_server.py [--switches 20] [--port 2222] [--topology fabric.json]
+#- выводит строки для /etc/hosts; с port = 2222 в config.ini findPort.py работает с моделью как с сетью
+import argparse
+import os
+import socket
+import sys
+import threading
+
+import paramiko
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'func'))
+
+from simulated_fabric import SimulatedFabric, SwitchTerminal
+
+
+class FabricResolver:   # Замена DnsResolver для SshSessionPool: имя коммутатора -> адрес его SSH-сервера
+    def __init__(self, addresses):
+        self.addresses = addresses
+
+    def resolve(self, name):
+        return self.addresses.get(name)
+
+
+class SwitchInterface(paramiko.ServerInterface):   # Вход по паролю, pty и shell - как у коммутатора
+    def __init__(self, username, password):
+        self.username = username
+        self.password = password
+        self.shell = threading.Event()
+
+    def check_channel_request(self, kind, chanid):
+        return paramiko.OPEN_SUCCEEDED if kind == 'session' else paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+    def get_allowed_auths(self, username):
+        return 'password'
+
+    def check_auth_password(self, username, password):
+        return paramiko.AUTH_SUCCESSFUL if (username, password) == (self.username, self.password) else paramiko.AUTH_FAILED
+
+    def check_channel_pty_request(self, channel, term, width, height, pixelwidth, pixelheight, modes):
+        return True
+
+    def check_channel_shell_request(self, channel):
+        self.shell.set()
+        return True
+
+
+class FabricSshServer:  # SSH-серверы всех коммутаторов модели; start() -> self, stop() закрывает слушающие сокеты и сессии
+    def __init__(self, fabric, port=0, username='admin', password='admin', rtt=0.005, per_command=0.001, jitter=0.0,
+                 host_key=None):
+        self.fabric = fabric
+        self.port = port    # 0 - свободный порт, выбранный для первого коммутатора
+        self.username = username
+        self.password = password
+        self.options = (rtt, per_command, jitter)
+        self.host_key = host_key or paramiko.RSAKey.generate(2048)
+        self.addresses = {}     # коммутатор -> адрес
+        self.connects = 0
+        self._listeners = []
+        self._transports = []
+        self._lock = threading.Lock()
+
+    def start(self):
+        for number, name in enumerate(self.fabric.switches, 1):
+            address = f"127.0.{number >> 8}.{number & 0xff}"
+            listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            listener.bind((address, self.port))
+            listener.listen(64)
+            self.port = listener.getsockname()[1]
+            self.addresses[name] = address
+            self._listeners.append(listener)
+            threading.Thread(target=self._accept, args=(listener, name), daemon=True).start()
+        return self
+
+    def _accept(self, listener, name):
+        while True:
+            try:
+                client, _ = listener.accept()
+            except OSError:     # Сокет закрыт в stop()
+                return
+            threading.Thread(target=self._serve, args=(client, name), daemon=True).start()
+
+    def _serve(self, client, name):
+        transport = paramiko.Transport(client)
+        transport.add_server_key(self.host_key)
+        with self._lock:
+            self._transports.append(transport)
+        interface = SwitchInterface(self.username, self.password)
+        terminal = None
+        try:
+            transport.start_server(server=interface)
+            channel = transport.accept(30)
+            if channel is None or not interface.shell.wait(30):
+                return
+            with self._lock:
+                self.connects += 1
+            terminal = SwitchTerminal(self.fabric, name, channel.sendall, *self.options)
+            while True:
+                data = channel.recv(65536)
+                if not data:
+                    return
+                terminal.feed(data.decode('utf-8', errors='replace'))
+        except (paramiko.SSHException, EOFError, OSError):
+            return
+        finally:
+            if terminal is not None:
+                terminal.close()
+            transport.close()
+            with self._lock:
+                self._transports.remove(transport)
+
+    def stop(self):
+        for listener in self._listeners:
+            listener.close()
+        with self._lock:
+            transports = list(self._transports)
+        for transport in transports:
+            transport.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SSH-сервер модели сети коммутаторов')
+    parser.add_argument('--topology', help='файл JSON с топологией (см. simulated_fabric)')
+    parser.add_argument('--switches', type=int, default=20)
+    parser.add_argument('--hosts', type=int, default=40, help='устройств на коммутаторе доступа')
+    parser.add_argument('--port', type=int, default=2222)
+    parser.add_argument('--username', default='admin')
+    parser.add_argument('--password', default='admin')
+    parser.add_argument('--rtt-ms', type=float, default=5.0)
+    parser.add_argument('--command-ms', type=float, default=1.0, help='обработка одной команды коммутатором')
+    parser.add_argument('--jitter-ms', type=float, default=1.0)
+    args = parser.parse_args()
+
+    fabric = SimulatedFabric.load(args.topology) if args.topology else SimulatedFabric(args.switches, args.hosts)
+    server = FabricSshServer(fabric, args.port, args.username, args.password,
+                             args.rtt_ms / 1000, args.command_ms / 1000, args.jitter_ms / 1000).start()
+    print(f"# Порт {server.port}, вход {args.username}/{args.password}; строки для /etc/hosts:")
+    for name, address in server.addresses.items():
+        print(f"{address}\t{name}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+#- Benchmark: чтение вывода коммутатора старым циклом recv_ready() и новым ssh_reader.read_until_prompt
+#- Запуск: python benchmarks/ssh_reader_benchmark.py [число строк] [задержка первого байта, мс]
+#- Коммутатор эмулируется парой сокетов: поток отдает MAC-таблицу блоками по 1 КБ
+import os
+import socket
+import sys
+import threading
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'func'))
+
+from ssh_reader import read_until_prompt, learn_prompt
+
+PROMPT = 'sw101#'
+
+
+class SocketChannel:    # Минимальный аналог paramiko.Channel поверх сокета
+    def __init__(self, sock):
+        self.sock = sock
+        self.sock.setblocking(False)
+
+    def recv_ready(self):
+        try:
+            return len(self.sock.recv(1, socket.MSG_PEEK)) > 0
+        except BlockingIOError:
+            return False
+
+    def recv(self, size):
+        return self.sock.recv(size)
+
+    def send(self, data):
+        return self.sock.send(data.encode())
+
+    def fileno(self):
+        return self.sock.fileno()
+
+
+def build_output(lines):
+    rows = [f" {1 + i % 4000:<5} {i >> 16 & 0xff:02x}:{i >> 8 & 0xff:02x}:{i & 0xff:02x}:aa:bb:cc   gi1/0/{1 + i % 48:<4} dynamic  Коммутатор" for i in range(lines)]
+    return ('\r\n'.join(rows) + '\r\n' + PROMPT).encode('utf-8')
+
+
+def feed(sock, payload, delay):
+    time.sleep(delay)
+    for offset in range(0, len(payload), 1024):    # Блоки по 1 КБ режут многобайтовые символы на границах
+        sock.sendall(payload[offset:offset + 1024])
+
+
+def legacy_read(channel):   # Цикл из findPort.py до перехода на ssh_reader
+    output = ''
+    while True:
+        if channel.recv_ready():
+            output += channel.recv(1024).decode('utf-8', errors='replace')
+            if output.endswith('#') or output.endswith('>'):
+                break
+    return output
+
+
+def measure(name, reader, payload, delay):
+    switch_side, client_side = socket.socketpair()
+    channel = SocketChannel(client_side)
+    writer = threading.Thread(target=feed, args=(switch_side, payload, delay))
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    writer.start()
+    output = reader(channel)
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    writer.join()
+    switch_side.close()
+    client_side.close()
+    broken = output.count('�')
+    print(f"{name:<20} latency {wall * 1000:9.1f} ms   cpu {cpu * 1000:9.1f} ms   chars {len(output):>10}   broken chars {broken}")
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    delay = (int(sys.argv[2]) if len(sys.argv) > 2 else 500) / 1000
+    payload = build_output(lines)
+    print(f"{lines} строк, {len(payload)} байт, задержка ответа коммутатора {delay * 1000:.0f} ms")
+    measure('legacy recv loop', legacy_read, payload, delay)
+    measure('read_until_prompt', lambda channel: read_until_prompt(channel, learn_prompt(PROMPT), 60), payload, delay)
+
+
+if __name__ == '__main__':
+    main()
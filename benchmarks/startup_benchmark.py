@@ -0,0 +1,118 @@
+#- Benchmark запуска findPort.py: время до готовности к первому поиску и импорты по python -X importtime
+#- Запуск: python benchmarks/startup_benchmark.py [--runs 10] [--budget-ms 100] [--top 15]
+#- findPort.py запускается во временном каталоге с настройками config.ini по умолчанию (файлы кэшей внутри
+#- каталога, func - ссылка на каталог репозитория). Два режима: интерактивный - время до приглашения ввода,
+#- после него отправляется q; пакетный - полный запуск с пустым списком (обертки и скрипты). Код возврата 1,
+#- если медиана любого режима больше бюджета или в любом режиме загрузился модуль, который должен загружаться
+#- только при первом обращении к своей подсистеме (LAZY_MODULES)
+import argparse
+import configparser
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+LAZY_MODULES = ('paramiko', 'cryptography', 'ldap3', 'requests', 'urllib3', 'urllib.request', 'http.server',
+                'mac_index_crawler', 'api_server')
+IMPORT_RE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+FAILED_MARK = 'Запуск Невозможен'
+PROMPT_MARK = 'Введите HostName'
+MODES = {'interactive': (), 'batch': ('--batch', '-')}
+
+
+def prepare(directory):     # Рабочий каталог запуска: config.ini из репозитория, файлы кэшей - во временном каталоге
+    config = configparser.ConfigParser()
+    config.read(os.path.join(ROOT, 'config.ini'))
+    for key in ('topology_file', 'switch_profiles_file', 'history_file'):
+        config['Connection'][key] = os.path.join(directory, config['Connection'].get(key, key))
+    config['Connection']['debug'] = '0'
+    with open(os.path.join(directory, 'config.ini'), 'w') as f:
+        config.write(f)
+    try:
+        os.symlink(os.path.join(os.path.abspath(ROOT), 'func'), os.path.join(directory, 'func'), target_is_directory=True)
+    except OSError:     # Windows без прав на ссылки
+        shutil.copytree(os.path.join(ROOT, 'func'), os.path.join(directory, 'func'))
+
+
+def run(directory, mode, *options):     # (секунды до готовности, stderr) одного запуска
+    command = [sys.executable, *options, os.path.join(os.path.abspath(ROOT), 'findPort.py'), *MODES[mode]]
+    if mode == 'batch':
+        started = time.perf_counter()
+        completed = subprocess.run(command, cwd=directory, stdin=subprocess.DEVNULL, capture_output=True, text=True, encoding='utf-8', errors='replace')
+        elapsed = time.perf_counter() - started
+        if completed.returncode != 0 or FAILED_MARK in completed.stdout:
+            sys.exit(f"findPort.py не запустился:\n{completed.stdout}{completed.stderr}")
+        return elapsed, completed.stderr
+    started = time.perf_counter()
+    process = subprocess.Popen(command, cwd=directory, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    output = b''
+    while PROMPT_MARK.encode('utf-8') not in output:    # input() сбрасывает приглашение в канал сразу
+        chunk = os.read(process.stdout.fileno(), 65536)
+        if not chunk:
+            break
+        output += chunk
+    elapsed = time.perf_counter() - started
+    rest, stderr = process.communicate(b'q\n')
+    output = (output + rest).decode('utf-8', errors='replace')
+    if process.returncode != 0 or PROMPT_MARK not in output:
+        sys.exit(f"findPort.py не запустился:\n{output}{stderr.decode('utf-8', errors='replace')}")
+    return elapsed, stderr.decode('utf-8', errors='replace')
+
+
+def bare_interpreter():     # Запуск python без кода - нижняя граница для findPort.py
+    started = time.perf_counter()
+    subprocess.run([sys.executable, '-c', 'pass'], capture_output=True)
+    return time.perf_counter() - started
+
+
+def parse_importtime(stderr):   # [(модуль, собственное время мкс, с вложенными мкс, глубина)]
+    return [(name, int(own), int(cumulative), len(indent) // 2) for own, cumulative, indent, name in IMPORT_RE.findall(stderr)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark запуска findPort.py')
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--budget-ms', type=float, default=100.0, help='предел медианы времени запуска')
+    parser.add_argument('--top', type=int, default=15, help='сколько самых долгих импортов показать')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='findport-startup-')
+    startup, imports = {}, {}
+    try:
+        prepare(directory)
+        interpreter = statistics.median(bare_interpreter() for _ in range(args.runs))
+        for mode in MODES:
+            run(directory, mode)    # Прогрев: байт-код func/ и кэш файловой системы
+            startup[mode] = statistics.median(run(directory, mode)[0] for _ in range(args.runs))
+            imports[mode] = parse_importtime(run(directory, mode, '-X', 'importtime')[1])
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    print(f"Интерпретатор (python -c pass)            {interpreter * 1000:7.1f} ms")
+    print(f"Интерактивный режим: до приглашения ввода {startup['interactive'] * 1000:7.1f} ms   (бюджет {args.budget_ms:.0f} ms)")
+    print(f"Пакетный режим: пустой список целиком     {startup['batch'] * 1000:7.1f} ms   (бюджет {args.budget_ms:.0f} ms)")
+    failed = False
+    for mode, entries in imports.items():
+        total = sum(cumulative for _, _, cumulative, depth in entries if depth == 0)
+        print(f"\nИмпорты, режим {mode}: {total / 1000:.1f} ms, модулей {len(entries)}")
+        print(f"{'Импорт':<40} {'с вложенными, ms':>17} {'собственное, ms':>16}")
+        for name, own, cumulative, _ in sorted((entry for entry in entries if entry[3] == 0), key=lambda entry: -entry[2])[:args.top]:
+            print(f"{name:<40} {cumulative / 1000:>17.1f} {own / 1000:>16.1f}")
+        loaded = {name for name, _, _, _ in entries}
+        eager = [module for module in LAZY_MODULES if module in loaded]
+        if eager:
+            print(f"\nЗагружены при запуске ({mode}), хотя нужны только при первом обращении: {', '.join(eager)}")
+            failed = True
+    for mode, elapsed in startup.items():
+        if elapsed * 1000 > args.budget_ms:
+            print(f"\nЗапуск ({mode}) дольше бюджета: {elapsed * 1000:.1f} ms > {args.budget_ms:.0f} ms")
+            failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
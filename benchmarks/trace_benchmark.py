@@ -0,0 +1,151 @@
+#- Benchmark сквозного поиска: движок обхода коммутаторов против модели сети simulated_fabric - через настоящий SSH
+#- (ssh_fabric_server, нужен paramiko) или без сети (--transport memory, SimulatedPool с теми же задержками).
+#- Отчет на каждый уровень параллельности: поисков/с, задержка поиска p50/p95, верные ответы, SSH-подключения,
+#- байт и команд на поиск; затем задержка и число ожиданий ответа на участок по ролям (ядро, транзит, граничный).
+#- Запуск: python benchmarks/trace_benchmark.py [--switches 20] [--lookups 300] [--concurrency 1 8 32]
+#-         [--transport ssh|memory] [--topology fabric.json] [--rtt-ms 5] [--jitter-ms 1] [--engine hop_tracer]
+#- Другой движок: --engine модуль:фабрика, factory(pool, core, port, username, password, topology) -> объект
+#- с методом trace(mac_loc=None, ip_loc=None) -> Trace (hop_tracer); модуль ищется в func/ и benchmarks/
+import argparse
+import importlib
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'func'))
+
+from simulated_fabric import SimulatedFabric, SimulatedPool
+from topology_graph import TopologyGraph
+
+USERNAME = 'admin'
+PASSWORD = 'admin'
+
+
+def hop_tracer(pool, core, port, username, password, topology):
+    from hop_tracer import HopTracer
+    return HopTracer(pool, core, port, username, password, topology=topology, per_switch=4)
+
+
+def load_engine(spec):
+    if ':' not in spec:
+        return globals()[spec]
+    module, factory = spec.split(':', 1)
+    return getattr(importlib.import_module(module), factory)
+
+
+def percentile(values, share):
+    values = sorted(values)
+    return values[min(int(len(values) * share), len(values) - 1)] if values else 0.0
+
+
+class Transport:    # Пул сессий к модели: через SSH-серверы коммутаторов или в памяти процесса
+    def __init__(self, kind, fabric, args):
+        self.kind = kind
+        self.fabric = fabric
+        self.options = (args.rtt_ms / 1000, args.command_ms / 1000, args.jitter_ms / 1000)
+        self.server = None
+        if kind == 'ssh':
+            from ssh_fabric_server import FabricSshServer
+            self.server = FabricSshServer(fabric, 0, USERNAME, PASSWORD, *self.options).start()
+        self.port = self.server.port if self.server is not None else 22
+
+    def pool(self):
+        if self.server is None:
+            return SimulatedPool(self.fabric, *self.options, connect_time=0.0)
+        from ssh_fabric_server import FabricResolver
+        from ssh_session_pool import SshSessionPool
+        return SshSessionPool(idle_timeout=3600, keepalive=0, resolver=FabricResolver(self.server.addresses))
+
+    def connects(self, pool):
+        return self.server.connects if self.server is not None else pool.connects
+
+    def close(self):
+        if self.server is not None:
+            self.server.stop()
+
+
+def run_level(engine_factory, transport, fabric, queries, concurrency):
+    # Каждый уровень - с холодного старта: новый пул сессий, пустая топология, подключения входят в замер
+    pool = transport.pool()
+    engine = engine_factory(pool, 'sw1', transport.port, USERNAME, PASSWORD, TopologyGraph(None))
+    connects = transport.connects(pool)
+    fabric.reset_traffic()
+
+    def lookup(query):
+        mac, ip = query
+        started = time.perf_counter()
+        trace = engine.trace(mac_loc=mac) if ip is None else engine.trace(ip_loc=ip)
+        return query, trace, time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lookup, queries))
+    elapsed = time.perf_counter() - started
+    connects = transport.connects(pool) - connects
+    pool.close_all()
+    return results, elapsed, connects
+
+
+def hop_role(index, hops):
+    if index == 0:
+        return 'ядро'
+    return 'граничный' if index == len(hops) - 1 else 'транзит'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark сквозного поиска на модели сети коммутаторов')
+    parser.add_argument('--engine', default='hop_tracer')
+    parser.add_argument('--transport', choices=('ssh', 'memory'), default='ssh')
+    parser.add_argument('--topology', help='файл JSON с топологией (см. simulated_fabric)')
+    parser.add_argument('--switches', type=int, default=20)
+    parser.add_argument('--hosts', type=int, default=40, help='устройств на коммутаторе доступа')
+    parser.add_argument('--table-size', type=int, default=0, help='дополнительных записей в таблице MAC коммутатора')
+    parser.add_argument('--lookups', type=int, default=300)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--rtt-ms', type=float, default=5.0)
+    parser.add_argument('--command-ms', type=float, default=1.0, help='обработка одной команды коммутатором')
+    parser.add_argument('--jitter-ms', type=float, default=1.0)
+    args = parser.parse_args()
+
+    fabric = SimulatedFabric.load(args.topology) if args.topology else SimulatedFabric(args.switches, args.hosts, table_size=args.table_size)
+    engine_factory = load_engine(args.engine)
+    rng = random.Random(3)
+    macs = list(fabric.hosts)
+    queries = [(mac, None) if rng.random() < 0.5 else (None, fabric.hosts[mac][3]) for mac in (rng.choice(macs) for _ in range(args.lookups))]
+    transport = Transport(args.transport, fabric, args)
+    print(f"Движок {args.engine}, транспорт {args.transport}, коммутаторов {len(fabric.switches)}, устройств {len(fabric.hosts)}, "
+          f"RTT {args.rtt_ms} ms ± {args.jitter_ms} ms")
+    print(f"{'Параллельно':>11} {'Поисков/с':>10} {'p50 ms':>8} {'p95 ms':>8} {'Верных':>8} {'SSH':>5} {'КБ/поиск':>9} {'Команд/поиск':>13}")
+    try:
+        for concurrency in args.concurrency:
+            results, elapsed, connects = run_level(engine_factory, transport, fabric, queries, concurrency)
+            correct = 0
+            hops = {}
+            for (mac, ip), trace, _ in results:
+                expected = fabric.hosts[mac or fabric.arp[ip][0]]
+                found = [hop for hop in trace.hops if hop.error is None]
+                if trace.status == 'found' and found and (found[-1].switch, found[-1].port) == expected[:2]:
+                    correct += 1
+                for index, hop in enumerate(found):
+                    hops.setdefault(hop_role(index, found), []).append(hop)
+            latencies = [seconds for _, _, seconds in results]
+            traffic = [sum(totals) for totals in zip(*fabric.traffic.values())] or [0, 0, 0]
+            print(f"{concurrency:>11} {len(results) / elapsed:>10.1f} {percentile(latencies, 0.5) * 1000:>8.1f} "
+                  f"{percentile(latencies, 0.95) * 1000:>8.1f} {correct:>8} {connects:>5} "
+                  f"{(traffic[0] + traffic[1]) / len(results) / 1024:>9.2f} {traffic[2] / len(results):>13.2f}")
+        print(f"Участки при параллельности {args.concurrency[-1]}:")
+        print(f"{'Роль':>11} {'Участков':>10} {'p50 ms':>8} {'p95 ms':>8} {'Ожиданий ответа':>16}")
+        for role in ('ядро', 'транзит', 'граничный'):
+            role_hops = hops.get(role, [])
+            if role_hops:
+                print(f"{role:>11} {len(role_hops):>10} {percentile([hop.elapsed for hop in role_hops], 0.5) * 1000:>8.1f} "
+                      f"{percentile([hop.elapsed for hop in role_hops], 0.95) * 1000:>8.1f} "
+                      f"{sum(hop.round_trips for hop in role_hops) / len(role_hops):>16.2f}")
+    finally:
+        transport.close()
+
+
+if __name__ == '__main__':
+    main()
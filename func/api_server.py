@@ -0,0 +1,88 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+from phase_timings import timings
+
+MAX_BATCH_BYTES = 1024 * 1024   # Предельный размер тела запроса /batch
+
+
+class ResultCollector:  # Writer для run_batch: результаты пакета собираются в список вместо потока
+    def __init__(self):
+        self.results = []
+        self._lock = threading.Lock()
+
+    def write(self, result):
+        with self._lock:
+            self.results.append(result)
+
+
+class LookupServer(ThreadingHTTPServer):    # Локальный HTTP/JSON API поверх одного прогретого движка поиска
+    # GET  /lookup?q=<MAC, IP, имя АРМ, логин или ФИО>  - путь до устройства
+    # GET  /port?switch=<коммутатор>[&port=<порт>]       - устройства на порту или на всех граничных портах коммутатора
+    # POST /batch  (идентификаторы по одному в строке или JSON-список) - результаты пакета
+    # GET  /metrics (формат Prometheus), /metrics.json               - замеры фаз поиска phase_timings
+    # Каждый запрос обслуживается своим потоком; сессии SSH, кэши DNS, AD и баз общие для всех
+    daemon_threads = True
+
+    def __init__(self, address, lookup, port_lookup, batch):
+        self.lookup = lookup    # lookup(строка запроса) -> словарь результата
+        self.port_lookup = port_lookup  # port_lookup(коммутатор, порт или None) -> словарь результата
+        self.batch = batch      # batch([идентификаторы]) -> [словари результатов]
+        super().__init__(address, LookupHandler)
+
+
+class LookupHandler(BaseHTTPRequestHandler):
+    server_version = 'findPort'
+    protocol_version = 'HTTP/1.1'   # Соединение клиента переиспользуется между запросами
+
+    def log_message(self, format, *args):   # Журнал запросов - в stderr только по ошибкам
+        pass
+
+    def _send(self, status, data, content_type='application/json; charset=utf-8'):
+        body = data.encode('utf-8') if isinstance(data, str) else json.dumps(data, ensure_ascii=False, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        try:
+            if url.path == '/lookup':
+                if not query.get('q', '').strip():
+                    return self._send(400, {'error': 'не задан параметр q'})
+                return self._send(200, self.server.lookup(query['q']))
+            if url.path == '/port':
+                if not query.get('switch', '').strip():
+                    return self._send(400, {'error': 'не задан параметр switch'})
+                return self._send(200, self.server.port_lookup(query['switch'].strip(), query.get('port', '').strip() or None))
+            if url.path == '/health':
+                return self._send(200, {'status': 'ok'})
+            if url.path == '/metrics':
+                return self._send(200, timings.to_prometheus(), 'text/plain; version=0.0.4; charset=utf-8')
+            if url.path == '/metrics.json':
+                return self._send(200, timings.to_json())
+        except Exception as e:
+            return self._send(500, {'error': f"{type(e).__name__}: {e}"})
+        self._send(404, {'error': 'неизвестный адрес'})
+
+    def do_POST(self):
+        if urlsplit(self.path).path != '/batch':
+            return self._send(404, {'error': 'неизвестный адрес'})
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_BATCH_BYTES:
+            return self._send(413, {'error': 'слишком большой пакет'})
+        text = self.rfile.read(length).decode('utf-8', errors='replace')
+        try:
+            items = json.loads(text) if text.lstrip().startswith('[') else text.splitlines()
+        except ValueError:
+            return self._send(400, {'error': 'некорректный JSON'})
+        items = [str(item).strip() for item in items if str(item).strip() and not str(item).startswith('#')]
+        try:
+            return self._send(200, self.server.batch(items))
+        except Exception as e:
+            return self._send(500, {'error': f"{type(e).__name__}: {e}"})
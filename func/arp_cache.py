@@ -0,0 +1,66 @@
+import threading
+import time
+
+from parse_tables_function import parse_arp_table, normalize_mac
+
+
+class ArpTable:     # Снимок ARP-таблицы ядра: ip -> mac и mac -> ip, обновляется по TTL в фоне
+    # Снимок снимает один поток за раз (_refresh_lock): одновременные первые запросы ждут один show arp
+    def __init__(self, fetch, ttl=120):
+        self.fetch = fetch  # fetch() -> (вывод show arp, вендор ядра)
+        self.ttl = ttl
+        self.updated = None
+        self._ip_to_mac = {}
+        self._mac_to_ip = {}
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._refreshing = False
+
+    def refresh(self):
+        output, vendor = self.fetch()
+        ip_to_mac = {}
+        mac_to_ip = {}
+        for ip_loc, mac_loc in parse_arp_table(output, vendor):
+            ip_to_mac[ip_loc] = mac_loc
+            mac_to_ip[mac_loc] = ip_loc
+        with self._lock:    # Подмена словарей целиком: читатели не видят наполовину обновленный снимок
+            self._ip_to_mac = ip_to_mac
+            self._mac_to_ip = mac_to_ip
+            self.updated = time.monotonic()
+
+    def _refresh_background(self):
+        try:
+            with self._refresh_lock:
+                self.refresh()
+        except Exception:
+            pass    # Ядро недоступно - остается прежний снимок, следующая попытка при следующем запросе
+        finally:
+            self._refreshing = False
+
+    def _ensure_fresh(self):
+        if self.updated is None:    # Первый запрос ждет снимок, дальше устаревший снимок обновляется в фоне
+            with self._refresh_lock:
+                if self.updated is None:    # Снимок мог снять поток, которого ждали
+                    self.refresh()
+            return
+        with self._lock:
+            start = time.monotonic() - self.updated > self.ttl and not self._refreshing
+            if start:
+                self._refreshing = True
+        if start:
+            threading.Thread(target=self._refresh_background, daemon=True).start()
+
+    def mac_by_ip(self, ip_loc):
+        self._ensure_fresh()
+        with self._lock:
+            return self._ip_to_mac.get(ip_loc)
+
+    def ip_by_mac(self, mac_loc):
+        self._ensure_fresh()
+        with self._lock:
+            return self._mac_to_ip.get(normalize_mac(mac_loc))
+
+    def ips_by_macs(self, macs):    # {mac: ip или None} по одному снимку для всех адресов
+        self._ensure_fresh()
+        with self._lock:
+            return {mac_loc: self._mac_to_ip.get(normalize_mac(mac_loc)) for mac_loc in macs}
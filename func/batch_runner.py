@@ -0,0 +1,92 @@
+import json
+import threading
+
+from check_ip_address_function import check_ip_address
+from check_mac_address_function import check_mac_address
+from find_cirillic_function import check_cyrillic
+
+CSV_FIELDS = ['query', 'kind', 'status', 'mac', 'vendor', 'ip', 'hostname', 'login', 'display_name', 'switch', 'port', 'vlan', 'lag', 'lag_ports', 'unmanaged', 'path', 'error']
+
+
+def classify(item):     # Тип идентификатора: mac, ip, fio (кириллица) или name (имя АРМ / логин)
+    value = item.strip().lower()
+    if check_mac_address(value):
+        return 'mac', value.replace('-', ':')
+    if check_ip_address(value):
+        return 'ip', value
+    if check_cyrillic(value):
+        return 'fio', value
+    return 'name', value
+
+
+def read_items(stream):     # Идентификаторы по одному в строке; пустые строки и комментарии # пропускаются
+    for line in stream:
+        line = line.strip()
+        if line and not line.startswith('#'):
+            yield line
+
+
+class JsonLinesWriter:
+    def __init__(self, stream):
+        self.stream = stream
+        self._lock = threading.Lock()
+
+    def write(self, result):
+        with self._lock:
+            self.stream.write(json.dumps(result, ensure_ascii=False, default=str) + '\n')
+            self.stream.flush()
+
+
+class CsvWriter:    # Плоская строка на результат: последний найденный участок и путь через ' > '
+    def __init__(self, stream, fields=CSV_FIELDS):     # fields - колонки: у --inventory свои (port_inventory.FIELDS)
+        import csv  # Только для --format csv
+        self.stream = stream
+        self.fields = fields
+        self._writer = csv.DictWriter(stream, fieldnames=fields, extrasaction='ignore')
+        self._writer.writeheader()
+        self._lock = threading.Lock()
+
+    def write(self, result):
+        row = {key: result.get(key) for key in self.fields}
+        hops = [hop for hop in result.get('hops') or [] if 'error' not in hop]
+        if hops:
+            last_hop = hops[-1]
+            for key in ('switch', 'port', 'vlan', 'lag', 'unmanaged'):
+                row[key] = last_hop.get(key)
+            row['lag_ports'] = ','.join(last_hop.get('lag_ports') or [])
+            row['path'] = ' > '.join(hop['switch'] for hop in hops)
+        with self._lock:
+            self._writer.writerow(row)
+            self.stream.flush()
+
+
+def run_batch(items, resolve, writer, workers=8, enrich=None, enrich_size=50):
+    # Поиски выполняются параллельно, результаты пишутся по мере готовности.
+    # enrich(results) дополняет сразу пачку из enrich_size результатов (один запрос к AD на пачку)
+    count = 0
+    pending = []
+
+    def flush():
+        if enrich is not None:
+            enrich(pending)
+        for result in pending:
+            writer.write(result)
+        pending.clear()
+
+    if not items:   # Пустой список - без пула потоков: запуск из скриптов не платит за concurrent.futures
+        return count
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(resolve, *classify(item)): item for item in items}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {'status': 'error', 'error': f"{type(e).__name__}: {e}"}
+            result['query'] = futures[future]
+            pending.append(result)
+            count += 1
+            if enrich is None or len(pending) >= enrich_size:
+                flush()
+    flush()
+    return count
@@ -0,0 +1,132 @@
+import threading
+import time
+from collections import OrderedDict
+
+from phase_timings import timings
+
+ATTRIBUTES = ['sAMAccountName', 'displayName']  # Только нужные атрибуты вместо ALL_ATTRIBUTES
+USERS_FILTER = '(&(objectCategory=person)(objectClass=user)(displayName=*))'
+FILTER_CHUNK = 100  # Сколько логинов в одном OR-фильтре
+PAGE_SIZE = 500
+
+
+def entry_value(entry, attribute):   # Значение атрибута из записи paged_search (без схемы ldap3 отдает список)
+    attributes = entry.get('attributes') if entry.get('type') == 'searchResEntry' else None
+    value = attributes.get(attribute) if attributes else None
+    if isinstance(value, list):
+        value = value[0] if value else None
+    return value or None
+
+
+class DirectoryClient:  # Общее соединение с AD: одна привязка на процесс, переподключение при обрыве, кэш login -> ФИО
+    def __init__(self, ldap_srv, ldap_user, ldap_password, ttl=3600, cache_size=4096):
+        from ldap3 import Server    # ldap3 загружается при первом обращении к AD, а не при запуске
+        self.server = Server(f'ldap://{ldap_srv}')
+        self.ldap_user = ldap_user
+        self.ldap_password = ldap_password
+        parts = ldap_srv.split('.')
+        self.base_dn = f'dc={parts[0]},dc={parts[1]}'
+        self.ttl = ttl
+        self.cache_size = cache_size
+        self._conn = None
+        self._lock = threading.Lock()   # Синхронное соединение ldap3 не потокобезопасно
+        self._cache = OrderedDict()     # login -> (ФИО или None, срок годности); LRU
+        self._cache_lock = threading.Lock()
+
+    def _connection(self):
+        from ldap3 import Connection, RESTARTABLE
+        if self._conn is None or self._conn.closed:
+            # RESTARTABLE: при разрыве ldap3 сам переподключается и повторяет запрос
+            self._conn = Connection(self.server, self.ldap_user, self.ldap_password, auto_bind=True, client_strategy=RESTARTABLE)
+        return self._conn
+
+    def _search(self, operation, search_filter, attributes=ATTRIBUTES):    # operation - метка замера phase_timings
+        from ldap3 import SUBTREE
+        with self._lock, timings.span('ldap', operation=operation):
+            return self._connection().extend.standard.paged_search(search_base=self.base_dn, search_filter=search_filter,
+                                                                   search_scope=SUBTREE, attributes=attributes,
+                                                                   paged_size=PAGE_SIZE, generator=False)
+
+    def _cached(self, login):
+        with self._cache_lock:
+            cached = self._cache.get(login)
+            if cached is None:
+                return False, None
+            if cached[1] < time.monotonic():
+                del self._cache[login]
+                return False, None
+            self._cache.move_to_end(login)
+            return True, cached[0]
+
+    def _remember(self, login, display_name):
+        with self._cache_lock:
+            self._cache[login] = (display_name, time.monotonic() + self.ttl)
+            self._cache.move_to_end(login)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def display_names(self, logins):    # {login: ФИО или None} для многих логинов: один запрос на FILTER_CHUNK логинов
+        from ldap3.utils.conv import escape_filter_chars
+        result = {}
+        missing = []
+        for login in dict.fromkeys(logins):
+            found, display_name = self._cached(login.lower())
+            if found:
+                result[login] = display_name
+            else:
+                missing.append(login)
+        for offset in range(0, len(missing), FILTER_CHUNK):
+            chunk = missing[offset:offset + FILTER_CHUNK]
+            search_filter = '(|' + ''.join(f'(sAMAccountName={escape_filter_chars(login)})' for login in chunk) + ')'
+            names = {}
+            for entry in self._search('display_names', search_filter):
+                login = entry_value(entry, 'sAMAccountName')
+                if login is not None:
+                    names[login.lower()] = entry_value(entry, 'displayName')
+            for login in chunk:     # Ненайденные логины тоже кэшируются, чтобы не спрашивать AD повторно
+                display_name = names.get(login.lower())
+                self._remember(login.lower(), display_name)
+                result[login] = display_name
+        return result
+
+    def display_name(self, login):
+        return self.display_names([login]).get(login)
+
+    def find_by_display_name(self, part_of_full_name):  # ([логины], [ФИО]) по части ФИО
+        from ldap3.utils.conv import escape_filter_chars
+        search_filter = f'(&(displayName=*{escape_filter_chars(part_of_full_name)}*))'
+        login_list = []
+        displayName_list = []
+        for entry in self._search('find_by_display_name', search_filter):
+            login = entry_value(entry, 'sAMAccountName')
+            display_name = entry_value(entry, 'displayName')
+            if login is not None and display_name is not None:
+                login_list.append(login)
+                displayName_list.append(display_name)
+                self._remember(login.lower(), display_name)
+        return login_list, displayName_list
+
+
+    def all_users(self, changed_since=None):   # [(логин, ФИО, whenChanged)] всех пользователей или измененных после changed_since
+        search_filter = USERS_FILTER
+        if changed_since is not None:
+            from datetime import timezone   # Модуль уже загружен ldap3: changed_since - его значение whenChanged
+            since = changed_since.astimezone(timezone.utc).strftime('%Y%m%d%H%M%S.0Z')
+            search_filter = f'(&{USERS_FILTER}(whenChanged>={since}))'
+        users = []
+        for entry in self._search('all_users', search_filter, ATTRIBUTES + ['whenChanged']):
+            login = entry_value(entry, 'sAMAccountName')
+            display_name = entry_value(entry, 'displayName')
+            if login is not None and display_name is not None:
+                users.append((login, display_name, entry_value(entry, 'whenChanged')))
+        return users
+
+
+directory_clients = {}  # (сервер, пользователь) -> DirectoryClient, общий для всех поисков процесса
+
+
+def directory_client(ldap_srv, ldap_user, ldap_password, ttl=3600):
+    client = directory_clients.get((ldap_srv, ldap_user))
+    if client is None:
+        client = directory_clients.setdefault((ldap_srv, ldap_user), DirectoryClient(ldap_srv, ldap_user, ldap_password, ttl))
+    return client
@@ -0,0 +1,106 @@
+import threading
+import time
+
+from phase_timings import timings
+
+
+def is_ip_address(value):
+    import socket   # Здесь и ниже - при первом запросе: socket не загружается при запуске
+    try:
+        socket.inet_aton(value)
+    except OSError:
+        return False
+    return value.count('.') == 3
+
+
+class DnsResolver:  # Общий для SSH, проверки доступности и вывода информации кэш прямых и обратных DNS-запросов
+    # Системный резолвер не сообщает TTL записи, поэтому срок хранения задается настройками:
+    # ttl для найденных имен, negative_ttl для ненайденных. Запросы идут в пуле потоков,
+    # ожидание ответа ограничено timeout; одновременные запросы одного имени объединяются
+    def __init__(self, ttl=300, negative_ttl=30, timeout=2.0, workers=32):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.timeout = timeout
+        self.workers = workers
+        self._executor = None   # Пул потоков - при первом запросе: concurrent.futures не загружается при запуске
+        self._cache = {}        # (вид, ключ) -> (ответ или None, срок годности)
+        self._inflight = {}     # (вид, ключ) -> Future выполняющегося запроса
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _forward(name):
+        import socket
+        with timings.span('dns', query='A'):
+            return socket.gethostbyname(name)
+
+    @staticmethod
+    def _reverse(ip):
+        import socket
+        with timings.span('dns', query='PTR'):
+            return socket.gethostbyaddr(ip)[0]
+
+    def _store(self, key, future):     # Ответ запоминается, даже если вызвавший уже перестал ждать
+        try:
+            answer = future.result()
+        except (OSError, UnicodeError):
+            answer = None
+        with self._lock:
+            self._cache[key] = (answer, time.monotonic() + (self.ttl if answer is not None else self.negative_ttl))
+            self._inflight.pop(key, None)
+
+    def _submit(self, kind, value):     # (ответ из кэша, None) или (None, Future запроса)
+        key = (kind, value)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[1] > time.monotonic():
+                return cached[0], None
+            future = self._inflight.get(key)
+            if future is not None:
+                return None, future
+            if self._executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='dns')
+            future = self._executor.submit(self._forward if kind == 'A' else self._reverse, value)
+            self._inflight[key] = future
+        future.add_done_callback(lambda done: self._store(key, done))   # Вне блокировки: колбэк может выполниться сразу
+        return None, future
+
+    def _wait(self, futures):   # Ответы всех запросов за общий timeout; не успевшие - None
+        from concurrent.futures import TimeoutError as FutureTimeout    # Уже загружен: Future создал _submit
+        deadline = time.monotonic() + self.timeout
+        answers = {}
+        for value, future in futures.items():
+            try:
+                answers[value] = future.result(max(deadline - time.monotonic(), 0))
+            except (FutureTimeout, OSError, UnicodeError):
+                answers[value] = None
+        return answers
+
+    def _lookup_many(self, kind, values):
+        answers = {}
+        futures = {}
+        for value in dict.fromkeys(values):
+            value = value.strip()
+            if kind == 'A' and is_ip_address(value):
+                answers[value] = value
+                continue
+            answer, future = self._submit(kind, value)
+            if future is None:
+                answers[value] = answer
+            else:
+                futures[value] = future
+        if futures:
+            answers.update(self._wait(futures))
+        return answers
+
+    def resolve(self, name):    # IPv4-адрес по имени или None
+        return self.resolve_many([name]).get(name.strip())
+
+    def resolve_many(self, names):  # {имя: IP или None} - все имена разрешаются параллельно
+        return self._lookup_many('A', names)
+
+    def reverse(self, ip):      # Имя по IP или None
+        return self.reverse_many([ip]).get(ip.strip())
+
+    def reverse_many(self, ips):
+        return self._lookup_many('PTR', ips)
@@ -0,0 +1,93 @@
+import threading
+import time
+
+IDENTITY_FIELDS = ('hostname', 'login', 'logon', 'fio')
+
+
+class Enrichment:   # Сведения об устройстве из всех источников сразу: производитель по OUI, имя по DNS, логин из базы Computers, ФИО из AD
+    # Источники начинают работу, как только известен MAC или IP, - одновременно с обходом коммутаторов.
+    # Цепочка IP -> имя -> логин -> ФИО последовательна по смыслу и идет в одном потоке, производитель - в другом,
+    # поэтому ожидание определяется самым медленным источником, а не их суммой
+    def __init__(self, vendor, reverse, computer_login, full_name, timeout=3.0, workers=8):
+        self.vendor = vendor    # vendor(mac) -> (компания, страна, реестр) или None
+        self.reverse = reverse  # reverse(ip) -> DNS-имя или None
+        self.computer_login = computer_login    # computer_login(имя АРМ) -> (логин, время входа)
+        self.full_name = full_name  # full_name(логин) -> ФИО или None
+        self.timeout = timeout  # Срок ответа источников от начала поиска (start), сек
+        self.workers = workers
+        self._executor = None   # Пул потоков - при первом поиске: concurrent.futures не загружается при запуске
+        self._lock = threading.Lock()
+
+    def _submit(self, function, *args):
+        with self._lock:
+            if self._executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='enrich')
+        return self._executor.submit(function, *args)
+
+    def start(self, mac=None, ip=None, hostname=None, login=None, logon=None):
+        job = EnrichmentJob(self, hostname, login, logon)
+        job.update(mac, ip)
+        return job
+
+
+class EnrichmentJob:    # Сведения об одном устройстве: поля заполняются по мере ответов источников
+    def __init__(self, enrichment, hostname=None, login=None, logon=None):
+        self.enrichment = enrichment
+        self.deadline = time.monotonic() + enrichment.timeout   # Общий срок: время обхода коммутаторов уже засчитано
+        self.mac = None
+        self.ip = None
+        self.fields = {'vendor': None, 'hostname': hostname, 'login': login, 'logon': logon, 'fio': None}
+        self._done = {field for field in ('hostname', 'login', 'logon') if self.fields[field] is not None}
+        self._vendor = None     # Future производителя
+        self._identity = None   # Future цепочки имя -> логин -> ФИО
+        self._lock = threading.Lock()
+
+    def update(self, mac=None, ip=None):    # Стали известны адреса (ARP на ядре) - запуск ждавших их источников
+        with self._lock:
+            if mac and self._vendor is None:
+                self.mac = mac
+                self._vendor = self.enrichment._submit(self._run_vendor, mac)
+            if ip and self.ip is None:
+                self.ip = ip
+            if self._identity is None and (self.ip or self.fields['hostname'] or self.fields['login']):
+                self._identity = self.enrichment._submit(self._run_identity)
+
+    def _set(self, **fields):
+        with self._lock:
+            self.fields.update(fields)
+            self._done.update(fields)
+
+    def _run_vendor(self, mac):
+        try:
+            self._set(vendor=self.enrichment.vendor(mac))
+        except Exception:
+            self._set(vendor=None)
+
+    def _run_identity(self):
+        enrichment = self.enrichment
+        try:
+            if self.fields['hostname'] is None and self.ip:
+                name = enrichment.reverse(self.ip)
+                self._set(hostname=name.split('.')[0] if name else None)
+            login = self.fields['login']
+            if login is None and self.fields['hostname']:
+                login, logon = enrichment.computer_login(self.fields['hostname'])
+                self._set(login=login, logon=logon)
+            if login:
+                self._set(fio=enrichment.full_name(login))
+        except Exception:
+            pass    # Недоступный источник - поле остается пустым
+
+    def collect(self, timeout=None):    # (поля, незаполненные к сроку поля) - ожидание до общего срока или не дольше timeout
+        futures = [future for future in (self._vendor, self._identity) if future is not None]
+        if futures:
+            from concurrent.futures import wait
+            wait(futures, max(self.deadline - time.monotonic(), 0) if timeout is None else timeout)
+        with self._lock:
+            pending = set()
+            if self._vendor is not None and not self._vendor.done():
+                pending.add('vendor')
+            if self._identity is not None and not self._identity.done():
+                pending.update(field for field in IDENTITY_FIELDS if field not in self._done)
+            return dict(self.fields), pending
@@ -0,0 +1,195 @@
+import json
+import threading
+import time
+
+from json_stream import iter_json_array
+from logon_time_function import latest_logon, latest_logon_text, parse_logon_time
+from phase_timings import timings
+
+CHUNK_SIZE = 1 << 16
+REQUEST_TIMEOUT = (10, 60)  # Ожидание подключения и очередной порции ответа сервера баз, сек
+
+
+class FeedCache:    # Локальная копия JSON-баз Users/Computers с индексом по Key и условной перепроверкой
+    # Режимы: index - база целиком через json.loads (быстрее всего, но в пике ответ, строка и дерево объектов сразу);
+    # stream - индекс строится потоково, в памяти только (последний АРМ, строка времени) на ключ: память растет
+    # с числом ключей, а не с размером базы, но разбор в 2-3 раза дольше index; scan - без индекса, память
+    # не зависит от базы, но каждый запрос читает базу потоком до первого совпадения
+    def __init__(self, srv, username, password, ttl=300, mode='index'):
+        import requests     # Загружается при первом обращении к базам: поиск по MAC и IP обходится без него
+        from requests.auth import HTTPBasicAuth
+        self.srv = srv
+        self.ttl = ttl  # Как часто сверяться с сервером, сек
+        self.mode = mode
+        self.session = requests.Session()   # Одно keep-alive соединение для всех запросов
+        self.session.auth = HTTPBasicAuth(username, password)
+        self.session.verify = False
+        self._feeds = {}    # база -> {'values', 'latest', 'etag', 'last_modified', 'checked'}
+        self._scanned = {}  # (база, ключ) -> (результат, время) для режима scan
+        self._lock = threading.Lock()
+        self._downloads = {}    # база -> Lock: базу перепроверяет один поток, остальные ждут его результат
+
+    def lookup(self, base, key):    # (последний АРМ/пользователь, время) по ключу или (None, None)
+        if self.mode == 'scan':
+            return self._scan(base, key)
+        feed = self._fresh(base)
+        if feed is None:
+            return None, None
+        return self._latest(feed, key)
+
+    def lookup_many(self, base, keys):  # {ключ: (последний АРМ/пользователь, время)}: одна проверка базы на все ключи
+        keys = list(dict.fromkeys(keys))
+        if self.mode == 'scan':
+            return self._scan_many(base, keys)
+        feed = self._fresh(base)
+        if feed is None:
+            return {key: (None, None) for key in keys}
+        return {key: self._latest(feed, key) for key in keys}
+
+    def _latest(self, feed, key):
+        with self._lock:
+            if key in feed['latest']:
+                return feed['latest'][key]
+            value = feed['values'].get(key)
+        if not value:
+            return None, None
+        try:
+            latest = (value[0], parse_logon_time(value[1])) if isinstance(value, tuple) else latest_logon(value)    # Разбор времени только для запрошенных записей, с запоминанием
+        except Exception as e:
+            print(f"Произошла ошибка: {e}")
+            return None, None
+        with self._lock:
+            feed['latest'][key] = latest
+        return latest
+
+    def _fresh(self, base):
+        with self._lock:
+            feed = self._feeds.get(base)
+            if feed is not None and time.monotonic() - feed['checked'] < self.ttl:
+                return feed
+            download = self._downloads.setdefault(base, threading.Lock())
+        with download:
+            with self._lock:    # Пока ждали, базу мог обновить другой поток
+                current = self._feeds.get(base)
+            if current is not None and time.monotonic() - current['checked'] < self.ttl:
+                return current
+            return self._revalidate(base, current if current is not None else feed)
+
+    def _revalidate(self, base, feed):
+        try:
+            with timings.span('feed', base=base, mode=self.mode) as span:  # Запрос, загрузка и разбор базы
+                return self._download(base, feed, span)
+        except Exception as e:
+            if feed is None:
+                raise
+            print(f"Сервер баз не ответил: {e}")
+            feed['checked'] = time.monotonic()  # Отвечаем по прежней копии до следующей проверки, ожидающие потоки не повторяют запрос
+            return feed
+
+    def _download(self, base, feed, span):
+        headers = {}
+        if feed is not None:    # Условный запрос: при неизменной базе сервер ответит 304 без тела
+            if feed['etag']:
+                headers['If-None-Match'] = feed['etag']
+            if feed['last_modified']:
+                headers['If-Modified-Since'] = feed['last_modified']
+        response = self.session.get(f"https://{self.srv}/{base}.json", headers=headers, stream=self.mode == 'stream', timeout=REQUEST_TIMEOUT)
+        with response:  # В режиме stream соединение возвращается в пул только после закрытия ответа, в том числе 304 и ошибок
+            return self._read(base, feed, response, span)
+
+    def _read(self, base, feed, response, span):
+        span.size = int(response.headers.get('Content-Length') or 0)
+        if response.status_code == 304 and feed is not None:
+            feed['checked'] = time.monotonic()
+            return feed
+        if response.status_code != 200:
+            print(f"Ошибка при выполнении GET запроса: {response.status_code}")
+            if feed is not None:    # Сервер недоступен - отвечаем по прежней копии до следующей проверки
+                feed['checked'] = time.monotonic()
+            return feed
+        try:
+            if self.mode == 'stream':
+                values, latest = self._stream_index(response), {}
+            else:
+                # Декодируем ответ с учетом utf-16LE и удаляем BOM символ
+                json_data = json.loads(response.content.decode('utf-16LE').lstrip('\ufeff'))
+                values, latest = {}, {}
+                for item in json_data:
+                    values.setdefault(item.get('Key'), item.get('Value'))
+        except ValueError as e:
+            print(f"Произошла ошибка при декодировании JSON: {e}")
+            return feed
+        feed = {
+            'values': values,
+            'latest': latest,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'checked': time.monotonic(),
+        }
+        with self._lock:
+            self._feeds[base] = feed
+        return feed
+
+    def _stream_index(self, response):  # Индекс ключ -> (последний АРМ/пользователь, строка времени) за один проход
+        # datetime строится только для запрошенных ключей (_latest) - на каждую запись базы это втрое дольше разбора JSON
+        values = {}
+        for item in iter_json_array(response.iter_content(CHUNK_SIZE)):
+            key = item.get('Key')
+            if key in values:   # Как в режиме index: действует первая запись ключа, даже пустая
+                continue
+            try:
+                values[key] = latest_logon_text(item['Value']) if item.get('Value') else None
+            except ValueError:
+                values[key] = None  # Неразборчивое время - ответа нет, как в режиме index
+        return values
+
+    def _scan(self, base, key):     # Поиск без индекса: чтение базы потоком до первого совпадения
+        with self._lock:
+            cached = self._scanned.get((base, key))
+        if cached is not None and time.monotonic() - cached[1] < self.ttl:
+            return cached[0]
+        result = (None, None)
+        with timings.span('feed', base=base, mode='scan'), self.session.get(f"https://{self.srv}/{base}.json", stream=True, timeout=REQUEST_TIMEOUT) as response:
+            if response.status_code != 200:
+                print(f"Ошибка при выполнении GET запроса: {response.status_code}")
+                return result
+            for item in iter_json_array(response.iter_content(CHUNK_SIZE)):
+                if item.get('Key') == key:
+                    if item.get('Value'):
+                        result = latest_logon(item['Value'])
+                    break   # Остаток базы не скачивается
+        with self._lock:
+            self._scanned[(base, key)] = (result, time.monotonic())
+        return result
+
+    def _scan_many(self, base, keys):   # Один потоковый проход по базе до первого совпадения каждого ключа
+        now = time.monotonic()
+        result = {}
+        with self._lock:
+            for key in keys:
+                cached = self._scanned.get((base, key))
+                if cached is not None and now - cached[1] < self.ttl:
+                    result[key] = cached[0]
+        wanted = {key for key in keys if key not in result}
+        if not wanted:
+            return result
+        found = {}
+        with timings.span('feed', base=base, mode='scan'), self.session.get(f"https://{self.srv}/{base}.json", stream=True, timeout=REQUEST_TIMEOUT) as response:
+            if response.status_code != 200:
+                print(f"Ошибка при выполнении GET запроса: {response.status_code}")
+                return dict(result, **{key: (None, None) for key in wanted})
+            for item in iter_json_array(response.iter_content(CHUNK_SIZE)):
+                key = item.get('Key')
+                if key in wanted and key not in found:
+                    try:
+                        found[key] = latest_logon(item['Value']) if item.get('Value') else (None, None)
+                    except ValueError:
+                        found[key] = (None, None)
+                    if len(found) == len(wanted):
+                        break   # Остаток базы не скачивается
+        now = time.monotonic()
+        with self._lock:
+            for key in wanted:
+                result[key] = found.get(key, (None, None))
+                self._scanned[(base, key)] = (result[key], now)
+        return result
@@ -0,0 +1,642 @@
+#- Основной код findPort.py: разбор аргументов, настройки, общие объекты и режимы работы.
+#- Запускается из findPort.py после проверки установленных модулей. Модулем, а не текстом скрипта:
+#- байт-код модуля кэшируется в __pycache__, а скрипт компилируется заново при каждом запуске
+import sys
+import warnings
+import threading
+import time
+import locale
+import argparse
+
+global terminal_encoding 
+terminal_encoding = locale.getpreferredencoding()
+warnings.filterwarnings("ignore") # Filter out all warnings
+
+parser = argparse.ArgumentParser(description='Поиск порта подключения устройства в сети коммутаторов')
+parser.add_argument('--batch', metavar='FILE', help="пакетный режим: файл со списком HostName, IP, MAC, логинов или ФИО ('-' - stdin)")
+parser.add_argument('--format', choices=['jsonl', 'csv'], default='jsonl', help='формат результатов пакетного режима и --inventory')
+parser.add_argument('--workers', type=int, default=8, help='число параллельных поисков в пакетном режиме')
+parser.add_argument('--per-switch', type=int, default=2, help='число одновременных поисков на одном коммутаторе')
+parser.add_argument('--inventory', metavar='SWITCH[:PORT]', help='все устройства на порту или на всех граничных портах коммутатора (формат - --format)')
+parser.add_argument('--serve', metavar='[HOST:]PORT', help='режим сервера: локальный HTTP/JSON API (/lookup, /port, /batch)')
+parser.add_argument('--profile', action='store_true', help='сводка замеров фаз: время по фазам, самые медленные коммутаторы и команды')
+parser.add_argument('--metrics', metavar='FILE', help='сохранить замеры фаз при выходе (.prom - формат Prometheus, иначе JSON)')
+args = parser.parse_args()
+
+from settings import load_settings
+try:
+    settings = load_settings('config.ini')  # config.ini разбирается один раз, значения уже нужных типов
+except ValueError as e:
+    print(f"Ошибка: {e}.")
+    sys.exit()  # Close the application
+
+hostname, location, ssh_port = settings.hostname, settings.location, settings.ssh_port
+username, password, debug = settings.username, settings.password, settings.debug
+username_base, password_base, srv_base = settings.username_base, settings.password_base, settings.srv_base
+feed_cache_ttl, feed_mode = settings.feed_cache_ttl, settings.feed_mode
+ldap_srv, ldap_user, ldap_password, ldap_cache_ttl = settings.ldap_srv, settings.ldap_user, settings.ldap_password, settings.ldap_cache_ttl
+command_timeout, oui_database_file, history_file = settings.command_timeout, settings.oui_database_file, settings.history_file
+
+count = 0
+
+count_string = 1 # default coint string erase
+
+from color_constants import ALLERT, KEY, HOSTNAME, MAC, LAG, VALUE, LOCATION, INPUTLINE, ERROR, NOTIFICATION, RESET
+
+from check_mac_address_function import check_mac_address
+from check_ip_address_function import check_ip_address
+from response_hostname_by_user_function import response_base_srv, response_base_srv_many
+from response_fio_function import response_fio 
+from find_cirillic_function import check_cyrillic
+from response_login_function import response_login
+from display_and_select_list_function import display_and_select_list
+from clear_screen_function import clear_screen
+from ssh_session_pool import SshSessionPool
+from ssh_reader import read_until_prompt, learn_prompt, run_command, pager_stats
+from vendor_profiles import vendor_profile, format_mac, run_lookup
+from parse_tables_function import parse_mac_lookup
+from topology_graph import TopologyGraph
+from switch_profiles import SwitchProfileCache
+from hop_tracer import HopTracer, Trace
+from location_history import LocationHistory
+from directory_client import directory_client
+from name_index import NameIndex
+from oui_database import oui_database, is_local_mac
+from reachability import ReachabilityProber
+from dns_resolver import DnsResolver
+from arp_cache import ArpTable
+from enrichment import Enrichment
+from port_inventory import port_inventory, FIELDS as INVENTORY_FIELDS
+from phase_timings import timings
+
+timings.window = settings.metrics_window
+
+
+if debug:
+    print("Кодировка терминала:", terminal_encoding)
+
+    
+def response_vendor(mac_loc, vendor_info, timed_out=False):   # Производитель по локальной базе OUI (реестры IEEE), без запросов в интернет
+    if vendor_info is None:
+        if timed_out:
+            print(f"        {KEY}company{RESET}        {ALLERT}нет ответа{RESET}")
+        elif is_local_mac(mac_loc):
+            print(f"        {KEY}company{RESET}        {HOSTNAME}локально администрируемый (случайный) MAC{RESET}")
+        elif oui_database(oui_database_file) is None and debug:
+            print(f"База OUI {oui_database_file} не найдена: python func/oui_database.py -o {oui_database_file}")
+        return False
+    for prop, value in zip(["company", "country", "registry"], vendor_info):  # Display specific properties in a formatted list
+        print(f"        {KEY}{prop}{RESET}        {HOSTNAME}{value or 'N/A'}{RESET}")
+    return True
+
+
+
+def enter_pass():    
+    import getpass  # Только для запроса пароля: не замедляет запуск с паролем из config.ini
+    result = getpass.getpass(f"{INPUTLINE}Введите код доступа к ядру сети: {RESET}")
+    if not debug: clear_screen()  # Call the function to clear the screen
+    return result
+
+def is_valid_ip(ip_loc):
+    import socket   # Сетевой стек загружается при первом поиске, а не при запуске
+    try:
+        socket.inet_aton(ip_loc)
+        return True
+    except socket.error:
+        return False
+    
+def ping_host(ping_host_loc, packet, debug):     # Доступность узла: ICMP echo или TCP-connect к порту SSH без запуска ping
+    reachable = prober.probe(ping_host_loc.strip(), int(packet))
+    if debug:
+        print(f"{ping_host_loc}: {'доступен' if reachable else 'недоступен'} (ICMP {'разрешен' if prober.icmp_allowed else 'запрещен, проверка TCP'})")
+    return reachable
+
+def reconnect(hostname_loc):
+    print(f"Узел {hostname_loc} недоступен")
+    in_ansver = input(f"{INPUTLINE}Повторить попытку подключения?: Y/N (N) {RESET}")
+    if in_ansver.lower() == "y" or in_ansver.lower() == "yes":
+        if ping_host(hostname_loc,'4',debug):
+            return True
+        else:
+            reconnect(hostname_loc)
+    else:
+        sys.exit()
+
+def establish_ssh_connection(core_loc,hostname_loc, ssh_port_loc, username_loc, password_loc): # Function to establish an SSH connection
+    import paramiko     # Загружается при первом подключении, а не при запуске (тянет за собой криптографию)
+    client = paramiko.SSHClient() # Create an SSH client object
+    client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+    if hostname_loc == core_loc and not ping_host(hostname_loc,'1',debug): # Check if the hostname is the core and if it is not reachable
+        reconnect(core_loc)       # Reconnect to the host if it is the core and not reachable  
+    try: # Try to establish an SSH connection using the specified parameters
+        with timings.span('ssh_connect', switch=hostname_loc):
+            client.connect(resolver.resolve(hostname_loc) or hostname_loc, ssh_port_loc, username_loc, password_loc)
+        if debug:
+            print("Соединение установлено")
+    except paramiko.SSHException as e:      
+        if hostname_loc == core_loc:
+            print(f"Авторизация не пройдена")
+            in_ansver = input(f"{INPUTLINE}Повторить попытку авторизации?: Y/N (N) {RESET}") # Prompt user to retry authorization
+            if in_ansver.lower() == "y" or in_ansver.lower() == "yes":
+                password_loc = enter_pass()
+                ping_host(hostname_loc,'4',debug)
+                establish_ssh_connection(core_loc,hostname_loc, ssh_port_loc, username_loc, password_loc) # Recursive call to retry connection
+            else:
+                sys.exit() # Exit the program
+        else:
+            if debug:
+                print(f"Авторизация не пройдена")
+                print("Соединение закрыто")
+            client = None
+            password_loc = None       
+    return client, password_loc # Return the SSH client object and password
+
+def open_channel(core_loc,hostname_loc, ssh_port_loc, username_loc, password_loc):
+    session = ssh_pool.acquire(hostname_loc)  # Повторное использование уже авторизованной сессии без нового handshake
+    if session is not None:
+        if debug:
+            print(f"Используется открытая сессия к {hostname_loc}")
+        return session, password_loc
+    client, password_loc = establish_ssh_connection(core_loc,hostname_loc, ssh_port_loc, username_loc, password_loc)
+    if client is not None:
+        try:
+            with timings.span('ssh_shell', switch=hostname_loc) as span:
+                channel = client.invoke_shell()
+                output = read_until_prompt(channel, None, command_timeout, terminal_encoding, span=span)
+        except (TimeoutError, ConnectionError) as e:
+            print(f"{ERROR}{hostname_loc}: {e}{RESET}")
+            client.close()
+            return None, None
+        session = ssh_pool.add(hostname_loc, client, channel)
+        session.prompt = learn_prompt(output)   # Дальше команды завершаются по приглашению именно этого коммутатора
+        session.banner = output
+        return session, password_loc
+    else:
+        return None, None
+
+def prepare_session(session):   # Вендор и модель (из кэша профилей или show ver) и отключение постраничного вывода
+    if session.vendor is None:
+        cached = switch_profiles.identify(session, lambda: run_ssh_command(session, f"show ver"))
+        if debug:
+            print(f"Производитель {session.vendor}, модель {session.model}" + (" (из кэша)" if cached else ""))
+    if not session.paging_disabled:     # Весь вывод следующих команд придет одним ответом, без --More--
+        run_ssh_command(session, vendor_profile(session.vendor)['disable_paging'])
+        session.paging_disabled = True
+    return session.vendor, session.model
+
+def fetch_core_arp():   # Полная ARP-таблица ядра для снимка ArpTable; отдельная сессия из пула, без диалогов
+    session = ssh_pool.checkout(hostname, ssh_port, username, password, command_timeout, terminal_encoding)
+    vendor, _ = prepare_session(session)
+    output = run_ssh_command(session, vendor_profile(vendor)['arp_table'])
+    release_channel(session)
+    return output, vendor
+
+def release_channel(session):   # Возврат сессии в пул вместо закрытия
+    ssh_pool.release(session)
+
+def run_ssh_command(session, command):
+    try:
+        output = run_command(session, command, command_timeout, terminal_encoding)
+    except (TimeoutError, ConnectionError):
+        ssh_pool.discard(session)   # Сессия в неизвестном состоянии - в пул не возвращается
+        stop_flag.set()
+        raise
+    if debug:
+        print(output)
+    return output
+
+def find_mac_address(output_loc, mac_loc, vendor):
+    port_loc, vlan_loc = parse_mac_lookup(output_loc, mac_loc, vendor)
+    if debug:
+        print(f"Порт    {port_loc}")
+        print(f"Vlan    {vlan_loc}")
+    return port_loc if port_loc else None, vlan_loc if vlan_loc else None
+
+def output_info(job, ip_address_loc, mac_loc):  # Сведения об устройстве: источники опрошены параллельно, ожидание до enrichment_timeout от начала поиска
+    job.update(mac_loc, ip_address_loc)
+    fields, pending = job.collect()
+    print(f"Информация об устройстве с физическим адресом {MAC}{mac_loc}{RESET}:")
+    print('\n')
+    response_vendor(mac_loc, fields['vendor'], 'vendor' in pending)
+    if ip_address_loc is not None:
+        print(f"        {KEY}IPv4{RESET}           {VALUE}{ip_address_loc}{RESET}")
+    for key, value in (('hostname', fields['hostname']), ('login', fields['login']), ('logOn', fields['logon'])):
+        if key == 'login' and value is not None and fields['fio'] is not None:
+            value = f"{value}    {fields['fio']}"
+        elif key == 'login' and value is not None and 'fio' in pending:
+            value = f"{value}    {RESET}{ALLERT}ФИО: нет ответа"
+        if value is not None:
+            print(f"        {KEY}{key}{RESET}{' ' * (15 - len(key))}{VALUE}{value}{RESET}")
+        elif key.lower() in pending:
+            print(f"        {KEY}{key}{RESET}{' ' * (15 - len(key))}{ALLERT}нет ответа{RESET}")
+    print('\n')
+            
+                      
+def execute_script(core_loc,hostname_loc, ssh_port_loc, username_loc, password_loc, mac_loc,count_loc,ip_loc, device_name_loc, login_loc, LastLogOn_loc):
+    job = enrichment.start(mac_loc, ip_loc, device_name_loc, login_loc, LastLogOn_loc)   # Сведения об устройстве - параллельно с поиском пути
+    cached, updated = recall_location(mac_loc, ip_loc)
+    if cached is not None:  # Прежний ответ сразу, затем проверка одной командой на граничном коммутаторе
+        print(f"{NOTIFICATION}Последний известный путь ({time.strftime('%d.%m.%Y %H:%M', time.localtime(updated))}):{RESET}")
+        print_trace(cached, job)
+        if tracer.verify(cached):
+            history.touch(cached.mac)
+            print(f"{NOTIFICATION}Подтверждено: MAC-адрес на том же порту {cached.last_hop.port} коммутатора {cached.last_hop.switch}{RESET}")
+            return
+        print(f"{ALLERT}На прежнем порту MAC-адреса нет - поиск от ядра{RESET}")
+    session, password_loc = open_channel(core_loc,hostname_loc, ssh_port_loc, username_loc, password_loc)  # Диалоги авторизации и переподключения к ядру
+    if session is None:
+        return
+    release_channel(session)    # Трассировщик получит эту же сессию из пула
+    tracer.password = password_loc
+    global status_text
+    stop_flag.clear() #Отображение исполняемого в фоне процесса
+    status_text = 'Поиск MAC по IP: ' if mac_loc is None else f"Поиск MAC на {hostname_loc} "
+    t = threading.Thread(target=display_status, args=(status_text,))
+    t.start()
+    trace = tracer.trace(mac_loc=mac_loc, ip_loc=ip_loc, on_address=job.update)
+    stop_flag.set()   #Окончание отображения исполняемого в фоне процесса
+    print_trace(trace, job)
+    remember_location(trace, cached, device_name_loc, login_loc)
+
+def recall_location(mac_loc, ip_loc):   # (Trace, время) из истории или (None, None); по IP - если ядро не сопоставило IP другому MAC
+    if history is None or (mac_loc or ip_loc) is None:
+        return None, None
+    data, updated = history.recall(mac_loc or ip_loc)
+    if data is None or data.get('status') != 'found':   # Оборванный путь (записи прежних версий) не проверяется
+        return None, None
+    if mac_loc is None and arp_table is not None:
+        current_mac = core_arp_lookup(arp_table.mac_by_ip, ip_loc)
+        if current_mac is not None and current_mac != data['mac']:
+            return None, None
+    return Trace.from_dict(data), updated
+
+def remember_location(trace, cached, hostname_loc, login_loc):  # Новый путь - в историю; пропавшее устройство - из истории
+    if history is None:
+        return
+    if trace.at_edge:   # Оборванный путь не запоминается: его последний участок - транзитный аплинк
+        history.remember(trace.to_dict(), hostname_loc, login_loc)
+    elif cached is not None and trace.status == 'not_found':
+        history.forget(cached.mac)
+
+def recall_name(hostname_loc):  # (Trace, время) по имени АРМ из истории - только подтвержденный на граничном порту, иначе (None, None)
+    # Логин сначала разрешается в имя АРМ по базе Users (локальная копия): пользователь мог пересесть за другой АРМ
+    if history is None:
+        return None, None
+    data, updated = history.recall(hostname_loc)
+    if data is None or data.get('status') != 'found':
+        return None, None
+    cached = Trace.from_dict(data)
+    if not tracer.verify(cached):   # Устройства на прежнем порту нет - имя разрешается заново через DNS
+        history.forget(cached.mac)
+        return None, None
+    history.touch(cached.mac)
+    return cached, updated
+
+def show_recalled_name(hostname_loc, login_loc=None, LastLogOn_loc=None):   # Путь по имени АРМ из истории без DNS и обхода от ядра; False - нужен обычный поиск
+    cached, updated = recall_name(hostname_loc)
+    if cached is None:
+        return False
+    job = enrichment.start(cached.mac, cached.ip, hostname_loc, login_loc, LastLogOn_loc)
+    print(f"{NOTIFICATION}Последний известный путь ({time.strftime('%d.%m.%Y %H:%M', time.localtime(updated))}):{RESET}")
+    print_trace(cached, job)
+    print(f"{NOTIFICATION}Подтверждено: MAC-адрес на том же порту {cached.last_hop.port} коммутатора {cached.last_hop.switch}{RESET}")
+    return True
+
+def locate(mac_loc, ip_loc, hostname_loc=None, login_loc=None):    # Путь без вывода на экран: история с проверкой, иначе полный поиск
+    cached, _ = recall_location(mac_loc, ip_loc)
+    if cached is not None and tracer.verify(cached):
+        history.touch(cached.mac)
+        return dict(cached.to_dict(), source='history')
+    trace = tracer.trace(mac_loc=mac_loc, ip_loc=ip_loc)
+    remember_location(trace, cached, hostname_loc, login_loc)
+    return dict(trace.to_dict(), source='trace')
+
+def print_trace(trace, job):  # Вывод найденного пути на экран
+    if debug:
+        for hop in trace.hops:
+            print(hop.to_dict())
+        print(f"Поиск занял {trace.elapsed} с")
+    if trace.status == 'error':
+        print(f"{ERROR}Коммутатор не ответил: {trace.error}{RESET}")
+        return
+    if trace.last_hop is None:
+        print(f"MAC-адрес {MAC}{trace.mac}{RESET} не обнаружен в сети")
+        return
+    output_info(job, trace.ip, trace.mac)
+    print(f"MAC-адрес {MAC}{trace.mac}{RESET} обнаружен:")
+    for number, hop in enumerate(hop for hop in trace.hops if hop.error is None):
+        if number == 0:     # Ядро - расположение из настроек, VLAN не выводится
+            place = f"в {LOCATION}{location}{RESET}"
+        else:
+            place = f"в КШ {LOCATION}{hop.cabinet}{RESET} в {LAG}{hop.vlan}{RESET} VLAN"
+        if hop.port == 'self':
+            print(f"                     {'и ' if number == 0 else ''}это коммутатор {HOSTNAME}{hop.switch}{RESET}  {place}")
+        elif hop.lag_ports is not None:
+            print(f"                     в группе портов {LAG}{hop.lag}{RESET} на портах {VALUE}{','.join(hop.lag_ports)}{RESET} коммутатора {HOSTNAME}{hop.switch}{RESET}  {place}")
+        else:
+            print(f"                     на порту {VALUE}{hop.port}{RESET} коммутатора {HOSTNAME}{hop.switch}{RESET}  {place}")
+    if trace.unreachable is not None:
+        print(f"                     где-то за {LOCATION}{trace.unreachable}{RESET}, {ALLERT}но этот узел недоступен для анализа{RESET}")
+    elif trace.last_hop.unmanaged:
+        print(f"                     {ALLERT}где-то за неуправляемым свичем{RESET}")
+    else:
+        print("", end='\n')
+    print("Поиск завершен")
+
+def display_status(status_text):
+    symbols = ['/', '|', '\\', '-']
+    index = 0
+    while not stop_flag.is_set():
+        print(status_text,symbols[index],end='\r')
+        time.sleep(1)
+        index = (index + 1) % len(symbols)
+        print(' '*(len(status_text)+10),end='\r')
+
+
+stop_flag = threading.Event()
+
+resolver = DnsResolver(settings.dns_ttl, settings.dns_negative_ttl, settings.dns_timeout_ms / 1000)  # Общий кэш DNS для SSH, проверок доступности и вывода
+ssh_pool = SshSessionPool(settings.session_idle_timeout, settings.session_keepalive, resolver)  # Общий пул SSH-сессий для всех поисков
+prober = ReachabilityProber(ssh_port, settings.probe_timeout_ms, settings.probe_cache_ttl, resolver)  # Проверка доступности узлов для всех поисков
+
+def vendor_by_mac(mac_loc):
+    with timings.span('vendor'):
+        database = oui_database(oui_database_file)
+        return database.lookup(mac_loc) if database is not None else None
+
+enrichment = Enrichment(vendor_by_mac, resolver.reverse,
+                        lambda computer: response_base_srv(srv_base,'Computers', username, password_base, computer, feed_cache_ttl, feed_mode),
+                        lambda login: response_fio(ldap_srv, ldap_user, ldap_password, login, ldap_cache_ttl),
+                        settings.enrichment_timeout_ms / 1000)  # Производитель, имя, логин и ФИО - параллельно с поиском пути
+
+topology = TopologyGraph(settings.topology_file, settings.topology_max_age)   # Граф LLDP, сохраненный с прошлых запусков
+topology.load()
+history = LocationHistory(history_file) if history_file else None   # Последние найденные пути для мгновенных повторных поисков
+switch_profiles = SwitchProfileCache(settings.switch_profiles_file, settings.switch_profiles_max_age)    # Профили коммутаторов с прошлых запусков
+switch_profiles.load()
+
+arp_table = ArpTable(fetch_core_arp, settings.arp_cache_ttl) if settings.arp_cache_ttl else None   # Снимок ARP ядра вместо show arp на каждый поиск
+
+def core_arp_lookup(lookup, key_loc):  # Ответ из снимка ARP; при недоступности снимка - None и обычный запрос к ядру
+    if arp_table is None:
+        return None
+    try:
+        return lookup(key_loc)
+    except Exception as e:
+        if debug:
+            print(f"Снимок ARP недоступен: {e}")
+        return None
+
+def core_arp_ip(mac_loc):
+    return core_arp_lookup(arp_table.ip_by_mac, mac_loc) if arp_table else None
+
+tracer = HopTracer(ssh_pool, hostname, ssh_port, username, password, command_timeout, terminal_encoding,
+                   topology, arp_table, prober.probe, args.per_switch, profiles=switch_profiles)  # Поиск пути для экрана и пакетного режима
+
+crawler = None
+if settings.crawler_enabled and not (args.batch or args.inventory or args.serve):   # Индекс читает только интерактивный поиск (locate_from_index): ответам API нужен полный путь
+    from mac_index_crawler import FabricCrawler
+    crawler = FabricCrawler(ssh_pool, hostname, ssh_port, username, password, settings.crawler_workers, settings.crawler_interval,
+                            command_timeout, terminal_encoding, topology, switch_profiles)
+    crawler.start()
+
+def locate_from_index(mac_loc):  # Ответ из индекса фабрики без обхода от ядра; False - нужен полный поиск
+    location = crawler.index.lookup(mac_loc)
+    if location is None:
+        return False
+    switch_loc, port_loc, vlan_loc, _ = location
+    if settings.crawler_verify:  # Проверка только последнего участка: MAC все еще на том же порту
+        session, _ = open_channel(hostname, switch_loc, ssh_port, username, password)
+        if session is None:
+            return False
+        vendor, model = prepare_session(session)
+        mac_vendor = format_mac(vendor, mac_loc)
+        output = run_lookup(run_ssh_command, session, vendor, model, 'mac_by_address', mac=mac_vendor)
+        release_channel(session)
+        live_port, live_vlan = find_mac_address(output, mac_vendor, vendor)
+        if live_port != port_loc:
+            return False
+        vlan_loc = live_vlan or vlan_loc
+    output_info(enrichment.start(), core_arp_ip(mac_loc), mac_loc)
+    print(f"MAC-адрес {MAC}{mac_loc}{RESET} обнаружен:")
+    print(f"                     на порту {VALUE}{port_loc}{RESET} коммутатора {HOSTNAME}{switch_loc}{RESET} в {LAG}{vlan_loc}{RESET} VLAN")
+    print("Поиск завершен")
+    return True
+
+name_index = None
+if settings.name_index_enabled and not (args.batch or args.inventory):  # Пакету индекс не успеет помочь: ФИО пакета ищутся в AD
+    # Загрузка начинается с первого поиска по ФИО (find_logins): запуск не тратит время на ldap3 и AD
+    name_index = NameIndex(lambda: directory_client(ldap_srv, ldap_user, ldap_password, ldap_cache_ttl), settings.name_index_interval)
+
+def find_logins(part_of_full_name):  # Логины и ФИО по части ФИО: из локального индекса, пока он не загружен - из AD
+    if name_index is not None:
+        name_index.start()
+        if name_index.loaded.is_set():
+            login_list, displayName_list = name_index.search(part_of_full_name)
+            return (login_list, displayName_list) if login_list else (None, None)
+    return response_login(ldap_srv, ldap_user, ldap_password, part_of_full_name, ldap_cache_ttl)
+
+def find_device(parametr):   # Поиск устройства по MAC, IP, имени АРМ, логину или ФИО
+    if check_mac_address(parametr.strip()):  
+        parametr = parametr.replace('-', ':') 
+        if crawler is not None and locate_from_index(parametr.strip()):
+            return
+        execute_script(hostname, hostname, ssh_port, username, password, parametr, count, None, None, None, None ) 
+    elif check_ip_address(parametr.strip()):  
+        execute_script(hostname, hostname, ssh_port, username, password, None, count, parametr, None, None, None)                 
+    else:
+        if check_cyrillic(parametr):
+            login_list, displayName_list = find_logins(parametr)
+            if login_list is not None:
+                if len(login_list) == 1:                    
+                    parametr = login_list[0]
+                else:
+                    input_index = display_and_select_list(displayName_list, debug)
+                    parametr = login_list[input_index] 
+
+        hostname_by_user, LastLogOn = response_base_srv(srv_base,'Users', username, password_base, parametr, feed_cache_ttl, feed_mode)
+        if hostname_by_user is not None:
+            if show_recalled_name(hostname_by_user.strip(), parametr, LastLogOn):
+                return
+        elif show_recalled_name(parametr.strip()):
+            return
+        if hostname_by_user is not None:
+            if ping_host(hostname_by_user, '1', debug):
+                ip = resolver.resolve(hostname_by_user)  # get ip by hostname
+                execute_script(hostname, hostname, ssh_port, username, password, None, count, ip, hostname_by_user.strip(), parametr, LastLogOn)
+            else:
+                print(f"{ERROR}                    Некорректный ввод                    {RESET}")   
+        else:
+            if ping_host(parametr.strip(), '1', debug):
+                ip = resolver.resolve(parametr)  # get ip by hostname
+                execute_script(hostname, hostname, ssh_port, username, password, None, count, ip, parametr, None, None)
+            else:
+                print(f"{ERROR}                    Некорректный ввод                    {RESET}")
+
+
+def resolve_batch_item(kind, value):    # Поиск одного идентификатора в пакетном режиме, без вывода на экран
+    info = {'kind': kind, 'hostname': None, 'login': None}
+    if kind == 'mac':
+        result = locate(value, None)
+    elif kind == 'ip':
+        result = locate(None, value)
+    else:
+        login = value
+        if kind == 'fio':
+            login_list, displayName_list = find_logins(value)
+            if not login_list:
+                return dict(info, status='not_found', error='пользователь не найден в AD')
+            if len(login_list) > 1:     # Выбор из списка в пакетном режиме невозможен
+                return dict(info, status='ambiguous', error='; '.join(displayName_list))
+            login = login_list[0]
+        hostname_by_user, _ = response_base_srv(srv_base,'Users', username, password_base, login, feed_cache_ttl, feed_mode)
+        if hostname_by_user is not None:
+            info['login'] = login
+            info['hostname'] = hostname_by_user.strip()
+        else:
+            info['hostname'] = value
+        cached, _ = recall_name(info['hostname'])
+        if cached is not None:
+            return dict(cached.to_dict(), source='history', **info)
+        ip = resolver.resolve(info['hostname'])
+        if ip is None:
+            return dict(info, status='not_found', error='имя не разрешается в IP')
+        result = locate(None, ip, info['hostname'], info['login'])
+    result.update(info)
+    return result
+
+def enrich_batch_results(results):  # ФИО для всех логинов пачки результатов - один запрос к AD на пачку
+    database = oui_database(oui_database_file)
+    if database is not None:
+        vendors = database.lookup_many(result['mac'] for result in results if result.get('mac'))
+        for result in results:
+            vendor_info = vendors.get(result.get('mac'))
+            if vendor_info is not None:
+                result['vendor'] = vendor_info[0]
+    logins = [result['login'] for result in results if result.get('login')]
+    if not logins:
+        return
+    try:
+        names = directory_client(ldap_srv, ldap_user, ldap_password, ldap_cache_ttl).display_names(logins)
+    except Exception as e:
+        print(f"Ошибка запроса к AD: {e}")
+        return
+    for result in results:
+        if result.get('login'):
+            result['display_name'] = names.get(result['login'])
+
+def shutdown():     # Остановка фоновых задач и сохранение графа, профилей и истории
+    if crawler is not None:
+        crawler.stop()
+    if name_index is not None:
+        name_index.stop()
+    topology.save()
+    switch_profiles.save()
+    ssh_pool.close_all()
+    if history is not None:
+        history.close()
+    if args.metrics:
+        timings.save(args.metrics)
+
+if args.batch:
+    from batch_runner import run_batch, read_items, classify, JsonLinesWriter, CsvWriter    # Пул потоков пакета - только в пакетном режиме и сервере
+    results_stream = sys.stdout
+    sys.stdout = sys.stderr     # Сообщения функций поиска не должны попасть в поток JSON/CSV
+    writer = CsvWriter(results_stream) if args.format == 'csv' else JsonLinesWriter(results_stream)
+    items_stream = sys.stdin if args.batch == '-' else open(args.batch, encoding='utf-8')
+    with items_stream:
+        items = list(read_items(items_stream))
+    # Все IP пакета проверяются одним опросом заранее - поиски берут результат из кэша проверок.
+    # Запись ARP, появившаяся на ядре после проверки, живет минуты, поэтому и результат хранится дольше
+    prober.probe_many([value for kind, value in map(classify, items) if kind == 'ip'], ttl=300)
+    resolver.resolve_many([value for kind, value in map(classify, items) if kind == 'name'])  # Имена АРМ - параллельно
+    run_batch(items, resolve_batch_item, writer, args.workers, enrich_batch_results)
+    if args.profile:
+        print(timings.summary())
+    shutdown()
+    sys.exit()
+
+def lookup_query(query):    # /lookup: один идентификатор с производителем и ФИО
+    result = resolve_batch_item(*classify(query))
+    result['query'] = query
+    enrich_batch_results([result])
+    return result
+
+def port_query(switch_loc, port_loc=None):  # /port и --inventory: все устройства на порту или на всех граничных портах коммутатора
+    entries = tracer.port_entries(switch_loc, port_loc) if port_loc else tracer.switch_entries(switch_loc)
+    database = oui_database(oui_database_file)
+    rows, errors = port_inventory(
+        switch_loc, entries,
+        database.lookup_many if database is not None else None,
+        (arp_table or ArpTable(fetch_core_arp, 0)).ips_by_macs,     # Без снимка ARP - одна show arp на весь запрос
+        resolver.reverse_many,
+        lambda computers: response_base_srv_many(srv_base, 'Computers', username, password_base, computers, feed_cache_ttl, feed_mode),
+        lambda logins: directory_client(ldap_srv, ldap_user, ldap_password, ldap_cache_ttl).display_names(logins))
+    return {'switch': switch_loc, 'port': port_loc, 'entries': rows, 'errors': errors}
+
+def batch_query(items):     # /batch: пакет идентификаторов - как в пакетном режиме, результаты списком
+    from api_server import ResultCollector
+    collector = ResultCollector()
+    run_batch(items, resolve_batch_item, collector, args.workers, enrich_batch_results)
+    return collector.results
+
+if args.inventory:
+    sys.stdout, results_stream = sys.stderr, sys.stdout     # Как в пакетном режиме: в потоке только результаты
+    from batch_runner import JsonLinesWriter, CsvWriter
+    switch_loc, _, port_loc = args.inventory.partition(':')
+    try:
+        inventory = port_query(switch_loc.strip(), port_loc.strip() or None)
+    except Exception as e:
+        print(f"{ERROR}Коммутатор {switch_loc} не ответил: {e}{RESET}")
+        shutdown()
+        sys.exit(1)
+    writer = CsvWriter(results_stream, INVENTORY_FIELDS) if args.format == 'csv' else JsonLinesWriter(results_stream)
+    for row in inventory['entries']:
+        writer.write(row)
+    for source, error in inventory['errors'].items():
+        print(f"{ALLERT}Источник {source} недоступен: {error}{RESET}")
+    if args.profile:
+        print(timings.summary())
+    shutdown()
+    sys.exit()
+
+if args.serve:
+    sys.stdout = sys.stderr     # Сообщения функций поиска - в журнал, ответы - только через API
+    from api_server import LookupServer
+    from batch_runner import run_batch, classify
+    serve_host, _, serve_port = args.serve.rpartition(':')
+    server = LookupServer((serve_host or '127.0.0.1', int(serve_port)), lookup_query, port_query, batch_query)
+    try:    # Сессия к ядру открывается заранее - первый запрос не ждет подключения
+        ssh_pool.release(ssh_pool.checkout(hostname, ssh_port, username, password, command_timeout, terminal_encoding))
+    except Exception as e:
+        print(f"Ядро {hostname} недоступно: {e}")
+    print(f"API поиска: http://{serve_host or '127.0.0.1'}:{serve_port}/lookup?q=...")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    server.server_close()
+    if args.profile:
+        print(timings.summary())
+    shutdown()
+    sys.exit()
+
+while True:    
+    print('\n')
+    print(f"{NOTIFICATION}--- Для выхода введите Выход, quit или q ---{RESET}")
+    parametr = ''
+    in_string = input(f"{INPUTLINE}Введите HostName, IP или MAC-адрес искомого устройства: {RESET}")
+    parametr = in_string.lower()
+    if not debug: clear_screen()  
+    if parametr == "quit" or parametr == "q" or parametr == "выход":
+        shutdown()
+        break
+    timings.new_run()   # Сводка --profile - по одному поиску
+    try:
+        find_device(parametr)
+    except (TimeoutError, ConnectionError) as e:
+        print(f"{ERROR}Коммутатор не ответил: {e}{RESET}")
+    if args.profile:
+        print(timings.summary())
+    if debug:
+        print(f"Страниц --More-- получено: {pager_stats['more_prompts']}")
@@ -1,12 +1,19 @@
 import re
 
+QTECH_RE = re.compile(r"QSW-")
+VECTOR_RE = re.compile(r"Vector")
+MODEL_RE = re.compile(r"\b(MES[\w-]+|QSW-[\w-]+|Vector[ -]?[\w-]*\d[\w-]*)")
+FIRMWARE_RE = re.compile(r"(?:SW version|Software,? Version|Version)\s*:?\s*([\w.()-]*\d[\w.()-]*)", re.I)
+ELTEX_RE = re.compile(r"\bMES\d|Eltex", re.I)
+
 def find_sw_vendor(output_loc, debug):
-    sw_vendor_loc = re.search(r"QSW-", output_loc) 
+    sw_vendor_loc = QTECH_RE.search(output_loc) 
     if sw_vendor_loc is not None:
-        print('Производитель QTECH')
+        if debug:
+            print('Производитель QTECH')
         return 'Vector' # Упрощено - команды и мак адреса имеют тот же синтаксис и формат, что и у Vector
     else:
-        sw_vendor_loc = re.search(r"Vector", output_loc) 
+        sw_vendor_loc = VECTOR_RE.search(output_loc) 
         if sw_vendor_loc is not None:
             if debug:
                 print('Производитель Vector')
@@ -14,4 +21,19 @@ def find_sw_vendor(output_loc, debug):
         else:
             if debug:
                 print('Производитель Eltex')
-            return 'Eltex'
\ No newline at end of file
+            return 'Eltex'
+
+def find_sw_model(output_loc):  # Модель коммутатора из вывода show ver (MES2324, QSW-4610-28T, ...)
+    sw_model_loc = MODEL_RE.search(output_loc)
+    return sw_model_loc.group(1) if sw_model_loc else None
+
+def find_sw_firmware(output_loc):   # Версия прошивки из вывода show ver
+    sw_firmware_loc = FIRMWARE_RE.search(output_loc)
+    return sw_firmware_loc.group(1) if sw_firmware_loc else None
+
+def find_banner_vendor(output_loc):     # Производитель по баннеру входа, если баннер его называет; иначе None
+    if QTECH_RE.search(output_loc) or VECTOR_RE.search(output_loc):
+        return 'Vector'
+    if ELTEX_RE.search(output_loc):
+        return 'Eltex'
+    return None
@@ -0,0 +1,332 @@
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+from find_lag_function import find_lag
+from phase_timings import timings
+from parse_tables_function import parse_arp_table, parse_mac_table, parse_lag_members, parse_lldp_neighbors, parse_lldp_neighbor, parse_mac_lookup, normalize_mac, lag_number, count_mac_entries
+from ssh_reader import run_command, run_pipeline, prompt_line
+from switch_profiles import SwitchProfileCache
+from vendor_profiles import vendor_profile, format_mac, lookup_command, checked_lookup
+
+CABINET_RE = re.compile(r"\w-\d-\w")   # Обозначение коммутационного шкафа в выводе коммутатора
+
+
+class Hop:  # Участок пути: коммутатор, порт с искомым MAC и коммутатор за этим портом
+    FIELDS = ('switch', 'vendor', 'port', 'vlan', 'lag', 'lag_ports', 'unmanaged', 'cabinet', 'elapsed', 'round_trips')
+
+    def __init__(self, switch, vendor=None, error=None):
+        self.switch = switch
+        self.vendor = vendor
+        self.port = None    # 'self' - искомый MAC принадлежит самому коммутатору
+        self.vlan = None
+        self.lag = None
+        self.lag_ports = None
+        self.unmanaged = False  # За граничным портом несколько MAC - неуправляемый коммутатор
+        self.cabinet = None
+        self.next_switch = None
+        self.elapsed = None     # Время работы с коммутатором, сек
+        self.round_trips = 0    # Сколько раз пришлось ждать ответа коммутатора
+        self.error = error      # Коммутатор недоступен - участок без порта
+
+    def to_dict(self):
+        if self.error is not None:
+            return {'switch': self.switch, 'error': self.error}
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    @classmethod
+    def from_dict(cls, data):
+        hop = cls(data['switch'], data.get('vendor'), data.get('error'))
+        for field in cls.FIELDS[2:]:
+            if field in data:
+                setattr(hop, field, data[field])
+        return hop
+
+
+class Trace:    # Результат поиска: адреса устройства и участки пути от ядра до граничного порта
+    def __init__(self, mac=None, ip=None):
+        self.mac = mac
+        self.ip = ip
+        self.status = 'not_found'   # found, partial (путь оборвался на недоступном коммутаторе), not_found, error
+        self.hops = []
+        self.error = None
+        self.elapsed = None
+
+    @property
+    def last_hop(self):     # Последний участок с найденным портом
+        hops = [hop for hop in self.hops if hop.error is None]
+        return hops[-1] if hops else None
+
+    @property
+    def at_edge(self):  # Путь дошел до граничного порта: такой путь можно запомнить и подтвердить одной командой
+        hop = self.hops[-1] if self.hops else None
+        return self.status == 'found' and hop is not None and hop.error is None and hop.port is not None and hop.next_switch is None
+
+    @property
+    def unreachable(self):  # Недоступный коммутатор, на котором оборвался путь
+        return self.hops[-1].switch if self.hops and self.hops[-1].error is not None else None
+
+    def to_dict(self):
+        return {'mac': self.mac, 'ip': self.ip, 'status': self.status, 'hops': [hop.to_dict() for hop in self.hops],
+                'error': self.error, 'elapsed': self.elapsed}
+
+    @classmethod
+    def from_dict(cls, data):   # Обратно из to_dict (история поисков)
+        trace = cls(data.get('mac'), data.get('ip'))
+        trace.status = data.get('status', 'not_found')
+        trace.hops = [Hop.from_dict(hop) for hop in data.get('hops') or []]
+        trace.error = data.get('error')
+        trace.elapsed = data.get('elapsed')
+        return trace
+
+
+class HopTracer:    # Неинтерактивный поиск порта от ядра по коммутаторам: без print и input, результат - Trace
+    # Коммутаторы обходятся в цикле. Все команды, нужные на участке, уходят одной записью в канал
+    # (ssh_reader.run_pipeline): поиск MAC вместе с ARP на ядре и таблицей LLDP, затем - только если нужно -
+    # состав LAG и таблица MAC граничного порта. Транзитный участок обходится за одно ожидание ответа
+    def __init__(self, pool, core, port, username, password, timeout=30, encoding='utf-8',
+                 topology=None, arp_table=None, ping=None, per_switch=2, max_hops=16, profiles=None):
+        self.pool = pool
+        self.core = core
+        self.port = port
+        self.username = username
+        self.password = password
+        self.timeout = timeout
+        self.encoding = encoding
+        self.topology = topology
+        self.arp_table = arp_table
+        self.ping = ping    # ping(host) -> bool; перед запросом ARP по IP и перед подключением к следующему коммутатору
+        self.per_switch = per_switch    # Сколько поисков одновременно работают с одним коммутатором
+        self.max_hops = max_hops
+        self.profiles = profiles or SwitchProfileCache()   # Производитель и модель коммутатора без show ver на каждой сессии
+        self._limits = {}
+        self._limits_lock = threading.Lock()
+
+    @contextmanager
+    def _switch(self, hostname_loc):    # Сессия к коммутатору с ограничением числа одновременных поисков на нем
+        with self._limits_lock:
+            limit = self._limits.setdefault(hostname_loc, threading.BoundedSemaphore(self.per_switch))
+        with limit:
+            session = self.pool.checkout(hostname_loc, self.port, self.username, self.password, self.timeout, self.encoding)
+            try:
+                if session.vendor is None:
+                    self.profiles.identify(session, lambda: self._run(session, 'show ver'))
+                yield session
+            except Exception:
+                self.pool.discard(session)
+                raise
+            self.pool.release(session)
+
+    def _run(self, session, command):
+        return run_command(session, command, self.timeout, self.encoding)
+
+    def _exchange(self, hop, session, requests):
+        # [(команда профиля, поля)] -> выводы в том же порядке, одной записью в канал.
+        # Отключение постраничного вывода добавляется в начало первого набора сессии
+        profile = vendor_profile(session.vendor)
+        commands = []
+        exact = []
+        for command_key, fields in requests:
+            if isinstance(profile[command_key], tuple):     # Поиск: точная команда или запасная с фильтром
+                command, is_exact = lookup_command(session.vendor, session.model, command_key, **fields)
+            else:
+                command, is_exact = profile[command_key].format(**fields), False
+            commands.append(command)
+            exact.append(is_exact)
+        paging = not session.paging_disabled
+        if paging:
+            commands.insert(0, profile['disable_paging'])
+        outputs = run_pipeline(session, commands, self.timeout, self.encoding)
+        hop.round_trips += 1
+        if paging:
+            session.paging_disabled = True
+            outputs = outputs[1:]
+        return [checked_lookup(self._run, session, session.vendor, session.model, command_key, output, is_exact, **fields)
+                for (command_key, fields), output, is_exact in zip(requests, outputs, exact)]
+
+    def _arp_snapshot(self, method, key_loc):  # Ответ из снимка ARP ядра; None - спросить ядро напрямую
+        if self.arp_table is None:
+            return None
+        try:
+            return getattr(self.arp_table, method)(key_loc)
+        except Exception:
+            return None
+
+    def trace(self, mac_loc=None, ip_loc=None, on_address=None):
+        # on_address(mac, ip) - как только ядро сопоставило адреса, до обхода остальных коммутаторов
+        trace = Trace(normalize_mac(mac_loc) if mac_loc else None, ip_loc)
+        started = time.monotonic()
+        try:
+            self._trace(trace, on_address)
+        except Exception as e:
+            trace.status = 'error'
+            trace.error = f"{type(e).__name__}: {e}"
+        trace.elapsed = round(time.monotonic() - started, 3)
+        return trace
+
+    def verify(self, trace):    # Прежний путь еще верен: MAC на том же порту последнего коммутатора - одна команда на одном коммутаторе
+        hop = trace.last_hop
+        if hop is None:
+            return False
+        started = time.monotonic()
+        try:
+            with self._switch(hop.switch) as session:
+                mac_vendor = format_mac(session.vendor, trace.mac)
+                hop.round_trips = 0
+                output, = self._exchange(hop, session, [('mac_by_address', {'mac': mac_vendor})])
+        except Exception:
+            return False
+        port_loc, vlan_loc = parse_mac_lookup(output, mac_vendor, session.vendor)
+        if port_loc != hop.port:
+            return False
+        hop.vlan = vlan_loc or hop.vlan
+        hop.elapsed = round(time.monotonic() - started, 3)
+        return True
+
+    def port_entries(self, hostname_loc, port_loc):     # Динамические записи таблицы MAC порта: [(vlan, mac, порт)]
+        with self._switch(hostname_loc) as session:
+            output, = self._exchange(Hop(hostname_loc), session, [('mac_by_port', {'port': port_loc})])
+            return parse_mac_table(output, session.vendor)
+
+    def switch_entries(self, hostname_loc):     # Динамические записи всех граничных портов коммутатора: [(vlan, mac, порт)]
+        # Таблица MAC и таблица LLDP - одной записью в канал; состав LAG, которых нет в графе, - второй записью.
+        # Записи аплинков (порт с LLDP-соседом или LAG с таким портом) - устройства за другими коммутаторами
+        hop = Hop(hostname_loc)
+        with self._switch(hostname_loc) as session:
+            vendor = session.vendor
+            mac_output, lldp_output = self._exchange(hop, session, [('mac_table', {}), ('lldp_table', {})])
+            entries = parse_mac_table(mac_output, vendor)
+            neighbors = parse_lldp_neighbors(lldp_output, vendor)
+            lags = {}
+            unknown = []
+            for lag_loc in sorted({find_lag(port_loc, False) for _, _, port_loc in entries} - {None}):
+                members = self.topology.lag_members(hostname_loc, lag_loc) if self.topology is not None else None
+                if members:
+                    lags[lag_loc] = members
+                else:
+                    unknown.append(lag_loc)
+            if unknown:
+                outputs = self._exchange(hop, session, [('lag_ports', {'lag': lag_number(lag_loc)}) for lag_loc in unknown])
+                for lag_loc, output in zip(unknown, outputs):
+                    members = parse_lag_members(output, lag_loc, vendor)
+                    if members:
+                        lags[lag_loc] = [member.strip() for member in members]
+        if self.topology is not None:
+            self.topology.update_switch(hostname_loc, neighbors, lags)
+        uplinks = set(neighbors) | {lag_loc for lag_loc, members in lags.items() if set(neighbors).intersection(members)}
+        return [entry for entry in entries if entry[2] not in uplinks]
+
+    def _trace(self, trace, on_address=None):
+        switch = self.core
+        visited = set()
+        while switch is not None and len(trace.hops) < self.max_hops:
+            visited.add(switch)
+            if trace.hops and self.ping is not None and not self.ping(switch):
+                trace.hops.append(Hop(switch, error="недоступен: не отвечает"))
+                trace.status = 'partial'
+                return
+            started = time.monotonic()
+            try:
+                with self._switch(switch) as session:
+                    hop = self._hop(session, trace, on_address)
+            except Exception as e:
+                timings.record('hop', time.monotonic() - started, error=True, switch=switch)
+                if not trace.hops:  # Ошибка на ядре - поиск невозможен
+                    raise
+                trace.hops.append(Hop(switch, error=f"недоступен: {e}"))
+                trace.status = 'partial'
+                return
+            timings.record('hop', time.monotonic() - started, switch=switch)
+            if hop is None:     # MAC не найден (или пропал с коммутатора по ходу поиска)
+                return
+            hop.elapsed = round(time.monotonic() - started, 3)
+            trace.hops.append(hop)
+            trace.status = 'found'
+            switch = hop.next_switch if hop.next_switch not in visited else None
+
+    def _hop(self, session, trace, on_address=None):
+        hostname_loc = session.hostname
+        vendor = session.vendor
+        hop = Hop(hostname_loc, vendor)
+        core = not trace.hops
+        if core and trace.mac is None:  # MAC по IP нужен раньше поиска по таблице MAC - отдельный обмен
+            trace.mac = self._arp_snapshot('mac_by_ip', trace.ip)
+            if trace.mac is None and (self.ping is None or self.ping(trace.ip)):
+                output, = self._exchange(hop, session, [('arp_by_ip', {'ip': trace.ip})])
+                trace.mac = next((mac for ip, mac in parse_arp_table(output, vendor) if ip == trace.ip), None)
+            if trace.mac is None:
+                return None
+        mac_vendor = format_mac(vendor, trace.mac)
+        requests = [('mac_by_address', {'mac': mac_vendor})]
+        arp = False
+        if core and trace.ip is None:
+            trace.ip = self._arp_snapshot('ip_by_mac', trace.mac)
+            arp = trace.ip is None
+            if arp:
+                requests.append(('arp_by_mac', {'mac': mac_vendor}))
+        lldp = self.topology is None or not self.topology.is_complete(hostname_loc)  # Соседи неизвестны - таблица LLDP в тот же обмен
+        if lldp:
+            requests.append(('lldp_table', {}))
+        outputs = self._exchange(hop, session, requests)
+        if arp:
+            trace.ip = next((ip for ip, mac in parse_arp_table(outputs[1], vendor) if mac == trace.mac), None)
+        if core and on_address is not None:
+            on_address(trace.mac, trace.ip)
+        neighbors = parse_lldp_neighbors(outputs[-1], vendor) if lldp else {}
+        if lldp and self.topology is not None:
+            self.topology.replace_neighbors(hostname_loc, {port: neighbor for port, neighbor in neighbors.items() if neighbor != hostname_loc})
+        hop.port, hop.vlan = parse_mac_lookup(outputs[0], mac_vendor, vendor)
+        if hop.port is None:
+            return None
+        cabinet = CABINET_RE.search(prompt_line(session.banner))  # Шкаф - в приглашении (sw12-A-1-B#), вывод команд конвейера его не содержит
+        hop.cabinet = cabinet.group() if cabinet else None
+        if hop.port != 'self':
+            self._edge(hop, session, neighbors, lldp)
+        return hop
+
+    def _edge(self, hop, session, neighbors, lldp):
+        # Второй обмен, только если первого не хватило: состав LAG, LLDP по порту (если в краткой таблице
+        # нет имен) и таблица MAC порта - она нужна, если за портом не окажется коммутатора
+        hostname_loc = session.hostname
+        vendor = session.vendor
+        hop.lag = find_lag(hop.port, False)
+        if hop.lag is not None and self.topology is not None:
+            hop.lag_ports = self.topology.lag_members(hostname_loc, hop.lag)
+        hop.next_switch = self._next_switch(hostname_loc, hop.port, hop.lag_ports, neighbors)
+        need_lag = hop.lag is not None and hop.lag_ports is None
+        need_macs = hop.next_switch is None and not need_lag     # Таблица MAC LAG до выяснения состава - возможно, весь аплинк
+        lldp_ports = [hop.port] if need_macs and lldp and not neighbors and hop.lag is None else []
+        if not (need_lag or need_macs):
+            return
+        requests = [('lag_ports', {'lag': lag_number(hop.lag)})] if need_lag else []
+        requests.extend(('lldp_by_port', {'port': port}) for port in lldp_ports)
+        if need_macs:
+            requests.append(('mac_by_port', {'port': hop.port}))
+        outputs = iter(self._exchange(hop, session, requests))
+        if need_lag:
+            members = parse_lag_members(next(outputs), hop.lag, vendor)
+            hop.lag_ports = [member.strip() for member in members] if members else None
+            if hop.lag_ports and self.topology is not None:
+                self.topology.record_lag(hostname_loc, hop.lag, hop.lag_ports)
+            hop.next_switch = hop.next_switch or self._next_switch(hostname_loc, hop.port, hop.lag_ports, neighbors)
+            if hop.next_switch is None:     # За LAG нет коммутатора - граничный LAG, его таблица MAC уже невелика
+                output, = self._exchange(hop, session, [('mac_by_port', {'port': hop.port})])
+                hop.unmanaged = count_mac_entries(output, vendor) > 1
+        for port in lldp_ports:
+            neighbor = parse_lldp_neighbor(next(outputs), port, vendor)
+            if neighbor is not None and neighbor != hostname_loc:
+                if self.topology is not None:
+                    self.topology.record_neighbor(hostname_loc, port, neighbor)
+                hop.next_switch = hop.next_switch or neighbor
+        if need_macs and hop.next_switch is None:   # Граничный порт: несколько MAC на нем - неуправляемый коммутатор
+            hop.unmanaged = count_mac_entries(next(outputs), vendor) > 1
+
+    def _next_switch(self, hostname_loc, port_loc, lag_ports, neighbors):   # Сосед за портом или за любым портом LAG
+        for port in [port_loc] + list(lag_ports or []):     # Таблица LLDP этого обмена важнее графа
+            next_switch = neighbors.get(port.strip())
+            if next_switch is not None and next_switch != hostname_loc:
+                return next_switch
+        if self.topology is not None:
+            return self.topology.next_switch(hostname_loc, port_loc, lag_ports)
+        return None
@@ -0,0 +1,41 @@
+import codecs
+import json
+
+WHITESPACE = ' \t\r\n,'
+
+
+def iter_json_array(chunks, encoding='utf-16-le'):
+    # Потоковый разбор JSON-массива: байты декодируются по мере поступления,
+    # элементы выдаются по одному - в памяти только текущий недочитанный элемент
+    decoder = codecs.getincrementaldecoder(encoding)()
+    json_decoder = json.JSONDecoder()
+    buffer = ''
+    pos = 0
+    started = False
+    for chunk in chunks:
+        buffer = buffer[pos:] + decoder.decode(chunk)
+        pos = 0
+        if not started:
+            buffer = buffer.lstrip('\ufeff \t\r\n')     # BOM и пробелы перед массивом
+            if not buffer:
+                continue
+            if buffer[0] != '[':
+                raise ValueError("Ожидался JSON-массив")
+            pos = 1
+            started = True
+        while True:
+            while pos < len(buffer) and buffer[pos] in WHITESPACE:
+                pos += 1
+            if pos >= len(buffer):
+                break
+            if buffer[pos] == ']':
+                return
+            try:
+                item, end = json_decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                break   # Элемент дочитан не полностью - ждем следующий блок
+            yield item
+            pos = end
+    buffer = buffer[pos:] + decoder.decode(b'', final=True)
+    if buffer.strip(WHITESPACE) not in ('', ']'):
+        raise ValueError("JSON-массив оборван")
@@ -0,0 +1,59 @@
+import json
+import threading
+import time
+
+
+class LocationHistory:  # Последний найденный путь по MAC, IP и имени АРМ (SQLite, переживает перезапуск)
+    # Повторный поиск сразу получает прежний ответ; вызывающий проверяет только граничный порт
+    # и обходит сеть от ядра, лишь если устройства там больше нет
+    def __init__(self, path):
+        self.path = path
+        self._connection = None
+        self._lock = threading.Lock()
+
+    def _database(self):    # Соединение открывается при первом обращении (вызывается под self._lock): sqlite3 не загружается при запуске
+        if self._connection is None:
+            import sqlite3
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            with self._connection:
+                self._connection.execute('CREATE TABLE IF NOT EXISTS locations '
+                                         '(key TEXT PRIMARY KEY, mac TEXT, trace TEXT, updated REAL)')
+                self._connection.execute('CREATE INDEX IF NOT EXISTS locations_mac ON locations (mac)')
+        return self._connection
+
+    @staticmethod
+    def _keys(trace, hostname=None):     # Логин не ключ: пользователь пересаживается, а путь принадлежит АРМ
+        return [key.strip().lower() for key in (trace.get('mac'), trace.get('ip'), hostname) if key]
+
+    def recall(self, key):  # (словарь Trace с именем АРМ и логином, время записи) или (None, None)
+        with self._lock:
+            row = self._database().execute('SELECT trace, updated FROM locations WHERE key = ?', (key.strip().lower(),)).fetchone()
+        if row is None:
+            return None, None
+        return json.loads(row[0]), row[1]
+
+    def remember(self, trace, hostname=None, login=None):   # Найденный путь под всеми известными ключами устройства
+        if trace.get('status') != 'found' or not trace.get('mac'):   # Оборванный путь кончается транзитным аплинком - не запоминается
+            return
+        data = json.dumps(dict(trace, hostname=hostname, login=login), ensure_ascii=False)   # Имя АРМ и логин - для вывода
+        now = time.time()
+        with self._lock:
+            with self._database() as connection:
+                connection.executemany('INSERT OR REPLACE INTO locations (key, mac, trace, updated) VALUES (?, ?, ?, ?)',
+                                       [(key, trace['mac'], data, now) for key in self._keys(trace, hostname)])
+
+    def touch(self, mac_loc):   # Путь подтвержден на граничном порту - записи устройства снова свежие
+        with self._lock:
+            with self._database() as connection:
+                connection.execute('UPDATE locations SET updated = ? WHERE mac = ?', (time.time(), mac_loc))
+
+    def forget(self, mac_loc):  # Устройство ушло с порта - прежний путь больше не показывается
+        with self._lock:
+            with self._database() as connection:
+                connection.execute('DELETE FROM locations WHERE mac = ?', (mac_loc,))
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
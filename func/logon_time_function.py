@@ -0,0 +1,41 @@
+import re
+from datetime import datetime
+
+US_DATETIME_RE = re.compile(r"[A-Za-z]{3} (\d{2})\/(\d{2})\/(\d{4}) (\d{2}):(\d{2}):(\d{2})")
+RU_DATETIME_RE = re.compile(r"(\d{2})\.(\d{2})\.(\d{4}) (\d+):(\d{2}):(\d{2})")
+LOGON_TIME_RE = re.compile(r"(?:[A-Za-z]{3} (\d{2})/(\d{2})/(\d{4})|(\d{2})\.(\d{2})\.(\d{4})) (\d{1,2}):(\d{2}):(\d{2})")  # Оба формата одним проходом
+
+
+def parse_logon_time(value):    # 'Mon 11/25/2024 09:15:00' (logon-скрипт) или '25.11.2024 9:15:00' (PowerShell)
+    # Поля берутся из групп regex напрямую - strptime на каждую запись базы слишком медленный
+    match = US_DATETIME_RE.match(value)
+    if match is not None:
+        month, day, year, hour, minute, second = match.groups()
+        return datetime(int(year), int(month), int(day), int(hour), int(minute), int(second))
+    match = RU_DATETIME_RE.match(value)
+    if match is not None:
+        day, month, year, hour, minute, second = match.groups()
+        return datetime(int(year), int(month), int(day), int(hour), int(minute), int(second))
+    return datetime.strptime(value, '%d.%m.%Y %H:%M:%S')
+
+
+def latest_logon(value):    # {АРМ/пользователь: время} -> (последний АРМ/пользователь, время)
+    value_datetime = {k: parse_logon_time(v) for k, v in value.items()}
+    max_datetime_key = max(value_datetime, key=lambda k: value_datetime[k])
+    return max_datetime_key, value_datetime[max_datetime_key]
+
+
+def logon_sort_key(value):  # Время входа для сравнения без построения datetime: строка 'ГГГГММДДЧЧММСС'
+    match = LOGON_TIME_RE.match(value)
+    if match is None:
+        return parse_logon_time(value).strftime('%Y%m%d%H%M%S')
+    month, day, year, ru_day, ru_month, ru_year, hour, minute, second = match.groups()
+    if month is None:
+        day, month, year = ru_day, ru_month, ru_year
+    return year + month + day + hour.zfill(2) + minute + second
+
+
+def latest_logon_text(value):   # {АРМ/пользователь: время} -> (последний АРМ/пользователь, строка времени как в базе)
+    # Неразборчивое время - ValueError, как у latest_logon
+    max_datetime_key = max(value, key=lambda k: logon_sort_key(value[k]))
+    return max_datetime_key, value[max_datetime_key]
@@ -0,0 +1,146 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from find_lag_function import find_lag
+from parse_tables_function import parse_mac_table, parse_lldp_neighbors, parse_lag_members, normalize_mac, lag_number
+from ssh_reader import run_command
+from switch_profiles import SwitchProfileCache
+from vendor_profiles import vendor_profile
+
+
+class MacLocationIndex:     # MAC -> (коммутатор, порт, VLAN, аплинк ли порт), по всем коммутаторам фабрики
+    def __init__(self):
+        self._locations = {}    # mac -> {коммутатор: (порт, vlan, is_uplink)}
+        self._by_switch = {}    # коммутатор -> множество MAC, полученных с него при последнем обходе
+        self._lock = threading.Lock()
+
+    def update_switch(self, switch, entries, uplinks):  # Замена данных одного коммутатора, остальные не трогаются
+        macs = set()
+        with self._lock:
+            for mac_loc in self._by_switch.get(switch, ()):
+                locations = self._locations.get(mac_loc)
+                if locations is not None:
+                    locations.pop(switch, None)
+                    if not locations:
+                        del self._locations[mac_loc]
+            for vlan_loc, mac_loc, port_loc in entries:
+                self._locations.setdefault(mac_loc, {})[switch] = (port_loc, vlan_loc, port_loc in uplinks)
+                macs.add(mac_loc)
+            self._by_switch[switch] = macs
+
+    def retain_switches(self, switches):    # Удаление коммутаторов, которые больше не видны через LLDP
+        for switch in set(self._by_switch) - set(switches):
+            self.update_switch(switch, [], set())
+            with self._lock:
+                del self._by_switch[switch]
+
+    def lookup(self, mac_loc):  # Граничный (не аплинк) порт, где виден MAC, или None
+        with self._lock:
+            locations = self._locations.get(normalize_mac(mac_loc))
+            if not locations:
+                return None
+            for switch, (port_loc, vlan_loc, is_uplink) in locations.items():
+                if not is_uplink:
+                    return switch, port_loc, vlan_loc, is_uplink
+        return None
+
+    def __len__(self):
+        with self._lock:
+            return len(self._locations)
+
+
+class FabricCrawler:    # Параллельный обход коммутаторов по LLDP от ядра: полные MAC-таблицы в индекс, LLDP и LAG в граф топологии
+    def __init__(self, pool, root, port, username, password, workers=8, interval=900, timeout=30, encoding='utf-8', topology=None, profiles=None):
+        self.pool = pool
+        self.root = root
+        self.port = port
+        self.username = username
+        self.password = password
+        self.workers = workers
+        self.interval = interval
+        self.timeout = timeout
+        self.encoding = encoding
+        self.index = MacLocationIndex()
+        self.topology = topology
+        self.profiles = profiles or SwitchProfileCache()
+        self.errors = {}    # коммутатор -> текст ошибки последнего обхода
+        self.last_crawl = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def crawl(self):    # Один полный обход фабрики
+        seen = {self.root}
+        errors = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            pending = {executor.submit(self._crawl_switch, self.root): self.root}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    switch = pending.pop(future)
+                    try:
+                        neighbors = future.result()
+                    except Exception as e:   # Недоступный коммутатор: его прежние данные в индексе сохраняются
+                        errors[switch] = str(e)
+                        continue
+                    for neighbor in neighbors:
+                        if neighbor not in seen:
+                            seen.add(neighbor)
+                            pending[executor.submit(self._crawl_switch, neighbor)] = neighbor
+        self.index.retain_switches(seen)
+        if self.topology is not None:
+            self.topology.retain_switches(seen)
+            self.topology.save()
+        self.profiles.save()
+        self.errors = errors
+        self.last_crawl = time.time()
+
+    def _crawl_switch(self, hostname_loc):
+        session = self.pool.checkout(hostname_loc, self.port, self.username, self.password, self.timeout, self.encoding)
+        try:
+            vendor, model = self._prepare(session)
+            profile = vendor_profile(vendor)
+            entries = parse_mac_table(self._run(session, profile['mac_table']), vendor)
+            neighbors = parse_lldp_neighbors(self._run(session, profile['lldp_table']), vendor)
+            uplinks = set(neighbors)
+            lags = {}
+            for lag_loc in {find_lag(port_loc, False) for _, _, port_loc in entries} - {None}:  # LAG - аплинк, если в нем есть порт с LLDP-соседом
+                members = parse_lag_members(self._run(session, profile['lag_ports'].format(lag=lag_number(lag_loc))), lag_loc, vendor)
+                if members:
+                    lags[lag_loc] = [member.strip() for member in members]
+                    if uplinks.intersection(lags[lag_loc]):
+                        uplinks.add(lag_loc)
+        except Exception:
+            self.pool.discard(session)
+            raise
+        self.pool.release(session)
+        self.index.update_switch(hostname_loc, entries, uplinks)
+        if self.topology is not None:
+            self.topology.update_switch(hostname_loc, neighbors, lags)
+        return [neighbor for neighbor in neighbors.values() if neighbor != hostname_loc]
+
+    def _prepare(self, session):    # Вендор коммутатора и отключение постраничного вывода
+        if session.vendor is None:
+            self.profiles.identify(session, lambda: self._run(session, 'show ver'))
+        if not session.paging_disabled:
+            self._run(session, vendor_profile(session.vendor)['disable_paging'])
+            session.paging_disabled = True
+        return session.vendor, session.model
+
+    def _run(self, session, command):
+        return run_command(session, command, self.timeout, self.encoding)
+
+    def start(self):    # Фоновое перестроение индекса по расписанию
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.crawl()
+            except Exception as e:
+                self.errors[self.root] = str(e)
+            self._stop.wait(self.interval)
+
+    def stop(self):
+        self._stop.set()
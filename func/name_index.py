@@ -0,0 +1,145 @@
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import defaultdict
+
+
+def normalize_name(text):   # Регистр, ё/е и лишние пробелы не влияют на поиск
+    return ' '.join(text.lower().replace('ё', 'е').split())
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class NameIndex:    # Локальный индекс ФИО из AD вместо поиска (displayName=*часть*) на контроллере:
+    # отсортированные списки начал слов для совпадений с начала слова (bisect)
+    # и триграммы для совпадений внутри слова
+    def __init__(self, connect, interval=300, full_interval=86400):
+        self.connect = connect  # connect() -> DirectoryClient; вызывается при загрузке в фоне - ldap3 не загружается при запуске
+        self.interval = interval    # Период дозагрузки изменений по whenChanged, сек
+        self.full_interval = full_interval  # Период полной перезагрузки (удаленные учетные записи), сек
+        self.loaded = threading.Event()
+        self._names = {}    # логин -> (ФИО, нормализованное ФИО)
+        self._starts = ([], [])     # Отсортированные (ФИО с начала слова, логин): [0] - с фамилии, [1] - с имени/отчества
+        self._grams = defaultdict(set)  # триграмма -> логины
+        self._high_water = None     # Максимальный whenChanged среди загруженных записей
+        self._full_loaded_at = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def _word_starts(normalized, login):    # [(ранг, (ФИО с начала слова, логин))]
+        starts = [(0, (normalized, login))]
+        for position, char in enumerate(normalized):
+            if char == ' ':
+                starts.append((1, (normalized[position + 1:], login)))
+        return starts
+
+    def _add(self, login, display_name):    # Вызывается под self._lock
+        self._remove(login)
+        normalized = normalize_name(display_name)
+        self._names[login] = (display_name, normalized)
+        for rank, start in self._word_starts(normalized, login):
+            insort(self._starts[rank], start)
+        for gram in trigrams(normalized):
+            self._grams[gram].add(login)
+
+    def _remove(self, login):
+        previous = self._names.pop(login, None)
+        if previous is None:
+            return
+        for rank, start in self._word_starts(previous[1], login):
+            starts = self._starts[rank]
+            position = bisect_left(starts, start)
+            if position < len(starts) and starts[position] == start:
+                del starts[position]
+        for gram in trigrams(previous[1]):
+            logins = self._grams.get(gram)
+            if logins is not None:
+                logins.discard(login)
+                if not logins:
+                    del self._grams[gram]
+
+    def _apply(self, users):
+        with self._lock:
+            for login, display_name, when_changed in users:
+                self._add(login, display_name)
+                if when_changed is not None and (self._high_water is None or when_changed > self._high_water):
+                    self._high_water = when_changed
+
+    def refresh(self, full=False):
+        if full or self._high_water is None:   # Новый индекс строится отдельно и подменяет старый целиком
+            names = {}
+            starts = ([], [])
+            grams = defaultdict(set)
+            high_water = None
+            for login, display_name, when_changed in self.connect().all_users():
+                normalized = normalize_name(display_name)
+                names[login] = (display_name, normalized)
+                for rank, start in self._word_starts(normalized, login):
+                    starts[rank].append(start)
+                for gram in trigrams(normalized):
+                    grams[gram].add(login)
+                if when_changed is not None and (high_water is None or when_changed > high_water):
+                    high_water = when_changed
+            starts[0].sort()
+            starts[1].sort()
+            with self._lock:
+                self._names = names
+                self._starts = starts
+                self._grams = grams
+                self._high_water = high_water
+            self._full_loaded_at = time.monotonic()
+        else:
+            self._apply(self.connect().all_users(self._high_water))
+        self.loaded.set()
+
+    def search(self, query, limit=50):  # ([логины], [ФИО]) по части ФИО: сначала с начала фамилии, затем имени/отчества, затем внутри слова
+        needle = normalize_name(query)
+        if not needle:
+            return [], []
+        matches = []
+        found = set()
+        with self._lock:
+            for starts in self._starts:     # Совпадения с начала слова уже упорядочены - чтение до limit
+                position = bisect_left(starts, (needle,))
+                while position < len(starts) and len(matches) < limit and starts[position][0].startswith(needle):
+                    login = starts[position][1]
+                    if login not in found:
+                        found.add(login)
+                        matches.append(login)
+                    position += 1
+            grams = trigrams(needle)
+            if len(matches) < limit and grams:  # Мало совпадений с начала слова - поиск внутри слов по триграммам
+                # Кандидаты из самой короткой триграммы проверяются подстрокой до набора limit
+                postings = min((self._grams.get(gram, ()) for gram in grams), key=len)
+                inside = []
+                for login in postings:
+                    if login not in found and needle in self._names[login][1]:
+                        inside.append(login)
+                        if len(inside) >= limit - len(matches):
+                            break
+                matches += sorted(inside, key=lambda login: self._names[login][1])
+            matches = matches[:limit]
+            return matches, [self._names[login][0] for login in matches]
+
+    def start(self):    # Первая загрузка и дальнейшие обновления в фоне; повторный вызов ничего не делает
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            full = self._full_loaded_at is None or time.monotonic() - self._full_loaded_at > self.full_interval
+            try:
+                self.refresh(full)
+            except Exception:
+                pass    # AD недоступен - индекс остается прежним, поиск при необходимости идет через AD
+            self._stop.wait(self.interval)
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,153 @@
+#- Локальная база производителей по реестрам IEEE MA-L / MA-M / MA-S
+#- Сборка: python func/oui_database.py [-o oui.bin] [oui.csv mam.csv oui36.csv]
+#- Без файлов реестры скачиваются с standards-oui.ieee.org (на машине с доступом в интернет),
+#- готовый oui.bin переносится в сеть управления
+import io
+import mmap
+import os
+import struct
+import sys
+from bisect import bisect_left
+
+IEEE_SOURCES = ['https://standards-oui.ieee.org/oui/oui.csv',
+                'https://standards-oui.ieee.org/oui28/mam.csv',
+                'https://standards-oui.ieee.org/oui36/oui36.csv']
+MAGIC = b'OUIDB001'
+HEADER = struct.Struct('<8s4I')     # сигнатура, записей MA-S, MA-M, MA-L, размер таблицы строк
+REGISTRIES = (('MA-S', 9), ('MA-M', 7), ('MA-L', 6))    # От длинного префикса к короткому; длина в hex-цифрах
+SEPARATORS = str.maketrans('', '', ':-. ')
+
+
+def parse_registry(stream):     # [(префикс hex, производитель, страна)] из CSV реестра IEEE
+    import csv  # Только для сборки базы: поиску по oui.bin разбор CSV не нужен
+    records = []
+    for row in csv.DictReader(stream):
+        assignment = (row.get('Assignment') or '').strip().lower()
+        company = ' '.join((row.get('Organization Name') or '').split())
+        if not assignment or not company:
+            continue
+        # Код страны - последнее слово из двух заглавных букв адреса (после него бывает только индекс)
+        codes = [word for word in (row.get('Organization Address') or '').split() if len(word) == 2 and word.isalpha() and word.isupper()]
+        country = codes[-1] if codes else None
+        records.append((assignment, company, country))
+    return records
+
+
+def build_database(records, path):
+    # Файл: заголовок, три отсортированные таблицы префиксов (uint64) и номеров строк (uint32),
+    # смещения строк (uint32) и строки 'производитель\tстрана' в UTF-8. Одинаковые строки хранятся один раз
+    tables = {length: {} for _, length in REGISTRIES}
+    strings = {}
+    for assignment, company, country in records:
+        table = tables.get(len(assignment))
+        if table is None:
+            continue
+        text = f"{company}\t{country or ''}"
+        table.setdefault(int(assignment, 16), strings.setdefault(text, len(strings)))
+    blob = bytearray()
+    offsets = []
+    for text in strings:    # dict сохраняет порядок - номер строки совпадает с позицией
+        offsets.append(len(blob))
+        blob += text.encode('utf-8')
+    offsets.append(len(blob))
+    parts = [HEADER.pack(MAGIC, *(len(tables[length]) for _, length in REGISTRIES), len(offsets))]
+    for _, length in REGISTRIES:
+        keys = sorted(tables[length])
+        parts.append(struct.pack(f'<{len(keys)}Q', *keys))
+        parts.append(struct.pack(f'<{len(keys)}I', *(tables[length][key] for key in keys)))
+        parts.append(b'\0' * (len(keys) % 2 * 4))    # Выравнивание следующей таблицы uint64 на 8 байт
+    parts.append(struct.pack(f'<{len(offsets)}I', *offsets))
+    parts.append(bytes(blob))
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        for part in parts:
+            f.write(part)
+    os.replace(tmp_path, path)  # Работающий процесс не увидит недописанный файл
+
+
+class OuiDatabase:  # Производитель по MAC: самый длинный совпавший префикс MA-S, MA-M, затем MA-L
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        magic, *counts, offsets_count = HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: не база OUI")
+        self.counts = dict(zip((name for name, _ in REGISTRIES), counts))
+        self._tables = []
+        position = HEADER.size
+        for (name, length), count in zip(REGISTRIES, counts):
+            keys = view[position:position + count * 8].cast('Q')
+            position += count * 8
+            indexes = view[position:position + count * 4].cast('I')
+            position += count * 4 + count % 2 * 4
+            self._tables.append((name, length, keys, indexes))
+        self._offsets = view[position:position + offsets_count * 4].cast('I')
+        self._strings = view[position + offsets_count * 4:]
+
+    def _string(self, number):
+        return bytes(self._strings[self._offsets[number]:self._offsets[number + 1]]).decode('utf-8')
+
+    def lookup(self, mac_loc):  # (производитель, страна, реестр) или None
+        digits = mac_loc.translate(SEPARATORS)
+        if len(digits) != 12:
+            return None
+        try:
+            value = int(digits[:9], 16)     # 36 бит - самый длинный префикс (MA-S)
+        except ValueError:
+            return None
+        for name, length, keys, indexes in self._tables:
+            key = value >> (9 - length) * 4
+            position = bisect_left(keys, key)
+            if position < len(keys) and keys[position] == key:
+                company, country = self._string(indexes[position]).split('\t')
+                return company, country or None, name
+        return None
+
+    def lookup_many(self, macs):     # {mac: (производитель, страна, реестр) или None} для пакетного режима
+        return {mac_loc: self.lookup(mac_loc) for mac_loc in dict.fromkeys(macs)}
+
+    def __len__(self):
+        return sum(self.counts.values())
+
+
+def is_local_mac(mac_loc):  # Локально администрируемый (в т.ч. случайный) MAC не имеет производителя в реестре
+    digits = mac_loc.translate(SEPARATORS)
+    try:
+        return bool(int(digits[:2], 16) & 0x02)
+    except ValueError:
+        return False
+
+
+oui_databases = {}  # путь -> OuiDatabase, открывается один раз на процесс
+
+
+def oui_database(path):     # None, если база не собрана
+    database = oui_databases.get(path)
+    if database is None:
+        if not os.path.exists(path):
+            return None
+        database = oui_databases.setdefault(path, OuiDatabase(path))
+    return database
+
+
+def main(args):
+    import urllib.request   # Только для сборки базы: поиску по базе сетевой стек не нужен
+    path = 'oui.bin'
+    if len(args) >= 2 and args[0] == '-o':
+        path = args[1]
+        args = args[2:]
+    records = []
+    for source in args or IEEE_SOURCES:
+        if os.path.exists(source):
+            with open(source, encoding='utf-8', newline='') as f:
+                records.extend(parse_registry(f))
+        else:
+            with urllib.request.urlopen(source, timeout=60) as response:
+                records.extend(parse_registry(io.TextIOWrapper(response, encoding='utf-8', newline='')))
+    build_database(records, path)
+    print(f"{path}: {len(OuiDatabase(path))} префиксов")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
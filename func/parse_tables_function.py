@@ -0,0 +1,182 @@
+import re
+from collections import namedtuple
+
+from phase_timings import timings
+
+# Разбор вывода коммутаторов: для каждой пары (вендор, вид таблицы) один заранее скомпилированный
+# шаблон строки таблицы - колонки по порядку, ключевое поле проверяется своим шаблоном прямо в нем.
+# Записи находятся одним findall по всему выводу, без разбиения на строки; записи - namedtuple.
+# QTECH сводится к Vector в find_sw_vendor - формат таблиц одинаковый
+
+MAC_RE = re.compile(r'(?:[0-9A-Fa-f]{2}[:-]){5}[0-9A-Fa-f]{2}')
+SW_RE = re.compile(r'[sS][wW]\d+')
+IP_RE = re.compile(r'\b(?:\d{1,3}\.){3}\d{1,3}\b')
+SELF_RE = re.compile(r'self|CPU')
+LAG_NUMBER_RE = re.compile(r'\d+')
+SYSTEM_NAME_RE = re.compile(r'System\s+Name\s*:\s*(\S+)', re.I)
+
+MAC_FIELD = '[:-]'.join(['[0-9A-Fa-f]{2}'] * 6) + r'(?![^ \t\r\n])'    # Без повторения группы - быстрее в sre
+PORT_FIELD = r'[A-Za-z][\w-]*?\d+(?:/\d+)*(?![^ \t\r\n])'   # gi1/0/1, te1/0/2, Po1, Ethernet1/0/25, port-channel1
+
+# Поля записей - в порядке колонок таблицы: запись собирается прямо из кортежа групп findall
+MacEntry = namedtuple('MacEntry', 'vlan mac port type')
+VectorMacEntry = namedtuple('VectorMacEntry', 'vlan mac type port')
+ArpEntry = namedtuple('ArpEntry', 'vlan port ip mac')
+LldpEntry = namedtuple('LldpEntry', 'port chassis remote_port system_name')
+LagEntry = namedtuple('LagEntry', 'lag ports')
+
+
+class InterfaceArpEntry(namedtuple('InterfaceArpEntry', 'ip mac interface port')):  # ARP Vector: колонка Interface (Vlan1) вместо номера VLAN
+    __slots__ = ()
+
+    @property
+    def vlan(self):
+        return self.interface[4:] if self.interface.startswith('Vlan') else self.interface
+
+
+def row_pattern(*columns):  # Шаблон строки из колонок по порядку: имя поля или (имя поля, шаблон); имя None - колонка без поля
+    parts = []
+    for column in columns:
+        name, pattern = column if isinstance(column, tuple) else (column, r'\S+')
+        parts.append(pattern if name is None else f'(?P<{name}>{pattern})')
+    return r'^[ \t]*' + r'[ \t]+'.join(parts)
+
+
+class RowParser:    # Вывод -> записи: один findall скомпилированного шаблона строки, группы шаблона - поля записи по порядку
+    # Шаблон компилируется при первом разборе таблицы этого вида, а не при импорте (время запуска findPort.py)
+    def __init__(self, record, pattern):
+        self.record = record
+        self.source = pattern
+        self._pattern = None
+        self.index = {field: number for number, field in enumerate(record._fields)}
+
+    @property
+    def pattern(self):
+        if self._pattern is None:
+            pattern = re.compile(self.source, re.M)
+            if tuple(pattern.groupindex) != self.record._fields:
+                raise ValueError(f"Группы шаблона {tuple(pattern.groupindex)} не совпадают с полями {self.record.__name__}")
+            self._pattern = pattern
+        return self._pattern
+
+    def rows(self, output_loc):     # Кортежи колонок без построения записей - для полных таблиц (index - номера полей)
+        return self.pattern.findall(output_loc)
+
+    def parse(self, output_loc):
+        return list(map(self.record._make, self.pattern.findall(output_loc)))
+
+
+# (вендор, таблица) -> парсер. Eltex MES:
+#   show mac address-table:  "  1     a8:f9:4b:12:34:56   gi1/0/1    dynamic"
+#   show arp:                " vlan 1   gi1/0/1   10.0.0.1   a8:f9:4b:00:00:01   dynamic"
+#   show lldp neighbors:     "gi1/0/49  a8:f9:4b:aa:bb:cc  gi1/0/52  sw102  B, R  105"
+#   show interface channel-group 1:  "Po1      Active: gi1/0/49,gi1/0/50"
+# Vector / QTECH:
+#   show mac-address-table:  "1    00-03-0f-12-34-56   DYNAMIC Hardware Ethernet1/0/1"
+#   show arp:                "10.0.0.1   00-03-0f-00-00-01 Vlan1   Ethernet1/0/1   Dynamic 1180"
+#   show lldp neighbors brief:  "Ethernet1/0/25  a8-f9-4b-aa-bb-cc  gi1/0/1  sw103 ..."
+#   show interface port-channel 1:  строка со списком портов Ethernet
+TABLE_PARSERS = {
+    ('Eltex', 'mac'): RowParser(MacEntry, row_pattern('vlan', ('mac', MAC_FIELD), 'port', 'type')),
+    ('Vector', 'mac'): RowParser(VectorMacEntry, row_pattern('vlan', ('mac', MAC_FIELD), 'type', (None, r'\S+'), 'port')),
+    ('Eltex', 'arp'): RowParser(ArpEntry, row_pattern((None, 'vlan'), 'vlan', 'port', 'ip', ('mac', MAC_FIELD))),
+    ('Vector', 'arp'): RowParser(InterfaceArpEntry, row_pattern('ip', ('mac', MAC_FIELD), ('interface', r'Vlan\S*'), 'port')),
+    ('Eltex', 'lldp'): RowParser(LldpEntry, row_pattern(('port', PORT_FIELD), 'chassis', 'remote_port', 'system_name')),
+    ('Vector', 'lldp'): RowParser(LldpEntry, row_pattern(('port', PORT_FIELD), 'chassis', 'remote_port', 'system_name')),
+    ('Eltex', 'lag'): RowParser(LagEntry, r'^[ \t]*(?P<lag>\S+)[ \t]+[^:\n]*:[ \t]*(?P<ports>[^\n]*?)[ \t\r]*$'),
+    ('Vector', 'lag'): RowParser(LagEntry, r'^(?P<lag>)(?P<ports>[^\n]*Ethernet[^\n]*?)[ \t\r]*$'),
+}
+
+# Команды профиля производителя (vendor_profiles) -> вид таблицы в выводе
+COMMAND_TABLES = {
+    'mac_by_address': 'mac', 'mac_by_port': 'mac', 'mac_table': 'mac',
+    'arp_by_ip': 'arp', 'arp_by_mac': 'arp', 'arp_table': 'arp',
+    'lldp_by_port': 'lldp', 'lldp_table': 'lldp',
+    'lag_ports': 'lag',
+}
+
+
+def normalize_mac(mac_loc):     # aa-bb-cc-dd-ee-ff / AA:BB:... -> aa:bb:cc:dd:ee:ff
+    return mac_loc.lower().replace('-', ':')
+
+
+def table_parser(vendor, command_key):
+    table = COMMAND_TABLES.get(command_key, command_key)
+    return table, TABLE_PARSERS.get((vendor, table)) or TABLE_PARSERS[('Eltex', table)]
+
+
+def parse_output(output_loc, vendor, command_key):    # Вывод команды профиля -> [записи таблицы] за один проход
+    table, parser = table_parser(vendor, command_key)
+    with timings.span('parse', vendor=vendor, table=table):
+        return parser.parse(output_loc)
+
+
+def table_rows(output_loc, vendor, command_key):    # (номера полей, [кортежи колонок]) - как parse_output, но без namedtuple
+    table, parser = table_parser(vendor, command_key)
+    with timings.span('parse', vendor=vendor, table=table):
+        return parser.index, parser.rows(output_loc)
+
+
+def parse_mac_table(output_loc, vendor):    # Полная таблица MAC -> [(vlan, mac, port)], только динамические записи
+    index, rows = table_rows(output_loc, vendor, 'mac')
+    vlan, mac, port, kind = index['vlan'], index['mac'], index['port'], index['type']
+    return [(row[vlan], row[mac].lower().replace('-', ':'), row[port]) for row in rows if row[kind][:3].lower() == 'dyn']
+
+
+def parse_lldp_table(output_loc, vendor=None):  # Полная таблица LLDP -> [(локальный порт, имя соседнего коммутатора)]
+    index, rows = table_rows(output_loc, vendor, 'lldp')
+    port, chassis, system_name = index['port'], index['chassis'], index['system_name']
+    search = SW_RE.search
+    return [(row[port], neighbor.group()) for row in rows if (neighbor := search(row[system_name]) or search(row[chassis]))]
+
+
+def parse_lldp_neighbors(output_loc, vendor=None):   # Полная таблица LLDP -> {локальный порт: имя соседнего коммутатора}
+    neighbors = {}
+    for port_loc, neighbor in parse_lldp_table(output_loc, vendor):
+        neighbors.setdefault(port_loc, neighbor)
+    return neighbors
+
+
+def parse_lag_members(output_loc, lag_loc, vendor):     # Вывод show interface channel-group/port-channel -> список портов LAG
+    for entry in parse_output(output_loc, vendor, 'lag'):
+        if vendor == 'Vector':
+            return [item for item in entry.ports.split() if item not in ('n', 'r')]
+        if entry.lag.lower() == lag_loc.lower():
+            return [port.strip() for port in entry.ports.split(',')] if entry.ports else None
+    return None
+
+
+def lag_number(lag_loc):    # Po12 -> '12' для команды просмотра состава LAG
+    return LAG_NUMBER_RE.search(lag_loc).group()
+
+
+def parse_arp_table(output_loc, vendor):    # Полная таблица ARP -> [(ip, mac)]
+    index, rows = table_rows(output_loc, vendor, 'arp')
+    ip, mac = index['ip'], index['mac']
+    return [(row[ip], row[mac].lower().replace('-', ':')) for row in rows]
+
+
+def parse_mac_lookup(output_loc, mac_loc, vendor):  # Вывод поиска одного MAC -> (порт, vlan); порт 'self', если это адрес самого коммутатора
+    if SELF_RE.search(output_loc):
+        return "self", None
+    mac_loc = normalize_mac(mac_loc)
+    for entry in parse_output(output_loc, vendor, 'mac'):
+        if entry.type.lower().startswith('dyn') and normalize_mac(entry.mac) == mac_loc:
+            return entry.port, entry.vlan
+    return None, None
+
+
+def parse_lldp_neighbor(output_loc, port_loc, vendor=None):  # Вывод LLDP -> имя соседа за портом (строка таблицы или подробный вывод по порту)
+    neighbor = parse_lldp_neighbors(output_loc, vendor).get(port_loc)
+    if neighbor is not None:
+        return neighbor
+    system_name = SYSTEM_NAME_RE.search(output_loc)
+    if system_name is not None:
+        neighbor = SW_RE.search(system_name.group(1))
+        if neighbor is not None:
+            return neighbor.group()
+    return None
+
+
+def count_mac_entries(output_loc, vendor):  # Сколько MAC-адресов в выводе таблицы (несколько на порту - неуправляемый коммутатор)
+    return len(table_rows(output_loc, vendor, 'mac')[1])
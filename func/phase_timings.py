@@ -0,0 +1,186 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)   # Границы гистограмм, сек
+
+
+class Histogram:    # Гистограмма длительностей одной фазы с одними метками: число, сумма, максимум, байты, ошибки
+    __slots__ = ('counts', 'count', 'total', 'max', 'bytes', 'errors')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # Последний интервал - больше всех границ (+Inf)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.bytes = 0
+        self.errors = 0
+
+    def add(self, seconds, size=0, error=False):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.bytes += size
+        self.errors += bool(error)
+
+    def quantile(self, share):  # Оценка по гистограмме: верхняя граница интервала, не больше максимума
+        rank = share * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS, self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self):
+        return {'count': self.count, 'sum': round(self.total, 6), 'max': round(self.max, 6),
+                'p50': round(self.quantile(0.5), 6), 'p95': round(self.quantile(0.95), 6),
+                'bytes': self.bytes, 'errors': self.errors, 'buckets': dict(zip([*map(str, BUCKETS), '+Inf'], self.counts))}
+
+
+class Span:     # Открытый замер; size - принятые байты, если фаза их знает
+    __slots__ = ('size', 'error')
+
+    def __init__(self):
+        self.size = 0
+        self.error = False
+
+
+def exact_quantile(values, share):     # values отсортированы
+    return values[min(int(len(values) * share), len(values) - 1)] if values else 0.0
+
+
+class PhaseTimings:     # Замеры фаз поиска: DNS, ping, SSH, команды коммутаторов, разбор, LDAP, базы Computers/Users, OUI
+    # Каждый замер - фаза и метки (switch, command, vendor, table...). Замеры сводятся в гистограммы трех видов:
+    # total - с запуска процесса (экспорт Prometheus), run - с начала текущего запуска поиска/пакета (new_run),
+    # rolling - точные перцентили за последние window секунд (для долго работающего сервера)
+    def __init__(self, window=300, max_recent=100000):
+        self.window = window
+        self.started = time.time()
+        self._total = {}    # (фаза, метки) -> Histogram
+        self._run = {}
+        self._recent = deque(maxlen=max_recent)     # (время, (фаза, метки), сек)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, phase, **labels):
+        span = Span()
+        started = time.perf_counter()
+        try:
+            yield span
+        except BaseException:
+            span.error = True
+            raise
+        finally:
+            self.record(phase, time.perf_counter() - started, span.size, span.error, **labels)
+
+    def record(self, phase, seconds, size=0, error=False, **labels):
+        key = (phase, tuple(sorted((name, str(value)) for name, value in labels.items() if value is not None)))
+        now = time.monotonic()
+        with self._lock:
+            for histograms in (self._total, self._run):
+                histogram = histograms.get(key)
+                if histogram is None:
+                    histogram = histograms[key] = Histogram()
+                histogram.add(seconds, size, error)
+            self._recent.append((now, key, seconds))
+            while self._recent and self._recent[0][0] < now - self.window:
+                self._recent.popleft()
+
+    def new_run(self):  # Начало нового запуска: гистограммы run обнуляются, total и rolling - нет
+        with self._lock:
+            self._run = {}
+
+    def _snapshot(self, scope):
+        with self._lock:
+            if scope == 'rolling':
+                now = time.monotonic()
+                recent = {}
+                for moment, key, seconds in self._recent:
+                    if moment >= now - self.window:
+                        recent.setdefault(key, []).append(seconds)
+                return recent
+            return {key: histogram.to_dict() for key, histogram in (self._total if scope == 'total' else self._run).items()}
+
+    def rolling(self):  # {(фаза, метки): {count, p50, p95, max}} за последние window секунд
+        result = {}
+        for key, values in self._snapshot('rolling').items():
+            values.sort()
+            result[key] = {'count': len(values), 'p50': round(exact_quantile(values, 0.5), 6),
+                           'p95': round(exact_quantile(values, 0.95), 6), 'max': round(values[-1], 6)}
+        return result
+
+    def to_json(self):
+        def entries(stats):
+            return [dict(phase=phase, labels=dict(labels), **values) for (phase, labels), values in sorted(stats.items())]
+        return {'started': self.started, 'window': self.window, 'total': entries(self._snapshot('total')),
+                'run': entries(self._snapshot('run')), 'rolling': entries(self.rolling())}
+
+    def to_prometheus(self):    # Текстовый формат Prometheus: гистограммы с запуска, перцентили скользящего окна
+        def label_text(labels, **extra):
+            pairs = list(labels) + list(extra.items())
+            if not pairs:
+                return ''
+            return '{' + ','.join(f'{name}="{escape(value)}"' for name, value in pairs) + '}'
+
+        lines = ['# HELP findport_phase_seconds Длительность фаз поиска', '# TYPE findport_phase_seconds histogram']
+        total = sorted(self._snapshot('total').items())
+        for (phase, labels), values in total:
+            labels = (('phase', phase),) + labels
+            cumulative = 0
+            for bound, count in values['buckets'].items():
+                cumulative += count
+                lines.append(f"findport_phase_seconds_bucket{label_text(labels, le=bound)} {cumulative}")
+            lines.append(f"findport_phase_seconds_sum{label_text(labels)} {values['sum']}")
+            lines.append(f"findport_phase_seconds_count{label_text(labels)} {values['count']}")
+        for name, field, help_text in (('findport_phase_bytes_total', 'bytes', 'Принято байт'),
+                                       ('findport_phase_errors_total', 'errors', 'Фазы, завершившиеся ошибкой')):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            lines += [f"{name}{label_text((('phase', phase),) + labels)} {values[field]}" for (phase, labels), values in total]
+        lines += [f"# HELP findport_phase_recent_seconds Перцентили длительности за последние {self.window} с",
+                  '# TYPE findport_phase_recent_seconds gauge']
+        for (phase, labels), values in sorted(self.rolling().items()):
+            for quantile, field in (('0.5', 'p50'), ('0.95', 'p95')):
+                lines.append(f"findport_phase_recent_seconds{label_text((('phase', phase),) + labels, quantile=quantile)} {values[field]}")
+        return '\n'.join(lines) + '\n'
+
+    def save(self, path):   # Экспорт в файл: .prom - формат Prometheus, иначе JSON
+        text = self.to_prometheus() if path.endswith('.prom') else json.dumps(self.to_json(), ensure_ascii=False, indent=1)
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(temp_path, path)
+
+    def summary(self, limit=10):    # Текст для --profile: время по фазам, самые медленные коммутаторы и команды текущего запуска
+        stats = self._snapshot('run')
+        phases = {}
+        for (phase, _), values in stats.items():
+            totals = phases.setdefault(phase, [0, 0.0, 0.0])
+            totals[0] += values['count']
+            totals[1] += values['sum']
+            totals[2] = max(totals[2], values['max'])
+        lines = [f"{'Фаза':<12} {'Замеров':>8} {'Всего, с':>9} {'Макс, мс':>9}"]
+        lines += [f"{phase:<12} {count:>8} {total:>9.3f} {maximum * 1000:>9.1f}"
+                  for phase, (count, total, maximum) in sorted(phases.items(), key=lambda item: -item[1][1])]
+        for phase, title in (('hop', 'Самые медленные коммутаторы'), ('command', 'Самые медленные команды')):
+            rows = sorted(((dict(labels), values) for (name, labels), values in stats.items() if name == phase),
+                          key=lambda row: -row[1]['p95'])[:limit]
+            if not rows:
+                continue
+            lines += ['', title, f"{'p50, мс':>8} {'p95, мс':>8} {'Макс, мс':>9} {'Число':>6} {'КБ':>8}  Метки"]
+            lines += [f"{values['p50'] * 1000:>8.1f} {values['p95'] * 1000:>8.1f} {values['max'] * 1000:>9.1f} {values['count']:>6} "
+                      f"{values['bytes'] / 1024:>8.1f}  {' '.join(f'{name}={value}' for name, value in labels.items())}"
+                      for labels, values in rows]
+        return '\n'.join(lines)
+
+
+def escape(value):  # Значение метки Prometheus: обратная косая, кавычки и переводы строк экранируются
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+timings = PhaseTimings()    # Общий для всех модулей процесса, как pager_stats в ssh_reader
@@ -0,0 +1,38 @@
+FIELDS = ('switch', 'port', 'vlan', 'mac', 'vendor', 'ip', 'hostname', 'login', 'logon', 'display_name')
+
+
+def port_inventory(switch_loc, entries, vendors, ips, reverse_many, computer_logins, display_names):
+    # Все устройства за портом или коммутатором: каждый источник опрашивается один раз на весь список,
+    # поэтому число запросов не растет с числом MAC. Источники принимают список и возвращают словарь:
+    # vendors(macs) -> {mac: (компания, ...)} по локальной базе OUI, ips(macs) -> {mac: ip} по снимку ARP ядра,
+    # reverse_many(ips) -> {ip: DNS-имя} (параллельно), computer_logins(имена) -> {имя АРМ: (логин, время)}
+    # одним проходом по базе Computers, display_names(логины) -> {логин: ФИО} одним запросом к AD.
+    # Источник None не опрашивается; недоступный источник оставляет свои поля пустыми и попадает в errors
+    rows = [dict.fromkeys(FIELDS) for _ in entries]
+    errors = {}
+
+    def fill(source, function, keys, apply):
+        keys = [key for key in dict.fromkeys(keys) if key]
+        if function is None or not keys:
+            return
+        try:
+            answers = function(keys)
+        except Exception as e:
+            errors[source] = f"{type(e).__name__}: {e}"
+            return
+        for row in rows:
+            apply(row, answers)
+
+    for row, (vlan_loc, mac_loc, port_loc) in zip(rows, entries):
+        row.update(switch=switch_loc, port=port_loc, vlan=vlan_loc, mac=mac_loc)
+    fill('vendor', vendors, [row['mac'] for row in rows],
+         lambda row, answers: row.update(vendor=(answers.get(row['mac']) or (None,))[0]))
+    fill('arp', ips, [row['mac'] for row in rows],
+         lambda row, answers: row.update(ip=answers.get(row['mac'])))
+    fill('dns', reverse_many, [row['ip'] for row in rows],
+         lambda row, answers: row.update(hostname=(answers.get(row['ip']) or '').split('.')[0] or None))
+    fill('computers', computer_logins, [row['hostname'] for row in rows],
+         lambda row, answers: row.update(zip(('login', 'logon'), answers.get(row['hostname']) or (None, None))))
+    fill('ldap', display_names, [row['login'] for row in rows],
+         lambda row, answers: row.update(display_name=answers.get(row['login'])))
+    return rows, errors
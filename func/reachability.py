@@ -0,0 +1,200 @@
+import errno
+import os
+import struct
+import threading
+import time
+
+from phase_timings import timings
+
+ICMP_ECHO_REQUEST = 8
+ICMP_ECHO_REPLY = 0
+MAX_PARALLEL = 512  # Сколько узлов проверяется одновременно (ограничение числа открытых сокетов)
+
+
+def icmp_checksum(data):
+    if len(data) % 2:
+        data += b'\0'
+    total = sum(struct.unpack(f'!{len(data) // 2}H', data))
+    total = (total >> 16) + (total & 0xffff)
+    total += total >> 16
+    return ~total & 0xffff
+
+
+def icmp_echo(identifier, sequence):
+    payload = b'findPort'
+    header = struct.pack('!BBHHH', ICMP_ECHO_REQUEST, 0, 0, identifier, sequence)
+    checksum = icmp_checksum(header + payload)
+    return struct.pack('!BBHHH', ICMP_ECHO_REQUEST, 0, checksum, identifier, sequence) + payload
+
+
+def open_icmp_socket():     # (сокет, raw) или (None, False), если ICMP процессу запрещен
+    # Непривилегированный ICMP (SOCK_DGRAM, net.ipv4.ping_group_range), затем raw-сокет (root/CAP_NET_RAW)
+    import socket   # Здесь и ниже - при первой проверке: socket и selectors не загружаются при запуске
+    for sock_type, raw in ((socket.SOCK_DGRAM, False), (socket.SOCK_RAW, True)):
+        try:
+            sock = socket.socket(socket.AF_INET, sock_type, socket.IPPROTO_ICMP)
+        except OSError:
+            continue
+        sock.setblocking(False)
+        return sock, raw
+    return None, False
+
+
+class ReachabilityProber:   # Проверка доступности узлов без запуска ping: ICMP echo, при отсутствии ответа TCP-connect
+    def __init__(self, tcp_port=22, timeout_ms=1000, cache_ttl=5, resolver=None):
+        self.tcp_port = tcp_port    # Порт для TCP-проверки (SSH); RST (connection refused) тоже означает, что узел жив
+        self.timeout = timeout_ms / 1000
+        self.cache_ttl = cache_ttl
+        self.resolver = resolver    # DnsResolver; без него имена разрешаются по одному через socket
+        self.icmp_allowed = None    # Выясняется при первой проверке
+        self._cache = {}    # узел -> (доступен, срок годности)
+        self._lock = threading.Lock()
+        self._identifier = os.getpid() & 0xffff
+        self._sequence = 0
+
+    def probe(self, host, attempts=1):  # True, если узел ответил; повторные попытки идут мимо кэша
+        for attempt in range(attempts):
+            if self.probe_many([host], use_cache=attempt == 0)[host]:
+                return True
+        return False
+
+    def probe_many(self, hosts, use_cache=True, ttl=None):  # {узел: доступен} для всех узлов сразу, примерно за один таймаут
+        results = {}
+        pending = []
+        now = time.monotonic()
+        with self._lock:
+            for host in dict.fromkeys(hosts):
+                cached = self._cache.get(host) if use_cache else None
+                if cached is not None and cached[1] > now:
+                    results[host] = cached[0]
+                else:
+                    pending.append(host)
+        addresses = {}
+        resolved = self._resolve(pending)
+        for host in pending:
+            if resolved.get(host.strip()) is not None:
+                addresses[host] = resolved[host.strip()]
+            else:
+                results[host] = False   # Имя не разрешается - узел недоступен
+        ips = list(dict.fromkeys(addresses.values()))
+        alive = set()
+        if ips:
+            with timings.span('ping'):    # Один замер на опрос, сколько бы узлов в нем ни было
+                for offset in range(0, len(ips), MAX_PARALLEL):
+                    alive.update(self._sweep(ips[offset:offset + MAX_PARALLEL]))
+        expires = time.monotonic() + (self.cache_ttl if ttl is None else ttl)
+        with self._lock:
+            for host in pending:
+                if host in addresses:
+                    results[host] = addresses[host] in alive
+                self._cache[host] = (results[host], expires)
+        return results
+
+    def _resolve(self, hosts):
+        if self.resolver is not None:
+            return self.resolver.resolve_many(hosts)
+        import socket
+        resolved = {}
+        for host in hosts:
+            try:
+                resolved[host.strip()] = socket.gethostbyname(host.strip())
+            except OSError:
+                resolved[host.strip()] = None
+        return resolved
+
+    def _next_sequence(self):
+        with self._lock:
+            self._sequence = (self._sequence + 1) & 0xffff
+            return self._sequence
+
+    def _sweep(self, ips):  # Множество ответивших адресов
+        # Эхо-запросы уходят всем сразу; не ответившим за половину таймаута параллельно
+        # открывается TCP-соединение. Все ответы собираются одним select до общего срока
+        import selectors
+        import socket
+        start = time.monotonic()
+        deadline = start + self.timeout
+        alive = set()
+        targets = set(ips)
+        selector = selectors.DefaultSelector()
+        icmp, raw = open_icmp_socket()
+        self.icmp_allowed = icmp is not None
+        fallback_at = start
+        if icmp is not None:
+            sent = False
+            for ip in ips:
+                try:
+                    icmp.sendto(icmp_echo(self._identifier, self._next_sequence()), (ip, 0))
+                    sent = True
+                except OSError:
+                    pass    # Нет маршрута и т.п. - остается TCP-проверка
+            if sent:
+                selector.register(icmp, selectors.EVENT_READ)
+                fallback_at = start + self.timeout / 2
+        connects = {}   # сокет -> адрес
+        try:
+            while alive != targets:
+                now = time.monotonic()
+                if now >= deadline:
+                    break
+                if fallback_at is not None and now >= fallback_at:
+                    for ip in targets - alive:
+                        sock = self._connect(ip, alive)
+                        if sock is not None:
+                            connects[sock] = ip
+                            selector.register(sock, selectors.EVENT_WRITE)
+                    fallback_at = None
+                    if alive == targets:
+                        break
+                if not selector.get_map():
+                    if fallback_at is None:
+                        break
+                    time.sleep(max(fallback_at - now, 0))
+                    continue
+                wait = (fallback_at if fallback_at is not None else deadline) - now
+                for key, _ in selector.select(max(wait, 0)):
+                    if key.fileobj is icmp:
+                        self._read_replies(icmp, raw, targets, alive)
+                    else:
+                        sock = key.fileobj
+                        error = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                        if error in (0, errno.ECONNREFUSED):
+                            alive.add(connects[sock])
+                        selector.unregister(sock)
+                        sock.close()
+                        del connects[sock]
+        finally:
+            for sock in connects:
+                sock.close()
+            if icmp is not None:
+                icmp.close()
+            selector.close()
+        return alive
+
+    def _connect(self, ip, alive):  # Неблокирующий connect; None, если результат известен сразу
+        import socket
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setblocking(False)
+        error = sock.connect_ex((ip, self.tcp_port))
+        if error in (errno.EINPROGRESS, errno.EWOULDBLOCK):
+            return sock
+        if error in (0, errno.ECONNREFUSED):
+            alive.add(ip)
+        sock.close()
+        return None
+
+    def _read_replies(self, icmp, raw, targets, alive):
+        while True:
+            try:
+                data, (ip, _) = icmp.recvfrom(2048)
+            except OSError:     # В том числе BlockingIOError - ответы кончились
+                return
+            if raw:     # raw-сокет отдает пакет с IP-заголовком и весь входящий ICMP
+                data = data[(data[0] & 0x0f) * 4:]
+            if len(data) < 8:
+                continue
+            icmp_type, _, _, identifier, _ = struct.unpack('!BBHHH', data[:8])
+            if icmp_type != ICMP_ECHO_REPLY or (raw and identifier != self._identifier):
+                continue
+            if ip in targets:
+                alive.add(ip)
@@ -1,44 +1,27 @@
-import requests
-from requests.auth import HTTPBasicAuth
-from datetime import datetime
-import json
-import re
+feed_caches = {}    # (сервер, пользователь) -> FeedCache, общий для всех поисков процесса
 
-def response_base_srv(srv_base_loc, base_loc, username_loc, password_base_loc, find_parametr_loc):
-    # Отправка GET-запроса с использованием аутентификации HTTPBasicAuth
-    url = f"https://{srv_base_loc}/{base_loc}.json"
-    response = requests.get(url, verify = False,  auth=HTTPBasicAuth(username_loc, password_base_loc))
-    max_datetime_key, max_datetime_value = None, None
-    # Проверить успешность GET запроса
-    if response.status_code == 200:
-        try:
-            # Декодируем ответ с учетом utf-16LE и удаляем BOM символ
-            json_data = json.loads(response.content.decode('utf-16LE').lstrip('\ufeff'))
-            key = None
-            for item in json_data:
-                key = item.get('Key')
-                if key == find_parametr_loc:
-                    value = item.get('Value')
-                    value_datetime = {}
-                    for k, v in value.items():
-                        if re.match(r"[A-Za-z]{3} \d{2}\/\d{2}\/\d{4} \d{2}:\d{2}:\d{2}", v):
-                            value_datetime[k] = datetime.strptime(v, '%a %m/%d/%Y %H:%M:%S')
-                        elif re.match(r"\d{2}\.\d{2}\.\d{4} \d+:\d{2}:\d{2}", v):
-                            value_datetime[k] = datetime.strptime(v, '%d.%m.%Y %H:%M:%S')
-                        else:
-                            value_datetime[k] = datetime.strptime(v, '%d.%m.%Y %H:%M:%S')
-                    max_datetime_key = max(value_datetime, key=lambda k: value_datetime[k])
-                    max_datetime_value = value_datetime[max_datetime_key]
 
-                    #print(f"  Item: {max_datetime_key}")
-                    #print(f"  LastLogOn: {max_datetime_value}")
-                    break
-             
-        except json.JSONDecodeError as e:
-            print(f"Произошла ошибка при декодировании JSON: {e}")
-        except Exception as e:
-            print(f"Произошла ошибка: {e}")
-    else:
-       print(f"Ошибка при выполнении GET запроса: {response.status_code}")
-    
+def feed_cache(srv_base_loc, username_loc, password_base_loc, ttl_loc=300, mode_loc='index'):
+    cache = feed_caches.get((srv_base_loc, username_loc))
+    if cache is None:
+        from feed_cache import FeedCache    # Разбор баз (json, datetime) загружается при первом обращении к ним
+        cache = feed_caches.setdefault((srv_base_loc, username_loc), FeedCache(srv_base_loc, username_loc, password_base_loc, ttl_loc, mode_loc))
+    return cache
+
+
+def response_base_srv(srv_base_loc, base_loc, username_loc, password_base_loc, find_parametr_loc, ttl_loc=300, mode_loc='index'):
+    # Последний АРМ пользователя (база Users) или последний пользователь АРМ (база Computers).
+    # База скачивается один раз и дальше только перепроверяется (ETag/If-Modified-Since или TTL)
+    try:
+        cache = feed_cache(srv_base_loc, username_loc, password_base_loc, ttl_loc, mode_loc)
+        max_datetime_key, max_datetime_value = cache.lookup(base_loc, find_parametr_loc)
+    except Exception as e:
+        print(f"Произошла ошибка: {e}")
+        return None, None
     return (max_datetime_key, max_datetime_value) if max_datetime_key is not None else (None, None)
+
+
+def response_base_srv_many(srv_base_loc, base_loc, username_loc, password_base_loc, find_parametrs_loc, ttl_loc=300, mode_loc='index'):
+    # {ключ: (последний АРМ/пользователь, время)} для многих ключей - одно обращение к базе вместо запроса на ключ
+    cache = feed_cache(srv_base_loc, username_loc, password_base_loc, ttl_loc, mode_loc)
+    return cache.lookup_many(base_loc, find_parametrs_loc)
@@ -0,0 +1,70 @@
+import configparser
+
+# (атрибут, секция, ключ, тип, значение по умолчанию; None - обязательный параметр)
+OPTIONS = (
+    ('hostname', 'Connection', 'hostname', str, None),
+    ('location', 'Connection', 'location', str, None),
+    ('ssh_port', 'Connection', 'port', int, None),
+    ('username', 'Connection', 'username', str, None),
+    ('password', 'Connection', 'password', str, None),
+    ('debug', 'Connection', 'debug', int, None),
+    ('session_idle_timeout', 'Connection', 'session_idle_timeout', int, 300),   # Время жизни простаивающей SSH-сессии, сек
+    ('session_keepalive', 'Connection', 'session_keepalive', int, 30),  # Интервал SSH keepalive, сек
+    ('command_timeout', 'Connection', 'command_timeout', int, 30),  # Максимальное время ожидания ответа на команду, сек
+    ('arp_cache_ttl', 'Connection', 'arp_cache_ttl', int, 120),     # Срок годности снимка ARP ядра, сек (0 - не использовать)
+    ('topology_file', 'Connection', 'topology_file', str, 'topology.json'),     # Файл графа топологии LLDP
+    ('topology_max_age', 'Connection', 'topology_max_age', int, 3600),  # Сколько секунд граф заменяет запрос LLDP и состава LAG
+    ('switch_profiles_file', 'Connection', 'switch_profiles_file', str, 'switches.json'),   # Кэш производителей и моделей коммутаторов
+    ('switch_profiles_max_age', 'Connection', 'switch_profiles_max_age', int, 604800),  # Через сколько секунд повторить show ver
+    ('history_file', 'Connection', 'history_file', str, 'history.db'),  # История найденных путей (пусто - не вести)
+    ('oui_database_file', 'Connection', 'oui_database', str, 'oui.bin'),    # Локальная база производителей по MAC
+    ('probe_timeout_ms', 'Connection', 'probe_timeout_ms', int, 1000),  # Ожидание ответа при проверке доступности, мс
+    ('probe_cache_ttl', 'Connection', 'probe_cache_ttl', int, 5),   # Сколько секунд помнить результат проверки доступности
+    ('dns_ttl', 'Connection', 'dns_ttl', int, 300),     # Срок хранения найденного в DNS имени, сек
+    ('dns_negative_ttl', 'Connection', 'dns_negative_ttl', int, 30),    # Срок хранения ненайденного имени, сек
+    ('dns_timeout_ms', 'Connection', 'dns_timeout_ms', int, 2000),  # Максимальное ожидание ответа DNS, мс
+    ('enrichment_timeout_ms', 'Connection', 'enrichment_timeout_ms', int, 3000),    # Срок сведений об устройстве от начала поиска, мс
+    ('metrics_window', 'Connection', 'metrics_window', int, 300),   # Окно скользящих перцентилей замеров фаз, сек
+    ('username_base', 'Connection_base', 'username', str, None),
+    ('password_base', 'Connection_base', 'password', str, None),
+    ('srv_base', 'Connection_base', 'srv', str, None),
+    ('feed_cache_ttl', 'Connection_base', 'cache_ttl', int, 300),   # Как часто сверять копию баз Users/Computers с сервером, сек
+    ('feed_mode', 'Connection_base', 'feed_mode', str, 'index'),    # index (быстрее), stream (память по числу ключей, разбор в 2-3 раза дольше) или scan (без индекса)
+    ('ldap_srv', 'Connection_ldap', 'ldap_srv', str, None),
+    ('ldap_user', 'Connection_ldap', 'ldap_user', str, None),
+    ('ldap_password', 'Connection_ldap', 'ldap_password', str, None),
+    ('ldap_cache_ttl', 'Connection_ldap', 'cache_ttl', int, 3600),  # Срок хранения ФИО по логину в кэше, сек
+    ('name_index_enabled', 'Connection_ldap', 'name_index', int, 1),    # Локальный индекс ФИО для поиска по части ФИО
+    ('name_index_interval', 'Connection_ldap', 'name_index_interval', int, 300),    # Период дозагрузки изменений из AD, сек
+    ('crawler_enabled', 'Crawler', 'enabled', int, 0),  # Фоновый индекс MAC-адресов фабрики
+    ('crawler_workers', 'Crawler', 'workers', int, 8),  # Сколько коммутаторов опрашивается параллельно
+    ('crawler_interval', 'Crawler', 'interval', int, 900),  # Период перестроения индекса, сек
+    ('crawler_verify', 'Crawler', 'verify', int, 1),    # Подтверждать найденный в индексе порт запросом к коммутатору
+)
+
+
+class Settings:     # Параметры config.ini: файл разбирается один раз, значения уже приведены к своим типам
+    def __init__(self, values):
+        self.__dict__.update(values)
+
+    def __repr__(self):
+        return f"Settings({', '.join(f'{name}={value!r}' for name, value in vars(self).items() if 'password' not in name)})"
+
+
+def load_settings(path):    # Settings из файла; ValueError с именем параметра, если он отсутствует или не того типа
+    config = configparser.ConfigParser()
+    if not config.read(path):
+        raise ValueError(f"Файл '{path}' отсутствует")
+    values = {}
+    for name, section, key, kind, default in OPTIONS:
+        raw = config.get(section, key, fallback=None)
+        if raw is None:
+            if default is None:
+                raise ValueError(f"{path}: не задан параметр {key} в секции [{section}]")
+            values[name] = default
+            continue
+        try:
+            values[name] = kind(raw.strip())
+        except ValueError:
+            raise ValueError(f"{path}: параметр {key} в секции [{section}] должен быть {kind.__name__}, а не '{raw}'") from None
+    return Settings(values)
@@ -0,0 +1,91 @@
+import codecs
+import re
+import select
+import time
+
+from phase_timings import timings
+
+DEFAULT_PROMPT = re.compile(r'[#>]\s*$')   # Любая строка, оканчивающаяся на # или >, пока приглашение не изучено
+MORE_PROMPT = '--More-- '
+TAIL_SIZE = 512     # Сколько последних символов вывода проверять на приглашение
+ARGUMENT_RE = re.compile(r'\S*\d\S*|(?:[0-9a-f]{2}[:-]){5}[0-9a-f]{2}', re.IGNORECASE)   # Адреса, порты и номера в тексте команды
+
+pager_stats = {'more_prompts': 0}   # Сколько раз коммутатор все же выдал --More-- (постраничный вывод не отключился)
+
+
+def prompt_line(output_loc):    # Последняя строка баннера - приглашение коммутатора (sw123#)
+    lines = output_loc.replace('\r', '\n').rstrip().split('\n')
+    return lines[-1].strip() if lines else ''
+
+
+def prompt_marker(output_loc):  # Regex приглашения в любом месте вывода - граница ответов команд; None, если приглашение не распознано
+    last_line = prompt_line(output_loc)
+    if len(last_line) < 2 or last_line[-1] not in '#>':
+        return None
+    return re.compile(r'(?:^|\n|\r)' + re.escape(last_line[:-1]) + r'(?:\([\w-]+\))?[#>]')
+
+
+def command_label(command):     # Метка замера: команда без адресов и номеров портов (show arp ip-address <arg>)
+    return ARGUMENT_RE.sub('<arg>', command.strip())
+
+
+def learn_prompt(output_loc):   # Построение regex приглашения по последней строке баннера (например sw123#)
+    marker = prompt_marker(output_loc)
+    return re.compile(marker.pattern + r'\s*$') if marker is not None else DEFAULT_PROMPT
+
+
+def read_until_prompt(channel, prompt_re=None, timeout=30, encoding='utf-8', marker=None, count=1, span=None):
+    # Чтение вывода до приглашения: ожидание через select без холостого цикла,
+    # инкрементальное декодирование (многобайтовые символы не рвутся на границе блоков)
+    # и общий дедлайн на команду. Для конвейера команд - до count-го приглашения marker.
+    # span - замер phase_timings, в который учитываются принятые байты
+    prompt_re = prompt_re or DEFAULT_PROMPT
+    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    chunks = []
+    tail = ''
+    deadline = time.monotonic() + timeout
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError(f"Нет приглашения коммутатора за {timeout} с")
+        if not channel.recv_ready():
+            readable, _, _ = select.select([channel], [], [], remaining)
+            if not readable:
+                continue
+        data = channel.recv(65536)
+        if not data:
+            raise ConnectionError("Коммутатор закрыл соединение")
+        if span is not None:
+            span.size += len(data)
+        text = decoder.decode(data)
+        if not text:
+            continue
+        chunks.append(text)
+        tail = (tail + text)[-TAIL_SIZE:]
+        if tail.endswith(MORE_PROMPT):  # Запасной вариант, если постраничный вывод не отключен - запрос следующей страницы
+            pager_stats['more_prompts'] += 1
+            channel.send('\n')
+            continue
+        if prompt_re.search(tail) and (count == 1 or len(marker.findall(''.join(chunks))) >= count):
+            break
+    return ''.join(chunks)
+
+
+def run_command(session, command, timeout=30, encoding='utf-8'):
+    with timings.span('command', switch=session.hostname, command=command_label(command)) as span:
+        session.channel.send(command + '\n')
+        return read_until_prompt(session.channel, session.prompt, timeout, encoding, span=span)
+
+
+def run_pipeline(session, commands, timeout=30, encoding='utf-8'):
+    # Все команды одной записью в канал, вывод делится по приглашениям: одно ожидание ответа на весь набор.
+    # Пока приглашение коммутатора не распознано, границы ответов неизвестны - команды идут по одной
+    marker = prompt_marker(session.banner)
+    if marker is None or len(commands) < 2:
+        return [run_command(session, command, timeout, encoding) for command in commands]
+    with timings.span('command', switch=session.hostname, command=' ; '.join(map(command_label, commands))) as span:
+        session.channel.send(''.join(command + '\n' for command in commands))
+        output = read_until_prompt(session.channel, session.prompt, timeout, encoding, marker, len(commands), span)
+    bounds = list(marker.finditer(output))[:len(commands)]
+    starts = [0] + [match.end() for match in bounds[:-1]]
+    return [output[start:match.start()] for start, match in zip(starts, bounds)]
@@ -0,0 +1,142 @@
+import threading
+import time
+
+from phase_timings import timings
+from ssh_reader import read_until_prompt, learn_prompt
+
+
+class SshSession:   # Живое авторизованное соединение с коммутатором (client + shell channel)
+    def __init__(self, hostname, client, channel):
+        self.hostname = hostname
+        self.client = client
+        self.channel = channel
+        self.last_used = time.monotonic()
+        self.prompt = None  # Изученное приглашение коммутатора (regex), см. ssh_reader.learn_prompt
+        self.paging_disabled = False    # Команда отключения постраничного вывода уже отправлена
+        self.vendor = None  # Вендор и модель из show ver - запрашиваются один раз на сессию
+        self.model = None
+        self.banner = ''    # Вывод при входе до первого приглашения - по нему сверяется кэш профилей коммутаторов
+
+    def is_alive(self):  # Health check: транспорт активен и канал не закрыт
+        if self.client is None or self.channel is None:
+            return False
+        transport = self.client.get_transport()
+        if transport is None or not transport.is_active():
+            return False
+        return not self.channel.closed
+
+    def drain(self):    # Удаление из канала данных, оставшихся от предыдущего поиска
+        while self.channel.recv_ready():
+            self.channel.recv(65536)
+
+    def close(self):
+        try:
+            self.channel.close()
+        except Exception:
+            pass
+        try:
+            self.client.close()
+        except Exception:
+            pass
+
+
+class SshSessionPool:   # Пул сессий hostname -> [SshSession], общий для всех поисков процесса
+    def __init__(self, idle_timeout=300, keepalive=30, resolver=None):
+        self.idle_timeout = idle_timeout    # Через сколько секунд простоя сессия закрывается
+        self.keepalive = keepalive          # Интервал SSH keepalive, чтобы коммутатор не рвал простаивающую сессию
+        self.resolver = resolver            # DnsResolver: адрес коммутатора берется из общего кэша DNS
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, hostname):    # Выдать живую сессию к hostname или None, если ее нет в пуле
+        self.reap()
+        while True:
+            with self._lock:
+                sessions = self._idle.get(hostname)
+                if not sessions:
+                    return None
+                session = sessions.pop()
+            if session.is_alive():
+                try:
+                    session.drain()
+                except Exception:
+                    session.close()
+                    continue
+                session.last_used = time.monotonic()
+                return session
+            session.close()
+
+    def add(self, hostname, client, channel):   # Регистрация новой сессии; она сразу считается выданной
+        transport = client.get_transport()
+        if transport is not None and self.keepalive:
+            transport.set_keepalive(self.keepalive)
+        return SshSession(hostname, client, channel)
+
+    def connect(self, hostname, port, username, password, timeout=30, encoding='utf-8'):
+        # Неинтерактивное подключение для фоновых задач: без запросов пароля, ошибки - исключением
+        import paramiko
+        client = paramiko.SSHClient()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        address = hostname
+        if self.resolver is not None:
+            address = self.resolver.resolve(hostname)
+            if address is None:
+                raise ConnectionError(f"{hostname}: имя не разрешается в IP")
+        with timings.span('ssh_connect', switch=hostname):   # TCP, обмен ключами и авторизация
+            client.connect(address, port, username, password, timeout=timeout, banner_timeout=timeout, auth_timeout=timeout)
+        try:
+            with timings.span('ssh_shell', switch=hostname) as span:   # Открытие shell и баннер до приглашения
+                channel = client.invoke_shell()
+                output = read_until_prompt(channel, None, timeout, encoding, span=span)
+        except Exception:
+            client.close()
+            raise
+        session = self.add(hostname, client, channel)
+        session.prompt = learn_prompt(output)
+        session.banner = output
+        return session
+
+    def checkout(self, hostname, port, username, password, timeout=30, encoding='utf-8'):   # Сессия из пула или новое подключение
+        session = self.acquire(hostname)
+        if session is None:
+            session = self.connect(hostname, port, username, password, timeout, encoding)
+        return session
+
+    def release(self, session):     # Возврат сессии в пул после использования
+        if session is None:
+            return
+        if not session.is_alive():
+            session.close()
+            return
+        session.last_used = time.monotonic()
+        with self._lock:
+            self._idle.setdefault(session.hostname, []).append(session)
+
+    def discard(self, session):     # Закрыть сессию, не возвращая ее в пул (ошибка, таймаут)
+        if session is not None:
+            session.close()
+
+    def reap(self):     # Закрытие сессий, простаивающих дольше idle_timeout
+        now = time.monotonic()
+        expired = []
+        with self._lock:
+            for hostname, sessions in list(self._idle.items()):
+                alive = []
+                for session in sessions:
+                    if now - session.last_used > self.idle_timeout:
+                        expired.append(session)
+                    else:
+                        alive.append(session)
+                if alive:
+                    self._idle[hostname] = alive
+                else:
+                    del self._idle[hostname]
+        for session in expired:
+            session.close()
+
+    def close_all(self):
+        with self._lock:
+            sessions = [session for host_sessions in self._idle.values() for session in host_sessions]
+            self._idle.clear()
+        for session in sessions:
+            session.close()
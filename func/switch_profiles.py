@@ -0,0 +1,74 @@
+import json
+import os
+import threading
+import time
+
+from find_sw_vendor_function import find_sw_vendor, find_sw_model, find_sw_firmware, find_banner_vendor
+from ssh_reader import prompt_line
+from vendor_profiles import capability_cache
+
+
+class SwitchProfileCache:   # Сохраняемый между запусками кэш: коммутатор -> производитель, модель, прошивка, приглашение
+    # Производитель коммутатора не меняется между поисками, поэтому show ver выполняется один раз -
+    # при первом подключении. Дальше запись сверяется с тем, что коммутатор и так присылает при входе:
+    # приглашение должно совпасть, а производитель, если баннер его называет, - не противоречить записи.
+    # Раз в max_age запись все равно обновляется через show ver (замена прошивки при том же имени).
+    # Вместе с записями сохраняется capability_cache - какие точные команды поддерживает модель
+    def __init__(self, path=None, max_age=7 * 24 * 3600):
+        self.path = path
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._switches = {}     # коммутатор -> {'vendor', 'model', 'firmware', 'prompt', 'checked'}
+        self._lock = threading.Lock()
+
+    def identify(self, session, show_version):  # Заполняет session.vendor и session.model; True - без show ver
+        prompt = prompt_line(session.banner)
+        with self._lock:
+            entry = self._switches.get(session.hostname)
+        cached = entry is not None and self._valid(entry, prompt, session.banner)
+        if cached:
+            self.hits += 1
+        else:
+            self.misses += 1
+            output = show_version()
+            entry = {'vendor': find_sw_vendor(output, False), 'model': find_sw_model(output),
+                     'firmware': find_sw_firmware(output), 'prompt': prompt, 'checked': time.time()}
+            with self._lock:
+                self._switches[session.hostname] = entry
+        session.vendor = entry['vendor']
+        session.model = entry['model']
+        return cached
+
+    def _valid(self, entry, prompt, banner):
+        if not prompt or entry.get('prompt') != prompt:
+            return False    # Другое приглашение - на этом имени может быть другой коммутатор
+        if time.time() - entry.get('checked', 0) > self.max_age:
+            return False
+        banner_vendor = find_banner_vendor(banner[:-len(prompt)] if banner.endswith(prompt) else banner)
+        return banner_vendor is None or banner_vendor == entry['vendor']
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return  # Поврежденный файл - профили будут собраны заново
+        with self._lock:
+            self._switches = data.get('switches', {})
+        for model, command_key, supported in data.get('capabilities', []):
+            capability_cache.setdefault((model, command_key), supported)
+
+    def save(self):     # Атомарная запись: при сбое остается предыдущая версия файла
+        if not self.path:
+            return
+        with self._lock:
+            data = {'switches': self._switches,
+                    'capabilities': [[model, command_key, supported] for (model, command_key), supported in list(capability_cache.items())]}
+            text = json.dumps(data, ensure_ascii=False)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,92 @@
+import json
+import os
+import threading
+import time
+
+
+class TopologyGraph:    # Граф LLDP: коммутатор -> {локальный порт: соседний коммутатор} и состав LAG
+    # Полный список соседей (complete) и состав каждого LAG действуют max_age секунд: после перекоммутации
+    # поиск снова запрашивает LLDP и состав LAG, а не ведет по старому графу
+    def __init__(self, path=None, max_age=3600):
+        self.path = path
+        self.max_age = max_age
+        self._nodes = {}    # коммутатор -> {'complete', 'neighbors', 'lags', 'lags_updated', 'updated'}
+        self._lock = threading.Lock()
+
+    def _node(self, switch):
+        node = self._nodes.setdefault(switch, {'complete': False, 'neighbors': {}, 'lags': {}, 'lags_updated': {}, 'updated': None})
+        node.setdefault('lags_updated', {})     # Файл прежней версии: время LAG не записано - состав считается устаревшим
+        return node
+
+    def _fresh(self, updated):
+        return updated is not None and time.time() - updated <= self.max_age
+
+    def update_switch(self, switch, neighbors, lags):   # Полная таблица LLDP коммутатора (--inventory, /port, обход фабрики)
+        now = time.time()
+        with self._lock:
+            self._nodes[switch] = {'complete': True, 'neighbors': dict(neighbors), 'lags': dict(lags),
+                                   'lags_updated': dict.fromkeys(lags, now), 'updated': now}
+
+    def replace_neighbors(self, switch, neighbors):    # Полная таблица LLDP, снятая по ходу поиска, - прежние соседи больше не действуют
+        with self._lock:
+            self._node(switch)['neighbors'] = dict(neighbors)
+
+    def record_neighbor(self, switch, port_loc, neighbor):  # Сосед, найденный по ходу поиска
+        with self._lock:
+            self._node(switch)['neighbors'][port_loc] = neighbor
+
+    def record_lag(self, switch, lag_loc, members):
+        with self._lock:
+            node = self._node(switch)
+            node['lags'][lag_loc] = list(members)
+            node['lags_updated'][lag_loc] = time.time()
+
+    def is_complete(self, switch):  # Известны все аплинки коммутатора: порт без соседа в графе - граничный
+        with self._lock:
+            node = self._nodes.get(switch)
+            return node is not None and node['complete'] and self._fresh(node.get('updated'))
+
+    def lag_members(self, switch, lag_loc):
+        with self._lock:
+            node = self._nodes.get(switch)
+            if node is None or not self._fresh(node.get('lags_updated', {}).get(lag_loc)):
+                return None
+            members = node['lags'].get(lag_loc)
+            return list(members) if members else None
+
+    def next_switch(self, switch, port_loc, lag_ports=None):   # Сосед за портом (или за любым портом LAG), None - соседа нет
+        with self._lock:
+            node = self._nodes.get(switch)
+            if node is None:
+                return None
+            for port in [port_loc] + list(lag_ports or []):
+                neighbor = node['neighbors'].get(port.strip()) if port else None
+                if neighbor is not None:
+                    return neighbor
+        return None
+
+    def retain_switches(self, switches):
+        with self._lock:
+            for switch in set(self._nodes) - set(switches):
+                del self._nodes[switch]
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                nodes = json.load(f)
+        except (OSError, ValueError):
+            return  # Поврежденный файл - граф будет построен заново
+        with self._lock:
+            self._nodes = nodes
+
+    def save(self):     # Атомарная запись: при сбое остается предыдущая версия файла
+        if not self.path:
+            return
+        with self._lock:
+            data = json.dumps(self._nodes, ensure_ascii=False)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
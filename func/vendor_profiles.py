@@ -0,0 +1,83 @@
+import re
+
+# Профили производителей: команды, зависящие от синтаксиса CLI.
+# QTECH сводится к Vector в find_sw_vendor - синтаксис команд одинаковый.
+# Для поиска по адресу: (точная команда, запасная команда с фильтром | inc).
+# Точная команда заставляет коммутатор выдать одну запись вместо всей таблицы
+VENDOR_PROFILES = {
+    'Eltex': {
+        'disable_paging': 'terminal datadump',
+        'mac_separator': ':',
+        'mac_by_address': ('show mac address-table address {mac}', 'show mac add | inc {mac}'),
+        'arp_by_ip': ('show arp ip-address {ip}', 'show arp | inc {ip}'),
+        'arp_by_mac': ('show arp mac-address {mac}', 'show arp | inc {mac}'),
+        'lldp_by_port': ('show lldp neighbors {port}', 'show lldp neighbors | inc {port}'),
+        'lag_ports': 'show interface channel-group {lag}',
+        'mac_by_port': 'show mac add int {port}',
+        'mac_table': 'show mac add',
+        'lldp_table': 'show lldp neighbors',
+        'arp_table': 'show arp',
+    },
+    'Vector': {
+        'disable_paging': 'terminal length 0',
+        'mac_separator': '-',
+        'mac_by_address': ('show mac-address-table address {mac}', 'show mac-address-table | inc {mac}'),
+        'arp_by_ip': ('show arp {ip}', 'show arp | inc {ip}'),
+        'arp_by_mac': (None, 'show arp | inc {mac}'),
+        'lldp_by_port': ('show lldp neighbors interface ethernet {port_number}', 'show lldp neighbors brief | inc {port}'),
+        'lag_ports': 'show interface port-channel {lag}',
+        'mac_by_port': 'show mac-address-table int {port}',
+        'mac_table': 'show mac-address-table',
+        'lldp_table': 'show lldp neighbors brief',
+        'arp_table': 'show arp',
+    },
+}
+
+# Признаки того, что прошивка не знает команду: "% Unrecognized command", "% Invalid input", маркер "^"
+COMMAND_ERROR_RE = re.compile(r'^\s*(?:%\s*(?:Unrecognized|Invalid|Incomplete|Unknown|Ambiguous|Wrong|Bad)|\^\s*$|Error:)', re.M | re.I)
+
+INTERFACE_TYPE_RE = re.compile(r'^[A-Za-z-]+\s*')   # Тип интерфейса перед номером порта: Ethernet1/0/1, gi1/0/1
+
+capability_cache = {}   # (модель, команда) -> True/False: поддерживает ли прошивка точную форму команды
+
+
+def vendor_profile(vendor):
+    return VENDOR_PROFILES.get(vendor, VENDOR_PROFILES['Eltex'])
+
+
+def format_mac(vendor, mac_loc):    # MAC в формате, принятом в CLI производителя
+    return mac_loc.replace(':', vendor_profile(vendor)['mac_separator']) if mac_loc else mac_loc
+
+
+def command_fields(fields):     # Поля шаблона команды; port_number - порт без типа интерфейса (Ethernet1/0/1 -> 1/0/1)
+    if fields.get('port'):
+        return dict(fields, port_number=INTERFACE_TYPE_RE.sub('', fields['port']))
+    return fields
+
+
+def lookup_command(vendor, model, command_key, **fields):  # (команда, точная ли): точная, если прошивка ее поддерживает или еще не проверялась
+    exact_command, fallback_command = vendor_profile(vendor)[command_key]
+    fields = command_fields(fields)
+    if exact_command is not None and capability_cache.get((model or vendor, command_key), True):
+        return exact_command.format(**fields), True
+    return fallback_command.format(**fields), False
+
+
+def checked_lookup(run_ssh_command, session, vendor, model, command_key, output, exact, **fields):
+    # Вывод выполненной команды поиска; если прошивка не знает точную форму - запасная команда с фильтром.
+    # Результат проверки запоминается на модель коммутатора, повторно не проверяется
+    if not exact:
+        return output
+    cache_key = (model or vendor, command_key)
+    if not COMMAND_ERROR_RE.search(output):
+        capability_cache[cache_key] = True
+        return output
+    capability_cache[cache_key] = False
+    return run_ssh_command(session, vendor_profile(vendor)[command_key][1].format(**command_fields(fields)))
+
+
+def run_lookup(run_ssh_command, session, vendor, model, command_key, **fields):
+    # Точная команда, если прошивка ее поддерживает; иначе - фильтр по всей таблице
+    command, exact = lookup_command(vendor, model, command_key, **fields)
+    output = run_ssh_command(session, command)
+    return checked_lookup(run_ssh_command, session, vendor, model, command_key, output, exact, **fields)